@@ -8,6 +8,8 @@ from esphome.const import (
     CONF_TRIGGER_ID,
 )
 
+from .protocol_schema import select_labels
+
 DEPENDENCIES = ["ble_client"]
 CODEOWNERS = ["@andrewbackway"]
 
@@ -21,6 +23,9 @@ HikeITBLEComponent = hikeit_ble_ns.class_(
     ble_client.BLEClientNode
 )
 
+LogCategory = hikeit_ble_ns.enum("LogCategory")
+StatusLogMode = hikeit_ble_ns.enum("StatusLogMode")
+
 # Triggers
 ConnectedTrigger = hikeit_ble_ns.class_(
     "ConnectedTrigger",
@@ -42,6 +47,36 @@ MessageReceivedTrigger = hikeit_ble_ns.class_(
     automation.Trigger.template(cg.std_string)
 )
 
+SpeedModelChangeTrigger = hikeit_ble_ns.class_(
+    "SpeedModelChangeTrigger",
+    automation.Trigger.template(cg.std_string, cg.std_string)
+)
+
+StepChangeTrigger = hikeit_ble_ns.class_(
+    "StepChangeTrigger",
+    automation.Trigger.template(cg.uint8, cg.std_string)
+)
+
+LockChangeTrigger = hikeit_ble_ns.class_(
+    "LockChangeTrigger",
+    automation.Trigger.template(cg.bool_)
+)
+
+NoticeTrigger = hikeit_ble_ns.class_(
+    "NoticeTrigger",
+    automation.Trigger.template(cg.std_string)
+)
+
+StudyProgressTrigger = hikeit_ble_ns.class_(
+    "StudyProgressTrigger",
+    automation.Trigger.template(cg.uint8, cg.uint8)
+)
+
+CommandFailedTrigger = hikeit_ble_ns.class_(
+    "CommandFailedTrigger",
+    automation.Trigger.template(cg.std_string, cg.std_string)
+)
+
 # Config keys
 CONF_HIKEIT_BLE_ID = "hikeit_ble_id"
 CONF_PIN = "pin"
@@ -49,21 +84,97 @@ CONF_ON_CONNECTED = "on_connected"
 CONF_ON_DISCONNECTED = "on_disconnected"
 CONF_ON_VERIFIED = "on_verified"
 CONF_ON_MESSAGE = "on_message"
+CONF_ON_SPEED_MODEL_CHANGE = "on_speed_model_change"
+CONF_ON_STEP_CHANGE = "on_step_change"
+CONF_ON_LOCK_CHANGE = "on_lock_change"
+CONF_ON_NOTICE = "on_notice"
+CONF_ON_STUDY_PROGRESS = "on_study_progress"
+CONF_ON_COMMAND_FAILED = "on_command_failed"
 CONF_CONNECT_SWITCH = "connect_switch"
+CONF_WRITE_INTERVAL = "write_interval"
+CONF_FRAMES_PER_WRITE = "frames_per_write"
+CONF_ACK_TIMEOUT = "ack_timeout"
+CONF_MAX_RETRANSMITS = "max_retransmits"
+CONF_SESSION_CACHE = "session_cache"
+CONF_RECONNECT_DELAY = "reconnect_delay"
+CONF_RECONNECT_MAX_DELAY = "reconnect_max_delay"
+CONF_RECONNECT_JITTER = "reconnect_jitter"
+CONF_CAPTURE_SIZE = "capture_size"
+CONF_OPTIMISTIC_TIMEOUT = "optimistic_timeout"
+CONF_LOG_LIMITS = "log_limits"
+CONF_RATE = "rate"
+CONF_BURST = "burst"
+CONF_STATUS_LOG = "status_log"
+CONF_SUMMARY_INTERVAL = "summary_interval"
+
+# log_limits categories: key -> (C++ category, default rate/s, default burst)
+LOG_CATEGORIES = {
+    "frames": (LogCategory.LOG_CATEGORY_FRAMES, 5.0, 10),
+    "commands": (LogCategory.LOG_CATEGORY_COMMANDS, 5.0, 10),
+    "status": (LogCategory.LOG_CATEGORY_STATUS, 1.0, 5),
+    "errors": (LogCategory.LOG_CATEGORY_ERRORS, 2.0, 10),
+}
+
+STATUS_LOG_MODES = {
+    "none": StatusLogMode.STATUS_LOG_NONE,
+    "changes": StatusLogMode.STATUS_LOG_CHANGES,
+    "all": StatusLogMode.STATUS_LOG_ALL,
+}
+
+# Feature flag emitted for each configured trigger
+TRIGGER_DEFINES = {
+    CONF_ON_CONNECTED: "USE_HIKEIT_BLE_ON_CONNECTED",
+    CONF_ON_DISCONNECTED: "USE_HIKEIT_BLE_ON_DISCONNECTED",
+    CONF_ON_VERIFIED: "USE_HIKEIT_BLE_ON_VERIFIED",
+    CONF_ON_MESSAGE: "USE_HIKEIT_BLE_ON_MESSAGE",
+    CONF_ON_SPEED_MODEL_CHANGE: "USE_HIKEIT_BLE_ON_SPEED_MODEL_CHANGE",
+    CONF_ON_STEP_CHANGE: "USE_HIKEIT_BLE_ON_STEP_CHANGE",
+    CONF_ON_LOCK_CHANGE: "USE_HIKEIT_BLE_ON_LOCK_CHANGE",
+    CONF_ON_NOTICE: "USE_HIKEIT_BLE_ON_NOTICE",
+    CONF_ON_STUDY_PROGRESS: "USE_HIKEIT_BLE_ON_STUDY_PROGRESS",
+    CONF_ON_COMMAND_FAILED: "USE_HIKEIT_BLE_ON_COMMAND_FAILED",
+}
+
+# Field change triggers: trigger class and the typed variables passed to
+# the automation. They fire when the decoded status field changes.
+CHANGE_TRIGGERS = {
+    CONF_ON_SPEED_MODEL_CHANGE: (
+        SpeedModelChangeTrigger,
+        [(cg.std_string, "model"), (cg.std_string, "previous")],
+    ),
+    CONF_ON_STEP_CHANGE: (StepChangeTrigger, [(cg.uint8, "step"), (cg.std_string, "model")]),
+    CONF_ON_LOCK_CHANGE: (LockChangeTrigger, [(cg.bool_, "locked")]),
+    CONF_ON_NOTICE: (NoticeTrigger, [(cg.std_string, "notice")]),
+    CONF_ON_STUDY_PROGRESS: (StudyProgressTrigger, [(cg.uint8, "state"), (cg.uint8, "time")]),
+}
+
+# Speed model options (exported for platform components), see protocol_schema.py
+SPEED_MODELS = select_labels()
+
 
-# Speed model options (exported for platform components)
-SPEED_MODELS = [
-    "Off",
-    "Eco 4x4",
-    "Cruise",
-    "Sport",
-    "Hike IT",
-    "Auto",
-    "Launch",
-    "Anti-Slip",
-    "Valet"
-    #"SL" Unknown does not correspond to option on device
-]
+def _log_limit_schema(rate, burst):
+    """Token bucket for one log category, a rate of 0 disables the limit"""
+    return cv.Schema(
+        {
+            cv.Optional(CONF_RATE, default=rate): cv.positive_float,
+            cv.Optional(CONF_BURST, default=burst): cv.int_range(min=1, max=1000),
+        }
+    )
+
+
+LOG_LIMITS_SCHEMA = cv.Schema(
+    {
+        **{
+            cv.Optional(key, default={}): _log_limit_schema(rate, burst)
+            for key, (_, rate, burst) in LOG_CATEGORIES.items()
+        },
+        # "status" above limits the lines, this picks which statuses are logged
+        cv.Optional(CONF_STATUS_LOG, default="changes"): cv.enum(STATUS_LOG_MODES, lower=True),
+        cv.Optional(
+            CONF_SUMMARY_INTERVAL, default="0s"
+        ): cv.positive_time_period_milliseconds,
+    }
+)
 
 # Component configuration schema
 CONFIG_SCHEMA = (
@@ -73,6 +184,27 @@ CONFIG_SCHEMA = (
             cv.Required(CONF_MAC_ADDRESS): cv.mac_address,
             cv.Optional(CONF_PIN, default="123"): cv.string,
             cv.Optional(CONF_CONNECT_SWITCH): cv.use_id(switch.Switch),
+            cv.Optional(
+                CONF_WRITE_INTERVAL, default="50ms"
+            ): cv.positive_time_period_milliseconds,
+            cv.Optional(CONF_FRAMES_PER_WRITE, default=1): cv.int_range(min=1, max=4),
+            cv.Optional(
+                CONF_ACK_TIMEOUT, default="200ms"
+            ): cv.positive_time_period_milliseconds,
+            cv.Optional(CONF_MAX_RETRANSMITS, default=2): cv.int_range(min=0, max=8),
+            cv.Optional(CONF_SESSION_CACHE, default=True): cv.boolean,
+            cv.Optional(
+                CONF_RECONNECT_DELAY, default="1s"
+            ): cv.positive_time_period_milliseconds,
+            cv.Optional(
+                CONF_RECONNECT_MAX_DELAY, default="5min"
+            ): cv.positive_time_period_milliseconds,
+            cv.Optional(CONF_RECONNECT_JITTER, default="20%"): cv.percentage,
+            cv.Optional(
+                CONF_OPTIMISTIC_TIMEOUT, default="2s"
+            ): cv.positive_time_period_milliseconds,
+            cv.Optional(CONF_CAPTURE_SIZE, default=0): cv.int_range(min=0, max=65535),
+            cv.Optional(CONF_LOG_LIMITS, default={}): LOG_LIMITS_SCHEMA,
             
             # Automation triggers
             cv.Optional(CONF_ON_CONNECTED): automation.validate_automation(
@@ -95,6 +227,19 @@ CONFIG_SCHEMA = (
                     cv.GenerateID(CONF_TRIGGER_ID): cv.declare_id(MessageReceivedTrigger),
                 }
             ),
+            cv.Optional(CONF_ON_COMMAND_FAILED): automation.validate_automation(
+                {
+                    cv.GenerateID(CONF_TRIGGER_ID): cv.declare_id(CommandFailedTrigger),
+                }
+            ),
+            **{
+                cv.Optional(key): automation.validate_automation(
+                    {
+                        cv.GenerateID(CONF_TRIGGER_ID): cv.declare_id(trigger_class),
+                    }
+                )
+                for key, (trigger_class, _) in CHANGE_TRIGGERS.items()
+            },
         }
     )
     .extend(cv.COMPONENT_SCHEMA)
@@ -119,11 +264,51 @@ async def to_code(config):
     # Set PIN
     cg.add(var.set_pin(config[CONF_PIN]))
     
+    # Minimum gap between queued writes
+    cg.add(var.set_write_interval(config[CONF_WRITE_INTERVAL]))
+    
+    # Queued frames packed into one write when the negotiated MTU allows (opt-in)
+    cg.add(var.set_frames_per_write(config[CONF_FRAMES_PER_WRITE]))
+    
+    # Resend commands the device does not confirm, doubling the wait each time
+    cg.add(var.set_ack_timeout(config[CONF_ACK_TIMEOUT]))
+    cg.add(var.set_max_retransmits(config[CONF_MAX_RETRANSMITS]))
+    
+    # Persist device ID and verified state across reconnects
+    cg.add(var.set_session_cache(config[CONF_SESSION_CACHE]))
+    
+    # Backoff between failed connection attempts
+    cg.add(var.set_reconnect_delay(config[CONF_RECONNECT_DELAY]))
+    cg.add(var.set_reconnect_max_delay(config[CONF_RECONNECT_MAX_DELAY]))
+    cg.add(var.set_reconnect_jitter(config[CONF_RECONNECT_JITTER]))
+    
+    # Entity changes are shown at once and reverted if not confirmed in time
+    cg.add(var.set_optimistic_timeout(config[CONF_OPTIMISTIC_TIMEOUT]))
+    
+    # Raw frame capture ring (24 bytes RAM per frame), disabled by default
+    if config[CONF_CAPTURE_SIZE] > 0:
+        cg.add_define("USE_HIKEIT_BLE_CAPTURE")
+        cg.add(var.set_capture_size(config[CONF_CAPTURE_SIZE]))
+    
+    # Hot-path log rate limits, status logging and summary lines
+    log_limits = config[CONF_LOG_LIMITS]
+    for key, (category, _, _) in LOG_CATEGORIES.items():
+        limit = log_limits[key]
+        cg.add(var.set_log_limit(category, limit[CONF_RATE], limit[CONF_BURST]))
+    cg.add(var.set_status_log(log_limits[CONF_STATUS_LOG]))
+    cg.add(var.set_log_summary_interval(log_limits[CONF_SUMMARY_INTERVAL]))
+    
     if CONF_CONNECT_SWITCH in config:
+        cg.add_define("USE_HIKEIT_BLE_CONNECT_SWITCH")
         sw = await cg.get_variable(config[CONF_CONNECT_SWITCH])
         cg.add(var.set_connect_switch(sw))
     
-    # Register automation triggers
+    # Register automation triggers. Each trigger type compiles in its
+    # callback list only when configured.
+    for key in TRIGGER_DEFINES:
+        if config.get(key):
+            cg.add_define(TRIGGER_DEFINES[key])
+    
     for conf in config.get(CONF_ON_CONNECTED, []):
         trigger = cg.new_Pvariable(conf[CONF_TRIGGER_ID], var)
         await automation.build_automation(trigger, [], conf)
@@ -138,4 +323,15 @@ async def to_code(config):
     
     for conf in config.get(CONF_ON_MESSAGE, []):
         trigger = cg.new_Pvariable(conf[CONF_TRIGGER_ID], var)
-        await automation.build_automation(trigger, [(cg.std_string, "message")], conf)
\ No newline at end of file
+        await automation.build_automation(trigger, [(cg.std_string, "message")], conf)
+    
+    for conf in config.get(CONF_ON_COMMAND_FAILED, []):
+        trigger = cg.new_Pvariable(conf[CONF_TRIGGER_ID], var)
+        await automation.build_automation(
+            trigger, [(cg.std_string, "field"), (cg.std_string, "value")], conf
+        )
+    
+    for key, (_, args) in CHANGE_TRIGGERS.items():
+        for conf in config.get(key, []):
+            trigger = cg.new_Pvariable(conf[CONF_TRIGGER_ID], var)
+            await automation.build_automation(trigger, args, conf)
\ No newline at end of file
@@ -10,9 +10,11 @@ ICON_MONITOR = "mdi:monitor"
 
 CONF_COMMAND_TYPE = "command_type"
 
-# Valid command types: 0 = screen toggle, 1 = auto transmission toggle
+# Valid command types: 0 = screen toggle, 1 = auto transmission toggle,
+# 2 = dump the frame capture to the log
 COMMAND_TYPE_SCREEN = 0
 COMMAND_TYPE_AUTO = 1
+COMMAND_TYPE_DUMP_CAPTURE = 2
 
 HikeITButton = hikeit_ble_ns.class_("HikeITButton", button.Button, cg.Component)
 
@@ -21,7 +23,7 @@ CONFIG_SCHEMA = (
     .extend({
         cv.GenerateID(CONF_HIKEIT_BLE_ID): cv.use_id(HikeITBLEComponent),
         cv.Optional(CONF_COMMAND_TYPE, default=COMMAND_TYPE_SCREEN): cv.one_of(
-            COMMAND_TYPE_SCREEN, COMMAND_TYPE_AUTO, int=True
+            COMMAND_TYPE_SCREEN, COMMAND_TYPE_AUTO, COMMAND_TYPE_DUMP_CAPTURE, int=True
         ),
     })
     .extend(cv.COMPONENT_SCHEMA)
@@ -29,6 +31,7 @@ CONFIG_SCHEMA = (
 
 
 async def to_code(config):
+    cg.add_define("USE_HIKEIT_BLE_BUTTON")
     var = await button.new_button(config)
     await cg.register_component(var, config)
     parent = await cg.get_variable(config[CONF_HIKEIT_BLE_ID])
@@ -6,74 +6,281 @@
 #include "hikeit_locked_switch.h"
 #include "hikeit_status_sensor.h"
 
-#include "esphome/components/select/select.h"
-#include "esphome/components/switch/switch.h"
-#include "esphome/components/text_sensor/text_sensor.h"
 #include "esphome/core/helpers.h"
 #include "esphome/core/log.h"
 
+#ifdef USE_LOGGER
+#include "esphome/components/logger/logger.h"
+#endif
+
+#include <algorithm>
+
 namespace esphome {
 namespace hikeit_ble {
 
 // Helper to convert hex to string for logging
 std::string format_hex(const uint8_t* data, size_t len) {
-  std::string result;
-  result.reserve(len * 2);
+  static const char HEX_DIGITS[] = "0123456789ABCDEF";
+  std::string result(len * 2, '0');
   for (size_t i = 0; i < len; i++) {
-    char buf[3];
-    sprintf(buf, "%02X", data[i]);
-    result += buf;
+    result[i * 2] = HEX_DIGITS[data[i] >> 4];
+    result[i * 2 + 1] = HEX_DIGITS[data[i] & 0x0F];
   }
   return result;
 }
 
-// Helper to convert speed model to string
-const char* speed_model_to_string(SpeedModel model) {
-  switch (model) {
+// True when messages at this level reach the logger, so log-only strings
+// are not formatted for nothing
+static bool log_level_enabled(int level) {
+  if (ESPHOME_LOG_LEVEL < level) {
+    return false;
+  }
+#ifdef USE_LOGGER
+  if (logger::global_logger != nullptr &&
+      logger::global_logger->get_log_level() < level) {
+    return false;
+  }
+#endif
+  return true;
+}
+
+static const char *const LOG_CATEGORY_NAMES[LOG_CATEGORY_COUNT] = {"frames", "commands", "status",
+                                                                  "errors"};
+
+void LogBucket::configure(float rate, uint16_t burst) {
+  this->rate = rate;
+  this->burst = burst;
+  this->tokens = burst;
+}
+
+bool LogBucket::take(uint32_t now) {
+  if (this->rate <= 0.0f) {
+    return true;
+  }
+  this->tokens = std::min(this->burst, this->tokens + (now - this->last_refill) * this->rate / 1000.0f);
+  this->last_refill = now;
+  if (this->tokens < 1.0f) {
+    this->suppressed++;
+    return false;
+  }
+  this->tokens -= 1.0f;
+  return true;
+}
+
+// Step of the active speed model, the value shown by the step number
+static uint8_t active_step(const ParsedMessage& msg) {
+  switch (msg.speed_model) {
     case SPEED_ECONOMY:
-      return "Eco 4x4";
-    case SPEED_NORMAL:
-      return "Off";
+      return msg.step_economy;
     case SPEED_CRUISE:
-      return "Cruise";
+      return msg.step_cruise;
     case SPEED_SPORT:
-      return "Sport";
+      return msg.step_sport;
     case SPEED_HIKE_IT:
-      return "Hike IT";
-    case SPEED_AUTO:
-      return "Auto";
-    case SPEED_LAUNCH:
-      return "Launch";
-    case SPEED_ANTI_SLIP:
-      return "Anti-Slip";
-    case SPEED_VALET:
-      return "Valet";
-    case SPEED_SL:
-      return "SL";
+      return msg.step_hike;
+    default:
+      return 0;
+  }
+}
+
+// In-flight slot a written command occupies, IN_FLIGHT_KIND_COUNT for
+// commands the device does not confirm (screen, study)
+static InFlightKind in_flight_kind(uint8_t type) {
+  switch (type) {
+    case MSG_STATUS:
+      return IN_FLIGHT_CONFIG;
+    case MSG_LOCK:
+    case MSG_UNLOCK:
+      return IN_FLIGHT_LOCK;
+    case MSG_VERIFY:
+      return IN_FLIGHT_VERIFY;
+    default:
+      return IN_FLIGHT_KIND_COUNT;
+  }
+}
+
+// Whether a status shows the effect of a Type 02/05/06 write: model byte,
+// step nibbles and host-set bits of byte 3, or the lock state
+static bool status_reflects(const ParsedMessage& msg, uint8_t type, const uint8_t* content) {
+  if (type == MSG_STATUS) {
+    return memcmp(msg.content, content, 3) == 0 &&
+           ((msg.content[3] ^ content[3]) & CONFIG_BITS_MASK) == 0;
+  }
+  return msg.is_safe_model == (type == MSG_LOCK);
+}
+
+// Status value of an entity-controlled field
+static uint8_t optimistic_field_value(const ParsedMessage& msg, OptimisticField field) {
+  switch (field) {
+    case OPTIMISTIC_MODEL:
+      return msg.speed_model;
+    case OPTIMISTIC_STEP:
+      return active_step(msg);
+    default:
+      return msg.is_safe_model;
+  }
+}
+
+// Scheduler names of the per-field confirmation deadlines
+static const char *const OPTIMISTIC_TIMEOUTS[OPTIMISTIC_FIELD_COUNT] = {"optimistic_model", "optimistic_step",
+                                                                         "optimistic_lock"};
+
+const char* optimistic_field_to_string(OptimisticField field) {
+  switch (field) {
+    case OPTIMISTIC_MODEL:
+      return "speed_model";
+    case OPTIMISTIC_STEP:
+      return "step";
     default:
-      return "Unknown";
+      return "locked";
   }
 }
 
-// Helper to convert string to speed model
+std::string optimistic_value_to_string(OptimisticField field, uint8_t value) {
+  switch (field) {
+    case OPTIMISTIC_MODEL:
+      return speed_model_to_string((SpeedModel) value);
+    case OPTIMISTIC_STEP:
+      return std::to_string(value);
+    default:
+      return value ? "locked" : "unlocked";
+  }
+}
+
+// Helper to convert speed model to string
+const char* speed_model_to_string(SpeedModel model) {
+  return speed_model_label(model);
+}
+
+// Helper to convert string to speed model, O(1) via the generated label hash
 SpeedModel string_to_speed_model(const std::string& str) {
-  if (str == "Eco 4x4") return SPEED_ECONOMY;
-  if (str == "Off") return SPEED_NORMAL;
-  if (str == "Cruise") return SPEED_CRUISE;
-  if (str == "Sport") return SPEED_SPORT;
-  if (str == "Hike IT") return SPEED_HIKE_IT;
-  if (str == "Auto") return SPEED_AUTO;
-  if (str == "Launch") return SPEED_LAUNCH;
-  if (str == "Anti-Slip") return SPEED_ANTI_SLIP;
-  if (str == "Valet") return SPEED_VALET;
-  if (str == "SL") return SPEED_SL;
-  return SPEED_NORMAL;
+  SpeedModel model;
+  if (!speed_model_from_label(str.data(), str.size(), model)) {
+    return SPEED_NORMAL;
+  }
+  return model;
+}
+
+const char* notice_to_string(NoticeCode notice) {
+  switch (notice) {
+    case NOTICE_C1:
+      return "C1";
+    case NOTICE_C2:
+      return "C2";
+    case NOTICE_C3:
+      return "C3";
+    default:
+      return "";
+  }
+}
+
+size_t FrameReassembler::push(const uint8_t* data, size_t len) {
+  size_t count = std::min(len, REASSEMBLY_BUFFER_SIZE - this->size_);
+  for (size_t i = 0; i < count; i++) {
+    size_t tail = (this->head_ + this->size_) & (REASSEMBLY_BUFFER_SIZE - 1);
+    this->buffer_[tail] = data[i];
+    this->size_++;
+  }
+  return count;
+}
+
+bool FrameReassembler::next(uint8_t* out) {
+  while (this->size_ >= 2) {
+    // Resync: skip bytes until a header is at the front
+    if (this->peek_(0) != HEADER_BYTE_1 || this->peek_(1) != HEADER_BYTE_2) {
+      this->skip_byte_();
+      continue;
+    }
+
+    // Wait for the rest of the frame
+    if (this->size_ < MESSAGE_LENGTH) {
+      return false;
+    }
+
+    uint8_t sum = 0;
+    for (size_t i = 0; i < MESSAGE_LENGTH; i++) {
+      out[i] = this->peek_(i);
+      if (i >= 2 && i < MESSAGE_LENGTH - 1) {
+        sum += out[i];
+      }
+    }
+
+    if (sum != out[MESSAGE_LENGTH - 1]) {
+      // Corrupt frame or false header, drop the header byte and resync
+      this->checksum_rejects_++;
+      this->skipping_ = true;
+      this->consume_(1);
+      this->discarded_bytes_++;
+      continue;
+    }
+
+    this->consume_(MESSAGE_LENGTH);
+    this->skipping_ = false;
+    return true;
+  }
+
+  // A lone byte can only be kept if it may start a header
+  if (this->size_ == 1 && this->peek_(0) != HEADER_BYTE_1) {
+    this->skip_byte_();
+  }
+  return false;
+}
+
+void FrameReassembler::skip_byte_() {
+  // The first skipped byte of a run is one framing reject, the rest of the
+  // run is the same one
+  if (!this->skipping_) {
+    this->skipping_ = true;
+    this->framing_rejects_++;
+  }
+  this->consume_(1);
+  this->discarded_bytes_++;
+}
+
+void FrameReassembler::consume_(size_t count) {
+  this->head_ = (this->head_ + count) & (REASSEMBLY_BUFFER_SIZE - 1);
+  this->size_ -= count;
+}
+
+void FrameReassembler::clear() {
+  // Bytes still buffered are a frame cut short by the link going away
+  if (this->size_ > 0) {
+    this->framing_rejects_++;
+    this->discarded_bytes_ += this->size_;
+  }
+  this->head_ = 0;
+  this->size_ = 0;
+  this->skipping_ = false;
 }
 
 void HikeITBLEComponent::setup() {
   ESP_LOGCONFIG(TAG, "Setting up HIKE IT BLE...");
   this->set_state(STATE_DISCONNECTED);
   this->update_status_text();
+
+  if (this->session_cache_enabled_) {
+    this->load_session();
+  }
+
+#ifdef USE_HIKEIT_BLE_CAPTURE
+  if (this->capture_capacity_ > 0) {
+    this->capture_.reset(new CaptureRecord[this->capture_capacity_]);
+  }
+#endif
+
+  if (this->log_summary_interval_ > 0) {
+    this->set_interval("log_summary", this->log_summary_interval_, [this]() { this->log_summary(); });
+  }
+
+#ifdef USE_HIKEIT_BLE_CONNECT_SWITCH
+  // loop() only reconciles the switch with the link, wake it on changes
+  if (this->connect_switch_ != nullptr) {
+    this->connect_switch_->add_on_state_callback([this](bool) {
+      this->reconnect_attempt_ = 0;
+      this->enable_loop();
+    });
+  }
+#endif
 }
 
 void HikeITBLEComponent::loop() {
@@ -94,20 +301,22 @@ void HikeITBLEComponent::loop() {
 
       // Local state cleanup
       this->handle_disconnection();
+    } else if (this->parent_ != nullptr) {
+      // Keep ble_client from connecting on the next advertisement
+      this->parent_->set_enabled(false);
     }
 
     // Do not attempt new connections
-    return;
+    this->cancel_timeout("reconnect");
+    this->reconnect_pending_ = false;
+  } else if ((this->state_ == STATE_DISCONNECTED || this->state_ == STATE_ERROR) &&
+             !this->reconnect_pending_) {
+    // Switch turned ON (or first run)
+    this->attempt_connection();
   }
 
-  // Normal reconnection logic when switch is ON
-  if (this->state_ == STATE_DISCONNECTED || this->state_ == STATE_ERROR) {
-    uint32_t now = millis();
-    if (now - this->last_connection_attempt_ > this->reconnect_delay_) {
-      this->last_connection_attempt_ = now;
-      this->attempt_connection();
-    }
-  }
+  // Nothing to poll; switch changes and GATT events wake the loop again
+  this->disable_loop();
 }
 
 
@@ -118,7 +327,44 @@ void HikeITBLEComponent::dump_config() {
       (uint8_t)(this->address_ >> 40), (uint8_t)(this->address_ >> 32),
       (uint8_t)(this->address_ >> 24), (uint8_t)(this->address_ >> 16),
       (uint8_t)(this->address_ >> 8), (uint8_t)(this->address_));
-  ESP_LOGCONFIG(TAG, "  PIN: %s", this->pin_.c_str());
+  ESP_LOGCONFIG(TAG, "  PIN: %s", this->pin_.empty() ? "not set" : "set");
+  ESP_LOGCONFIG(TAG, "  Write Interval: %ums", (unsigned) this->write_interval_);
+  if (this->frames_per_write_ > 1) {
+    ESP_LOGCONFIG(TAG, "  Frames Per Write: %u (MTU %u needed)", (unsigned) this->frames_per_write_,
+                  (unsigned) this->wanted_mtu());
+  }
+  if (this->ack_timeout_ > 0) {
+    ESP_LOGCONFIG(TAG, "  Ack Timeout: %ums (%u retransmits)", (unsigned) this->ack_timeout_,
+                  (unsigned) this->max_retransmits_);
+  }
+  ESP_LOGCONFIG(TAG, "  Reconnect Delay: %ums (max %ums, jitter %.0f%%)",
+                (unsigned) this->reconnect_delay_,
+                (unsigned) this->reconnect_max_delay_,
+                this->reconnect_jitter_ * 100.0f);
+  ESP_LOGCONFIG(TAG, "  Session Cache: %s",
+                !this->session_cache_enabled_ ? "disabled"
+                : this->session_.verified   ? "verified"
+                                            : "empty");
+#ifdef USE_HIKEIT_BLE_CAPTURE
+  if (this->capture_ != nullptr) {
+    ESP_LOGCONFIG(TAG, "  Frame Capture: %u frames", (unsigned) this->capture_capacity_);
+  }
+#endif
+  for (size_t i = 0; i < LOG_CATEGORY_COUNT; i++) {
+    const LogBucket &bucket = this->log_buckets_[i];
+    if (bucket.rate > 0.0f) {
+      ESP_LOGCONFIG(TAG, "  Log Limit %s: %.1f/s (burst %u)", LOG_CATEGORY_NAMES[i], bucket.rate,
+                    (unsigned) bucket.burst);
+    }
+  }
+  static const char *const STATUS_LOG_NAMES[] = {"none", "changes", "all"};
+  ESP_LOGCONFIG(TAG, "  Status Log: %s", STATUS_LOG_NAMES[this->status_log_]);
+  if (this->log_summary_interval_ > 0) {
+    ESP_LOGCONFIG(TAG, "  Log Summary: every %ums", (unsigned) this->log_summary_interval_);
+  }
+  if (this->optimistic_timeout_ > 0) {
+    ESP_LOGCONFIG(TAG, "  Optimistic Timeout: %ums", (unsigned) this->optimistic_timeout_);
+  }
   ESP_LOGCONFIG(TAG, "  State: %d", this->state_);
 }
 
@@ -144,10 +390,52 @@ void HikeITBLEComponent::attempt_connection() {
   }
 
   ESP_LOGI(TAG, "Attempting connection to device...");
+  this->reconnect_pending_ = false;
   this->set_state(STATE_CONNECTING);
 
-  // BLEClient connection is initiated elsewhere (e.g. by esp32_ble_tracker),
-  // this just updates our internal state and timing.
+  // BLEClient connection is initiated elsewhere (e.g. by esp32_ble_tracker)
+  // once the client is enabled and the device advertises.
+  if (this->parent_ != nullptr) {
+    this->parent_->set_enabled(true);
+  }
+}
+
+uint32_t HikeITBLEComponent::next_reconnect_delay() {
+  // Exponential backoff from reconnect_delay_, capped, with +/- jitter
+  uint32_t delay = this->reconnect_delay_;
+  for (uint32_t i = 1; i < this->reconnect_attempt_ && delay < this->reconnect_max_delay_; i++) {
+    delay *= 2;
+  }
+  delay = std::min(delay, this->reconnect_max_delay_);
+
+  float spread = this->reconnect_jitter_ * (2.0f * random_float() - 1.0f);
+  return (uint32_t) (delay * (1.0f + spread));
+}
+
+void HikeITBLEComponent::schedule_reconnect(bool clean_drop) {
+  if (!this->connection_allowed_()) {
+    return;
+  }
+
+  // A verified link that dropped is usually back in range right away
+  if (clean_drop) {
+    ESP_LOGI(TAG, "Link lost, reconnecting immediately");
+    this->reconnect_attempt_ = 0;
+    this->attempt_connection();
+    return;
+  }
+
+  this->reconnect_attempt_++;
+  uint32_t delay = this->next_reconnect_delay();
+  ESP_LOGI(TAG, "Reconnect attempt %u in %ums", (unsigned) this->reconnect_attempt_,
+           (unsigned) delay);
+
+  // Hold the client off until the delay expires
+  this->reconnect_pending_ = true;
+  if (this->parent_ != nullptr) {
+    this->parent_->set_enabled(false);
+  }
+  this->set_timeout("reconnect", delay, [this]() { this->attempt_connection(); });
 }
 
 
@@ -158,17 +446,29 @@ void HikeITBLEComponent::gattc_event_handler(esp_gattc_cb_event_t event,
     case ESP_GATTC_OPEN_EVT: {
       if (param->open.status == ESP_GATT_OK) {
         ESP_LOGI(TAG, "Connected to device");
+        this->connect_started_ = millis();
+        // ble_client runs the MTU exchange for the link, its result
+        // arrives as ESP_GATTC_CFG_MTU_EVT
+        this->mtu_ = std::max(param->open.mtu, DEFAULT_MTU);
         this->handle_connection();
       } else {
         ESP_LOGW(TAG, "Connection failed, status=%d", param->open.status);
         this->set_state(STATE_ERROR);
+        this->schedule_reconnect(false);
       }
+      this->enable_loop();
       break;
     }
 
     case ESP_GATTC_DISCONNECT_EVT: {
       ESP_LOGW(TAG, "Disconnected from device");
+      bool clean_drop = this->state_ == STATE_VERIFIED;
+      if (clean_drop) {
+        this->link_dropped_ = true;
+      }
       this->handle_disconnection();
+      this->schedule_reconnect(clean_drop);
+      this->enable_loop();
       break;
     }
 
@@ -185,6 +485,12 @@ void HikeITBLEComponent::gattc_event_handler(esp_gattc_cb_event_t event,
         return;
       }
 
+      // Discovery itself is run by ble_client (and served from the GATT
+      // cache); a moved characteristic means the cached session is stale
+      if (this->session_.verified && chr->handle != this->session_.char_handle) {
+        this->invalidate_session("characteristic handle changed");
+      }
+
       this->char_handle_ = chr->handle;
       this->notify_handle_ = chr->handle;
 
@@ -198,8 +504,24 @@ void HikeITBLEComponent::gattc_event_handler(esp_gattc_cb_event_t event,
         ESP_LOGI(TAG, "Notifications enabled");
         this->set_state(STATE_CONNECTED);
 
-        // Wait 500ms then send verification command
-        this->set_timeout(500, [this]() { this->send_verify_command(); });
+        if (this->restore_session()) {
+          break;
+        }
+
+        // Verify once the first status frame has given us the device ID,
+        // or after 500ms if none arrives
+        this->set_timeout("verify", 500, [this]() { this->send_verify_command(); });
+      }
+      break;
+    }
+
+    case ESP_GATTC_CFG_MTU_EVT: {
+      if (param->cfg_mtu.status == ESP_GATT_OK) {
+        this->mtu_ = param->cfg_mtu.mtu;
+        ESP_LOGD(TAG, "MTU %u, %u frames per write", (unsigned) this->mtu_,
+                 (unsigned) this->frames_per_write());
+      } else {
+        ESP_LOGD(TAG, "MTU exchange failed, status=%d", param->cfg_mtu.status);
       }
       break;
     }
@@ -218,30 +540,54 @@ void HikeITBLEComponent::gattc_event_handler(esp_gattc_cb_event_t event,
 
 void HikeITBLEComponent::handle_connection() {
   this->set_state(STATE_CONNECTED);
+#ifdef USE_HIKEIT_BLE_ON_CONNECTED
   this->connected_callbacks_.call();
+#endif
   this->update_status_text();
 }
 
 void HikeITBLEComponent::handle_disconnection() {
   this->set_state(STATE_DISCONNECTED);
+#ifdef USE_HIKEIT_BLE_ON_DISCONNECTED
   this->disconnected_callbacks_.call();
+#endif
   this->update_status_text();
 
   // Reset state
+  this->cancel_timeout("verify");
   this->device_id_ = 0;
   this->sequence_counter_ = 0;
-  this->message_buffer_.clear();
+  this->sequence_synced_ = false;
+  this->mtu_ = DEFAULT_MTU;
+  this->session_restored_ = false;
+  this->rtt_pending_ = false;
+  this->reassembler_.clear();
+  this->clear_write_queue();
+
+  // Their writes were just discarded, show the device's values again
+  for (uint8_t field = 0; field < OPTIMISTIC_FIELD_COUNT; field++) {
+    this->rollback_optimistic((OptimisticField) field);
+  }
+
+  // Device state may change while away, republish everything on return
+  this->publish_all_ = true;
 }
 
 void HikeITBLEComponent::set_state(ConnectionState state) {
   if (this->state_ != state) {
     this->state_ = state;
     ESP_LOGD(TAG, "State changed to: %d", state);
+    // A reconnect is a dropped link verified again, however many attempts it took
+    if (state == STATE_VERIFIED && this->link_dropped_) {
+      this->link_dropped_ = false;
+      this->reconnect_count_++;
+    }
     this->update_status_text();
   }
 }
 
 void HikeITBLEComponent::update_status_text() {
+#ifdef USE_HIKEIT_BLE_TEXT_SENSOR
   if (this->status_sensor_ == nullptr) return;
 
   std::string status;
@@ -274,6 +620,12 @@ void HikeITBLEComponent::update_status_text() {
   }
 
   this->status_sensor_->publish_state(status);
+#endif
+}
+
+size_t HikeITBLEComponent::frames_per_write() const {
+  size_t fit = (this->mtu_ - ATT_HEADER_LENGTH) / MESSAGE_LENGTH;
+  return std::max<size_t>(1, std::min<size_t>(this->frames_per_write_, fit));
 }
 
 void HikeITBLEComponent::start_notify() {
@@ -304,152 +656,469 @@ uint8_t HikeITBLEComponent::calculate_checksum(const uint8_t* data,
   return sum & 0xFF;
 }
 
-std::vector<uint8_t> HikeITBLEComponent::build_message(uint8_t type,
-                                                       const uint8_t* content) {
-  std::vector<uint8_t> message;
-  message.reserve(MESSAGE_LENGTH);
-
+// Build a frame into out, which must hold MESSAGE_LENGTH bytes
+void HikeITBLEComponent::build_message(uint8_t type, const uint8_t* content,
+                                       uint8_t* out) {
   // Header
-  message.push_back(HEADER_BYTE_1);
-  message.push_back(HEADER_BYTE_2);
+  out[0] = HEADER_BYTE_1;
+  out[1] = HEADER_BYTE_2;
 
   // Sequence
-  message.push_back(this->get_sequence());
+  out[2] = this->get_sequence();
 
   // Type
-  message.push_back(type);
+  out[3] = type;
 
   // Content (10 bytes)
-  for (int i = 0; i < 10; i++) {
-    message.push_back(content[i]);
-  }
+  memcpy(&out[4], content, CONTENT_LENGTH);
 
   // Device ID (4 bytes)
-  message.push_back((this->device_id_ >> 24) & 0xFF);
-  message.push_back((this->device_id_ >> 16) & 0xFF);
-  message.push_back((this->device_id_ >> 8) & 0xFF);
-  message.push_back(this->device_id_ & 0xFF);
+  out[14] = (this->device_id_ >> 24) & 0xFF;
+  out[15] = (this->device_id_ >> 16) & 0xFF;
+  out[16] = (this->device_id_ >> 8) & 0xFF;
+  out[17] = this->device_id_ & 0xFF;
 
   // Checksum (skip header)
-  uint8_t checksum = this->calculate_checksum(&message[2], message.size() - 2);
-  message.push_back(checksum);
-
-  return message;
+  out[18] = this->calculate_checksum(&out[2], MESSAGE_LENGTH - 3);
 }
 
-void HikeITBLEComponent::send_command(const std::vector<uint8_t>& data) {
+void HikeITBLEComponent::send_command(const uint8_t* data, size_t len) {
   if (!this->is_connected()) {
     ESP_LOGW(TAG, "Not connected, cannot send command");
     return;
   }
 
-  ESP_LOGD(TAG, "Sending: %s", format_hex(data.data(), data.size()).c_str());
+  if (this->should_log(LOG_CATEGORY_FRAMES, ESPHOME_LOG_LEVEL_DEBUG)) {
+    ESP_LOGD(TAG, "Sending: %s", format_hex(data, len).c_str());
+  }
+
+#ifdef USE_HIKEIT_BLE_CAPTURE
+  if (this->capture_ != nullptr) {
+    for (size_t offset = 0; offset + MESSAGE_LENGTH <= len; offset += MESSAGE_LENGTH) {
+      this->capture_frame(CAPTURE_TX, data + offset);
+    }
+  }
+#endif
 
   auto status = esp_ble_gattc_write_char(
       this->parent_->get_gattc_if(), this->parent_->get_conn_id(),
-      this->char_handle_, data.size(), const_cast<uint8_t*>(data.data()),
+      this->char_handle_, len, const_cast<uint8_t*>(data),
       ESP_GATT_WRITE_TYPE_NO_RSP, ESP_GATT_AUTH_REQ_NONE);
 
   if (status != ESP_OK) {
     ESP_LOGW(TAG, "Failed to send command: %d", status);
+    return;
+  }
+  this->writes_sent_++;
+}
+
+void ConfigChange::merge(const ConfigChange& other) {
+  if (other.fields & CONFIG_MODEL_BYTE) this->model_byte = other.model_byte;
+  if (other.fields & CONFIG_MODEL_BITS) this->model_bits = other.model_bits;
+  if (other.fields & CONFIG_STEP_ECO) this->step_economy = other.step_economy;
+  if (other.fields & CONFIG_STEP_CRUISE) this->step_cruise = other.step_cruise;
+  if (other.fields & CONFIG_STEP_SPORT) this->step_sport = other.step_sport;
+  if (other.fields & CONFIG_STEP_HIKE) this->step_hike = other.step_hike;
+  if (other.fields & CONFIG_AT_FLAG) this->at_flag = other.at_flag;
+  this->fields |= other.fields;
+}
+
+void ConfigChange::apply(uint8_t* content) const {
+  if (this->fields & CONFIG_MODEL_BYTE) {
+    set_field(content, FIELD_MODEL_BYTE, this->model_byte);
+  }
+  if (this->fields & CONFIG_MODEL_BITS) {
+    // Model writes replace the whole byte; the AT flag is applied below
+    content[FIELD_MODEL_BITS.byte] = this->model_bits;
+  }
+  if (this->fields & CONFIG_AT_FLAG) {
+    content[FIELD_AT_FLAG.byte] &= 0x3F;  // bit 6 is cleared with the flag
+    set_field(content, FIELD_AT_FLAG, this->at_flag);
+  }
+
+  if (this->fields & CONFIG_STEP_ECO) {
+    set_field(content, FIELD_STEP_ECONOMY, this->step_economy);
+  }
+  if (this->fields & CONFIG_STEP_CRUISE) {
+    set_field(content, FIELD_STEP_CRUISE, this->step_cruise);
+  }
+  if (this->fields & CONFIG_STEP_SPORT) {
+    set_field(content, FIELD_STEP_SPORT, this->step_sport);
+  }
+  if (this->fields & CONFIG_STEP_HIKE) {
+    set_field(content, FIELD_STEP_HIKE, this->step_hike);
+  }
+
+  // Model and AT writes clear bytes 4-6
+  if (this->fields & (CONFIG_MODEL_BITS | CONFIG_AT_FLAG)) {
+    content[4] = 0;
+    content[5] = 0;
+    content[6] = 0;
+  }
+}
+
+bool HikeITBLEComponent::enqueue_command(uint8_t type, const uint8_t* content) {
+  if (!this->push_queue(type, content)) {
+    return false;
+  }
+  this->schedule_write();
+  return true;
+}
+
+bool HikeITBLEComponent::enqueue_config(const ConfigChange& change) {
+  if (this->config_queued_) {
+    // Not written yet, fold into the queued Type 02 write
+    this->pending_config_.merge(change);
+    this->writes_merged_++;
+    if (this->should_log(LOG_CATEGORY_COMMANDS, ESPHOME_LOG_LEVEL_DEBUG)) {
+      ESP_LOGD(TAG, "Merged config change into queued write (%u merged)",
+               (unsigned) this->writes_merged_);
+    }
+    return true;
+  }
+
+  if (!this->push_queue(MSG_STATUS, nullptr)) {
+    return false;
+  }
+  this->pending_config_ = change;
+  this->config_queued_ = true;
+  this->schedule_write();
+  return true;
+}
+
+bool HikeITBLEComponent::push_queue(uint8_t type, const uint8_t* content) {
+  if (this->write_queue_size_ >= WRITE_QUEUE_SIZE) {
+    this->writes_dropped_++;
+    if (this->should_log(LOG_CATEGORY_ERRORS, ESPHOME_LOG_LEVEL_WARN)) {
+      ESP_LOGW(TAG, "Write queue full, dropping Type %02X command (%u dropped)",
+               type, (unsigned) this->writes_dropped_);
+    }
+    return false;
+  }
+
+  size_t tail = (this->write_queue_head_ + this->write_queue_size_) % WRITE_QUEUE_SIZE;
+  QueuedCommand& entry = this->write_queue_[tail];
+  entry.type = type;
+  if (content != nullptr) {
+    memcpy(entry.content, content, sizeof(entry.content));
+  }
+  this->write_queue_size_++;
+  this->write_queue_high_water_ =
+      std::max(this->write_queue_high_water_, this->write_queue_size_);
+  return true;
+}
+
+void HikeITBLEComponent::schedule_write() {
+  if (this->write_scheduled_ || (this->write_queue_size_ == 0 && !this->has_due_retransmit())) {
+    return;
+  }
+
+  // Pace writes: wait out the rest of the minimum gap. Even without a gap
+  // the write waits for the current loop pass to finish, so commands
+  // issued together (model, step and lock from one automation) are merged
+  // or packed into a single write.
+  uint32_t elapsed = millis() - this->last_write_;
+  uint32_t wait = elapsed >= this->write_interval_ ? 0 : this->write_interval_ - elapsed;
+  this->write_scheduled_ = true;
+  this->set_timeout("write_queue", wait, [this]() {
+    this->write_scheduled_ = false;
+    this->process_write_queue();
+  });
+}
+
+void HikeITBLEComponent::process_write_queue() {
+  // Pack as many frames as the MTU allows into one write. Resends go
+  // first, their commands are older than anything queued.
+  uint8_t batch[MAX_FRAMES_PER_WRITE * MESSAGE_LENGTH];
+  size_t max_frames = this->frames_per_write();
+  size_t frames = 0;
+  while (frames < max_frames) {
+    uint8_t* out = &batch[frames * MESSAGE_LENGTH];
+    if (!this->build_retransmit(out) && !this->build_queued_frame(out)) {
+      break;
+    }
+    frames++;
+  }
+  if (frames == 0) {
+    return;
+  }
+
+  this->send_command(batch, frames * MESSAGE_LENGTH);
+  this->frames_packed_ += frames - 1;
+  this->last_write_ = millis();
+
+  this->schedule_write();
+}
+
+bool HikeITBLEComponent::build_queued_frame(uint8_t* out) {
+  if (this->write_queue_size_ == 0) {
+    return false;
+  }
+
+  QueuedCommand& entry = this->write_queue_[this->write_queue_head_];
+  this->write_queue_head_ = (this->write_queue_head_ + 1) % WRITE_QUEUE_SIZE;
+  this->write_queue_size_--;
+
+  uint8_t content[10];
+  if (entry.type == MSG_STATUS) {
+    // Build on the freshest cached status, and on a config write still in
+    // flight so this one does not undo it
+    memcpy(content, this->last_message_.content, 10);
+    const InFlightCommand& config = this->in_flight_[IN_FLIGHT_CONFIG];
+    if (config.active) {
+      memcpy(content, config.content, 3);
+      content[3] = (content[3] & ~CONFIG_BITS_MASK) | (config.content[3] & CONFIG_BITS_MASK);
+    }
+    this->pending_config_.apply(content);
+    this->pending_config_ = ConfigChange();
+    this->config_queued_ = false;
+  } else {
+    memcpy(content, entry.content, 10);
+  }
+
+  this->build_message(entry.type, content, out);
+  this->start_round_trip(entry.type, content);
+  this->track_in_flight(entry.type, content);
+  return true;
+}
+
+void HikeITBLEComponent::clear_write_queue() {
+  if (this->write_queue_size_ > 0) {
+    this->writes_dropped_ += this->write_queue_size_;
+    ESP_LOGD(TAG, "Discarding %u queued writes", (unsigned) this->write_queue_size_);
   }
+  this->cancel_timeout("write_queue");
+  this->write_scheduled_ = false;
+  this->write_queue_head_ = 0;
+  this->write_queue_size_ = 0;
+  this->pending_config_ = ConfigChange();
+  this->config_queued_ = false;
+  this->clear_in_flight();
+}
+
+void HikeITBLEComponent::track_in_flight(uint8_t type, const uint8_t* content) {
+  InFlightKind kind = in_flight_kind(type);
+  if (kind == IN_FLIGHT_KIND_COUNT || this->ack_timeout_ == 0) {
+    return;
+  }
+  // Replaces an older command of the same kind, this one supersedes it
+  InFlightCommand& cmd = this->in_flight_[kind];
+  cmd.active = true;
+  cmd.due = false;
+  cmd.type = type;
+  memcpy(cmd.content, content, sizeof(cmd.content));
+  cmd.attempts = 1;
+  cmd.deadline = millis() + this->ack_timeout_;
+  this->schedule_ack_check();
+}
+
+void HikeITBLEComponent::confirm_in_flight(const ParsedMessage& msg) {
+  bool confirmed = false;
+  for (InFlightCommand& cmd : this->in_flight_) {
+    if (!cmd.active) {
+      continue;
+    }
+    bool match = cmd.type == MSG_VERIFY ? msg.type == MSG_VERIFY
+                                        : msg.type == MSG_STATUS && status_reflects(msg, cmd.type, cmd.content);
+    if (!match) {
+      continue;
+    }
+    if (cmd.attempts > 1 && this->should_log(LOG_CATEGORY_COMMANDS, ESPHOME_LOG_LEVEL_DEBUG)) {
+      ESP_LOGD(TAG, "Type %02X command confirmed after %u writes", cmd.type, cmd.attempts);
+    }
+    cmd.active = false;
+    cmd.due = false;
+    confirmed = true;
+  }
+  if (confirmed) {
+    this->schedule_ack_check();
+  }
+}
+
+bool HikeITBLEComponent::has_due_retransmit() const {
+  for (const InFlightCommand& cmd : this->in_flight_) {
+    if (cmd.due) {
+      return true;
+    }
+  }
+  return false;
+}
+
+bool HikeITBLEComponent::build_retransmit(uint8_t* out) {
+  for (InFlightCommand& cmd : this->in_flight_) {
+    if (!cmd.due) {
+      continue;
+    }
+    if (this->should_log(LOG_CATEGORY_COMMANDS, ESPHOME_LOG_LEVEL_DEBUG)) {
+      ESP_LOGD(TAG, "Resending unconfirmed Type %02X command (write %u)", cmd.type, cmd.attempts + 1);
+    }
+    // Same content under a new sequence number, then wait twice as long
+    this->build_message(cmd.type, cmd.content, out);
+    this->retransmits_++;
+    cmd.due = false;
+    cmd.deadline = millis() + (this->ack_timeout_ << cmd.attempts);
+    cmd.attempts++;
+    this->schedule_ack_check();
+    return true;
+  }
+  return false;
+}
+
+void HikeITBLEComponent::check_in_flight() {
+  uint32_t now = millis();
+  for (InFlightCommand& cmd : this->in_flight_) {
+    if (!cmd.active || cmd.due || (int32_t) (cmd.deadline - now) > 0) {
+      continue;
+    }
+    if (cmd.attempts <= this->max_retransmits_) {
+      cmd.due = true;
+      continue;
+    }
+
+    cmd.active = false;
+    this->commands_lost_++;
+    if (this->should_log(LOG_CATEGORY_ERRORS, ESPHOME_LOG_LEVEL_WARN)) {
+      ESP_LOGW(TAG, "Type %02X command not confirmed after %u writes, giving up (%u lost)", cmd.type,
+               cmd.attempts, (unsigned) this->commands_lost_);
+    }
+    if (cmd.type == MSG_VERIFY && this->state_ == STATE_VERIFYING) {
+      // No session without a verify response, start over with a new link
+      this->set_state(STATE_ERROR);
+      this->parent_->disconnect();
+      return;
+    }
+  }
+  this->schedule_ack_check();
+  this->schedule_write();
+}
+
+void HikeITBLEComponent::schedule_ack_check() {
+  // One timer, for the earliest deadline still waiting
+  uint32_t now = millis();
+  bool waiting = false;
+  uint32_t wait = 0;
+  for (const InFlightCommand& cmd : this->in_flight_) {
+    if (!cmd.active || cmd.due) {
+      continue;
+    }
+    int32_t left = (int32_t) (cmd.deadline - now);
+    uint32_t remaining = left > 0 ? left : 0;
+    if (!waiting || remaining < wait) {
+      wait = remaining;
+      waiting = true;
+    }
+  }
+  if (!waiting) {
+    this->cancel_timeout("ack");
+    return;
+  }
+  this->set_timeout("ack", wait, [this]() { this->check_in_flight(); });
+}
+
+void HikeITBLEComponent::clear_in_flight() {
+  for (InFlightCommand& cmd : this->in_flight_) {
+    cmd.active = false;
+    cmd.due = false;
+  }
+  this->cancel_timeout("ack");
 }
 
 void HikeITBLEComponent::send_verify_command() {
   ESP_LOGI(TAG, "Sending verification command");
   this->set_state(STATE_VERIFYING);
 
-  uint8_t content[10] = {0x03, 0x00, 0x00, 0x00, 0x00,
-                         0x00, 0x00, 0x00, 0x00, 0x00};
-  auto cmd = this->build_message(0x09, content);
-  this->send_command(cmd);
+  uint8_t content[CONTENT_LENGTH] = {CMD_VERIFY_CONNECT};
+  this->enqueue_command(MSG_VERIFY, content);
 }
 
 void HikeITBLEComponent::send_disconnect_command() {
   ESP_LOGI(TAG, "Sending disconnect command");
 
-  uint8_t content[10] = {0x04, 0x00, 0x00, 0x00, 0x00,
-                         0x00, 0x00, 0x00, 0x00, 0x00};
-  auto cmd = this->build_message(0x09, content);
-  this->send_command(cmd);
-
-  // Disconnect after sending
-  this->set_timeout(500, [this]() { this->parent_->disconnect(); });
+  // Queued writes are moot now; the disconnect frame goes out immediately
+  // because local state is torn down before a paced write would run
+  this->clear_write_queue();
+
+  uint8_t content[CONTENT_LENGTH] = {CMD_VERIFY_DISCONNECT};
+  Frame frame;
+  this->build_message(MSG_VERIFY, content, frame.data());
+  this->send_command(frame.data(), frame.size());
+  this->last_write_ = millis();
+
+  // Disconnect after sending. With the connect switch OFF the client is
+  // disabled as well so it does not reconnect on the next advertisement.
+  this->set_timeout(500, [this]() {
+    if (this->connection_allowed_()) {
+      this->parent_->disconnect();
+    } else {
+      this->parent_->set_enabled(false);
+    }
+  });
 }
 
 void HikeITBLEComponent::send_screen_command() {
-  ESP_LOGI(TAG, "Sending screen command");
+  if (this->should_log(LOG_CATEGORY_COMMANDS, ESPHOME_LOG_LEVEL_INFO)) {
+    ESP_LOGI(TAG, "Sending screen command");
+  }
 
-  uint8_t content[10] = {0x24, 0x00, 0x00, 0x00, 0x00,
-                         0x00, 0x00, 0x00, 0x00, 0x00};
-  auto cmd = this->build_message(0x08, content);
-  this->send_command(cmd);
+  uint8_t content[CONTENT_LENGTH] = {CMD_SCREEN};
+  this->enqueue_command(MSG_SCREEN, content);
 }
 
-void HikeITBLEComponent::send_speed_model_command(SpeedModel model,
+bool HikeITBLEComponent::send_speed_model_command(SpeedModel model,
                                                   uint8_t at_flag) {
   if (!this->has_cached_state_) {
     ESP_LOGW(TAG, "No cached state, cannot send speed model command");
-    return;
+    return false;
   }
 
-  ESP_LOGI(TAG, "Sending speed model command: %s (AT=%d)",
-           speed_model_to_string(model), at_flag);
-
-  // Copy current content
-  uint8_t content[10];
-  memcpy(content, this->last_message_.content, 10);
-
-  // Modify based on model
-  if (model <= SPEED_AUTO) {
-    content[0] = model;
-    content[3] = 0;
-  } else if (model == SPEED_LAUNCH) {
-    content[3] = 1;
-  } else if (model == SPEED_ANTI_SLIP) {
-    content[3] = 2;
-  } else {
-    content[3] = 4;
+  if (this->should_log(LOG_CATEGORY_COMMANDS, ESPHOME_LOG_LEVEL_INFO)) {
+    ESP_LOGI(TAG, "Sending speed model command: %s (AT=%d)",
+             speed_model_to_string(model), at_flag);
   }
 
-  // Set AT flag
-  content[3] = content[3] | (at_flag << 7);
+  ConfigChange change;
+  change.fields = CONFIG_MODEL_BITS | CONFIG_AT_FLAG;
+  change.at_flag = at_flag;
 
-  // Clear bytes 4-6
-  content[4] = 0;
-  content[5] = 0;
-  content[6] = 0;
+  // Byte-selected models clear the model bits, the others set theirs
+  if (SPEED_MODEL_BYTE[model] != NO_MODEL) {
+    change.fields |= CONFIG_MODEL_BYTE;
+    change.model_byte = SPEED_MODEL_BYTE[model];
+  }
+  change.model_bits = SPEED_MODEL_BITS[model];
 
-  auto cmd = this->build_message(0x02, content);
-  this->send_command(cmd);
+  return this->enqueue_config(change);
 }
 
-void HikeITBLEComponent::send_step_command(uint8_t step, SpeedModel model) {
+bool HikeITBLEComponent::send_step_command(uint8_t step, SpeedModel model) {
   if (!this->has_cached_state_) {
     ESP_LOGW(TAG, "No cached state, cannot send step command");
-    return;
+    return false;
   }
 
-  ESP_LOGI(TAG, "Sending step command: %d for %s", step,
-           speed_model_to_string(model));
+  if (this->should_log(LOG_CATEGORY_COMMANDS, ESPHOME_LOG_LEVEL_INFO)) {
+    ESP_LOGI(TAG, "Sending step command: %d for %s", step,
+             speed_model_to_string(model));
+  }
 
-  // Copy current content
-  uint8_t content[10];
-  memcpy(content, this->last_message_.content, 10);
+  ConfigChange change;
 
   // Modify based on model
   if (model == SPEED_ECONOMY) {
-    content[1] = (content[1] & 0xF0) | (step & 0x0F);
+    change.fields = CONFIG_STEP_ECO;
+    change.step_economy = step;
   } else if (model == SPEED_CRUISE) {
-    content[1] = (content[1] & 0x0F) | ((step << 4) & 0xF0);
+    change.fields = CONFIG_STEP_CRUISE;
+    change.step_cruise = step;
   } else if (model == SPEED_SPORT) {
-    content[2] = (content[2] & 0xF0) | (step & 0x0F);
+    change.fields = CONFIG_STEP_SPORT;
+    change.step_sport = step;
   } else if (model == SPEED_HIKE_IT) {
-    content[2] = (content[2] & 0x0F) | ((step << 4) & 0xF0);
+    change.fields = CONFIG_STEP_HIKE;
+    change.step_hike = step;
   }
 
-  auto cmd = this->build_message(0x02, content);
-  this->send_command(cmd);
+  return this->enqueue_config(change);
 }
 
 void HikeITBLEComponent::send_auto_command(bool enable) {
@@ -458,35 +1127,35 @@ void HikeITBLEComponent::send_auto_command(bool enable) {
     return;
   }
 
-  ESP_LOGI(TAG, "Sending auto command: %s", enable ? "ON" : "OFF");
-
-  // Copy current content
-  uint8_t content[10];
-  memcpy(content, this->last_message_.content, 10);
+  if (this->should_log(LOG_CATEGORY_COMMANDS, ESPHOME_LOG_LEVEL_INFO)) {
+    ESP_LOGI(TAG, "Sending auto command: %s", enable ? "ON" : "OFF");
+  }
 
   // Set/clear AT flag in byte 3, bit 7
-  content[3] = (content[3] & 0x3F) | ((enable ? 1 : 0) << 7);
-
-  // Clear bytes 4-6
-  content[4] = 0;
-  content[5] = 0;
-  content[6] = 0;
+  ConfigChange change;
+  change.fields = CONFIG_AT_FLAG;
+  change.at_flag = enable ? 1 : 0;
 
-  auto cmd = this->build_message(0x02, content);
-  this->send_command(cmd);
+  this->enqueue_config(change);
 }
 
-void HikeITBLEComponent::send_safe_mode_command(const std::string& password,
+bool HikeITBLEComponent::send_safe_mode_command(const std::string& password,
                                                 bool enable) {
-  ESP_LOGI(TAG, "Sending safe mode command: %s with PIN: %s",
-           enable ? "LOCK" : "UNLOCK", password.c_str());
-
-  // Validate and pad password to 4 digits
-  std::string pwd = "0000" + password;
-  pwd = pwd.substr(pwd.length() - 4);
+  if (this->should_log(LOG_CATEGORY_COMMANDS, ESPHOME_LOG_LEVEL_INFO)) {
+    ESP_LOGI(TAG, "Sending safe mode command: %s", enable ? "LOCK" : "UNLOCK");
+  }
 
-  // Convert to hex
-  uint16_t pwd_value = std::stoi(pwd);
+  // Last 4 digits as a decimal value, shorter PINs are zero padded
+  uint16_t pwd_value = 0;
+  size_t start = password.length() > 4 ? password.length() - 4 : 0;
+  for (size_t i = start; i < password.length(); i++) {
+    char c = password[i];
+    if (c < '0' || c > '9') {
+      ESP_LOGW(TAG, "PIN must be numeric");
+      return false;
+    }
+    pwd_value = pwd_value * 10 + (c - '0');
+  }
 
   // Byte swap (little-endian)
   uint8_t pwd_low = pwd_value & 0xFF;
@@ -496,92 +1165,541 @@ void HikeITBLEComponent::send_safe_mode_command(const std::string& password,
   uint8_t content[10] = {pwd_low, pwd_high, pwd_low, pwd_high, 0x00,
                          0x00,    0x00,     0x00,    0x00,     0x00};
 
-  uint8_t type = enable ? 0x05 : 0x06;
-  auto cmd = this->build_message(type, content);
-  this->send_command(cmd);
+  uint8_t type = enable ? MSG_LOCK : MSG_UNLOCK;
+  return this->enqueue_command(type, content);
 }
 
 void HikeITBLEComponent::handle_notification(const uint8_t* data,
                                              uint16_t length) {
-  ESP_LOGD(TAG, "Received notification: %s", format_hex(data, length).c_str());
-
-  // Handle single (19 bytes) or double (38 bytes) messages
-  if (length == MESSAGE_LENGTH) {
-    this->process_message(data);
-  } else if (length == MESSAGE_LENGTH * 2) {
-    // Split into two messages
-    this->process_message(data);
-    this->process_message(data + MESSAGE_LENGTH);
-  } else {
-    ESP_LOGW(TAG, "Unexpected message length: %d", length);
+  if (this->should_log(LOG_CATEGORY_FRAMES, ESPHOME_LOG_LEVEL_DEBUG)) {
+    ESP_LOGD(TAG, "Received notification: %s", format_hex(data, length).c_str());
+  }
+
+  // Notifications may hold any number of frames, or only part of one.
+  // Feed the reassembler and drain it until the whole notification is consumed.
+  uint32_t rejects = this->reassembler_.get_checksum_rejects();
+  uint32_t discarded = this->reassembler_.get_discarded_bytes();
+  uint8_t frame[MESSAGE_LENGTH];
+  size_t remaining = length;
+  while (remaining > 0) {
+    size_t accepted = this->reassembler_.push(data, remaining);
+    data += accepted;
+    remaining -= accepted;
+    while (this->reassembler_.next(frame)) {
+#ifdef USE_HIKEIT_BLE_CAPTURE
+      if (this->capture_ != nullptr) {
+        this->capture_frame(CAPTURE_RX, frame);
+      }
+#endif
+      this->process_message(frame);
+    }
+  }
+
+  if (this->reassembler_.get_discarded_bytes() != discarded &&
+      this->should_log(LOG_CATEGORY_ERRORS, ESPHOME_LOG_LEVEL_WARN)) {
+    ESP_LOGW(TAG, "Resynced stream: dropped %u bytes, %u checksum rejects",
+             (unsigned) (this->reassembler_.get_discarded_bytes() - discarded),
+             (unsigned) (this->reassembler_.get_checksum_rejects() - rejects));
   }
 }
 
 void HikeITBLEComponent::process_message(const uint8_t* data) {
   ParsedMessage msg;
   if (!this->parse_message(data, MESSAGE_LENGTH, msg)) {
-    ESP_LOGW(TAG, "Failed to parse message");
+    if (this->should_log(LOG_CATEGORY_ERRORS, ESPHOME_LOG_LEVEL_WARN)) {
+      ESP_LOGW(TAG, "Failed to parse message");
+    }
     return;
   }
 
-  ESP_LOGI(TAG, "Parsed message - Type: 0x%02X, Count: %d, ID: %08X", msg.type,
-           msg.count, msg.device_id);
+  if (this->should_log(LOG_CATEGORY_FRAMES, ESPHOME_LOG_LEVEL_VERBOSE)) {
+    ESP_LOGV(TAG, "Parsed message - Type: 0x%02X, Count: %d, ID: %08X", msg.type,
+             msg.count, msg.device_id);
+  }
+  this->frames_received_++;
+
+  // The host continues from the device's sequence counter during
+  // registration (protocol.md section 3.2). A restored session skips
+  // registration and syncs on its first frame instead.
+  if (!this->sequence_synced_ || this->state_ != STATE_VERIFIED) {
+    this->sequence_counter_ = (uint8_t) (msg.count + 1);
+    this->sequence_synced_ = true;
+  }
+
+  // Settle commands this frame confirms before acting on it
+  if (msg.type == MSG_STATUS || msg.type == MSG_VERIFY) {
+    this->confirm_in_flight(msg);
+  }
+
+  // A restored session must match the device that actually answers,
+  // otherwise fall back to the full handshake
+  if (this->session_restored_ && msg.device_id != 0 &&
+      msg.device_id != this->device_id_) {
+    ESP_LOGW(TAG, "Device ID %08X does not match cached %08X", msg.device_id,
+             this->device_id_);
+    this->invalidate_session("device ID mismatch");
+    this->session_restored_ = false;
+    this->device_id_ = 0;
+    this->set_state(STATE_CONNECTED);
+  }
 
   // Extract device ID from first response
   if (this->device_id_ == 0 && msg.device_id != 0) {
     this->device_id_ = msg.device_id;
     ESP_LOGI(TAG, "Device ID captured: %08X", this->device_id_);
+
+    // The verify request needs the device ID, send it now
+    if (this->state_ == STATE_CONNECTED) {
+      this->cancel_timeout("verify");
+      this->send_verify_command();
+    }
   }
 
   // Handle verification response (Type 09)
-  if (msg.type == 0x09) {
+  if (msg.type == MSG_VERIFY) {
     if (msg.content[0] != 0) {
       ESP_LOGI(TAG, "Device VERIFIED!");
+      this->reconnect_attempt_ = 0;
+      this->verify_time_ = millis() - this->connect_started_;
       this->set_state(STATE_VERIFIED);
+      this->save_session();
+#ifdef USE_HIKEIT_BLE_ON_VERIFIED
       this->verified_callbacks_.call();
+#endif
     } else {
       ESP_LOGW(TAG, "Verification FAILED!");
+      this->invalidate_session("verification failed");
       this->set_state(STATE_ERROR);
+
+      // Drop the link, the disconnect event schedules a backed-off retry
+      this->parent_->disconnect();
     }
   }
 
-  // Cache state from Type 02 messages
-  if (msg.type == 0x02) {
-    this->last_message_ = msg;
-    this->has_cached_state_ = true;
+  // Cache state from Type 02 messages. Every field is derived from the
+  // content bytes, so identical content means nothing changed.
+  if (msg.type == MSG_STATUS) {
+    if (this->rtt_pending_) {
+      this->check_round_trip(msg);
+    }
+    if (this->has_optimistic_) {
+      this->reconcile_optimistic(msg);
+    }
 
-    // Update entities with received state
-    if (this->speed_select_ != nullptr) {
-      this->speed_select_->publish_state(
-          speed_model_to_string(msg.speed_model));
+    if (this->has_cached_state_ && !this->publish_all_ &&
+        memcmp(msg.content, this->last_message_.content, 10) == 0) {
+      this->last_message_.count = msg.count;
+      this->last_message_.checksum = msg.checksum;
+      if (this->status_log_ == STATUS_LOG_ALL) {
+        this->log_status(msg);
+      }
+    } else {
+      this->publish_changes(msg);
+#ifdef USE_HIKEIT_BLE_CHANGE_TRIGGERS
+      this->trigger_changes(msg);
+#endif
+      this->last_message_ = msg;
+      this->has_cached_state_ = true;
+      this->publish_all_ = false;
+      if (this->status_log_ != STATUS_LOG_NONE) {
+        this->log_status(msg);
+      }
     }
+  }
+
+#ifdef USE_HIKEIT_BLE_ON_MESSAGE
+  // Trigger message callback, formatting only when someone listens
+  if (this->message_callbacks_.size() > 0) {
+    std::string hex_msg = format_hex(data, MESSAGE_LENGTH);
+    this->message_callbacks_.call(hex_msg);
+  }
+#endif
+}
+
+void HikeITBLEComponent::log_status(const ParsedMessage& msg) {
+  if (!this->should_log(LOG_CATEGORY_STATUS, ESPHOME_LOG_LEVEL_INFO)) {
+    return;
+  }
+  ESP_LOGI(TAG, "Status: %s, Steps Eco=%d Cruise=%d Sport=%d Hike=%d, Deep CX=%d SC=%d, "
+           "Version %.1f, Locked: %s, AT: %d",
+           speed_model_to_string(msg.speed_model), msg.step_economy, msg.step_cruise,
+           msg.step_sport, msg.step_hike, msg.deep_cx, msg.deep_sc, msg.version,
+           msg.is_safe_model ? "YES" : "NO", msg.at_flag);
+}
+
+bool HikeITBLEComponent::should_log(LogCategory category, int level) {
+  return log_level_enabled(level) && this->log_buckets_[category].take(millis());
+}
+
+void HikeITBLEComponent::log_summary() {
+  uint32_t checksum_rejects = this->get_checksum_rejects();
+  uint32_t framing_rejects = this->get_framing_rejects();
+  uint32_t suppressed = 0;
+  for (const LogBucket &bucket : this->log_buckets_) {
+    suppressed += bucket.suppressed;
+  }
+  ESP_LOGI(TAG, "Last %ums: %u frames, %u checksum rejects, %u framing rejects, %u writes, "
+           "%u retransmits, %u log lines suppressed",
+           (unsigned) this->log_summary_interval_,
+           (unsigned) (this->frames_received_ - this->summary_frames_),
+           (unsigned) (checksum_rejects - this->summary_checksum_rejects_),
+           (unsigned) (framing_rejects - this->summary_framing_rejects_),
+           (unsigned) (this->writes_sent_ - this->summary_writes_),
+           (unsigned) (this->retransmits_ - this->summary_retransmits_),
+           (unsigned) (suppressed - this->summary_suppressed_));
+  this->summary_frames_ = this->frames_received_;
+  this->summary_checksum_rejects_ = checksum_rejects;
+  this->summary_framing_rejects_ = framing_rejects;
+  this->summary_writes_ = this->writes_sent_;
+  this->summary_retransmits_ = this->retransmits_;
+  this->summary_suppressed_ = suppressed;
+}
+
+void HikeITBLEComponent::publish_changes(const ParsedMessage& msg) {
+  const ParsedMessage& prev = this->last_message_;
+  bool all = this->publish_all_ || !this->has_cached_state_;
+
+  // Update entities whose value changed
+#ifdef USE_HIKEIT_BLE_SELECT
+  // Fields still waiting for confirmation keep their optimistic value
+  if (this->speed_select_ != nullptr && !this->optimistic_[OPTIMISTIC_MODEL].pending &&
+      (all || msg.speed_model != prev.speed_model)) {
+    this->speed_select_->publish_state(speed_model_to_string(msg.speed_model));
+  }
+#endif
+
+#ifdef USE_HIKEIT_BLE_NUMBER
+  if (this->step_number_ != nullptr && !this->optimistic_[OPTIMISTIC_STEP].pending &&
+      (all || active_step(msg) != active_step(prev))) {
+    this->step_number_->publish_state(active_step(msg));
+  }
+#endif
+
+#ifdef USE_HIKEIT_BLE_SWITCH
+  if (this->locked_switch_ != nullptr && !this->optimistic_[OPTIMISTIC_LOCK].pending &&
+      (all || msg.is_safe_model != prev.is_safe_model)) {
+    this->locked_switch_->publish_state(msg.is_safe_model);
+  }
+#endif
+}
+
+#ifdef USE_HIKEIT_BLE_CHANGE_TRIGGERS
+void HikeITBLEComponent::trigger_changes(const ParsedMessage& msg) {
+  // The first status after boot is the baseline; later ones, including
+  // the first after a reconnect, fire for what changed in between
+  if (!this->has_cached_state_) {
+    return;
+  }
+  const ParsedMessage& prev = this->last_message_;
+
+#ifdef USE_HIKEIT_BLE_ON_SPEED_MODEL_CHANGE
+  if (msg.speed_model != prev.speed_model) {
+    this->speed_model_change_callbacks_.call(msg.speed_model, prev.speed_model);
+  }
+#endif
+
+#ifdef USE_HIKEIT_BLE_ON_STEP_CHANGE
+  // A model change that lands on a different step reports that step too
+  if (active_step(msg) != active_step(prev)) {
+    this->step_change_callbacks_.call(active_step(msg), msg.speed_model);
+  }
+#endif
+
+#ifdef USE_HIKEIT_BLE_ON_LOCK_CHANGE
+  if (msg.is_safe_model != prev.is_safe_model) {
+    this->lock_change_callbacks_.call(msg.is_safe_model);
+  }
+#endif
+
+#ifdef USE_HIKEIT_BLE_ON_NOTICE
+  if (msg.notice != prev.notice) {
+    this->notice_callbacks_.call(msg.notice);
+  }
+#endif
+
+#ifdef USE_HIKEIT_BLE_ON_STUDY_PROGRESS
+  if (msg.study_state != prev.study_state || msg.study_time != prev.study_time) {
+    this->study_progress_callbacks_.call(msg.study_state, msg.study_time);
+  }
+#endif
+}
+#endif  // USE_HIKEIT_BLE_CHANGE_TRIGGERS
+
+void HikeITBLEComponent::request_speed_model(SpeedModel model) {
+  if (!this->has_cached_state_) {
+    ESP_LOGW(TAG, "No cached state, cannot send speed model command");
+    return;
+  }
+  if (this->send_speed_model_command(model, this->last_message_.at_flag)) {
+    this->start_optimistic(OPTIMISTIC_MODEL, model);
+  }
+}
+
+void HikeITBLEComponent::request_step(uint8_t step) {
+  if (!this->has_cached_state_) {
+    ESP_LOGW(TAG, "No cached state, cannot send step command");
+    return;
+  }
+  // A model change still in flight is the model the step belongs to
+  const OptimisticValue& model = this->optimistic_[OPTIMISTIC_MODEL];
+  if (this->send_step_command(step, model.pending ? (SpeedModel) model.value : this->last_message_.speed_model)) {
+    this->start_optimistic(OPTIMISTIC_STEP, step);
+  }
+}
+
+void HikeITBLEComponent::request_locked(bool locked) {
+  // Only a queued command can be confirmed, a rejected PIN or a full
+  // queue leaves the entity as it was
+  if (this->send_safe_mode_command(this->pin_, locked)) {
+    this->start_optimistic(OPTIMISTIC_LOCK, locked);
+  }
+}
 
-    if (this->locked_switch_ != nullptr) {
-      this->locked_switch_->publish_state(msg.is_safe_model);
+void HikeITBLEComponent::start_optimistic(OptimisticField field, uint8_t value) {
+  if (this->optimistic_timeout_ == 0 || !this->is_verified()) {
+    return;
+  }
+  // A newer request replaces the pending one and restarts its deadline
+  OptimisticValue& pending = this->optimistic_[field];
+  pending.pending = true;
+  pending.value = value;
+  pending.started = millis();
+  this->has_optimistic_ = true;
+  this->publish_field(field, value);
+  this->set_timeout(OPTIMISTIC_TIMEOUTS[field], this->optimistic_timeout_,
+                    [this, field]() { this->rollback_optimistic(field); });
+}
+
+void HikeITBLEComponent::reconcile_optimistic(const ParsedMessage& msg) {
+  // A status that does not show the value yet may predate the write, so
+  // only the deadline rolls a value back
+  uint32_t now = millis();
+  bool pending_left = false;
+  for (uint8_t i = 0; i < OPTIMISTIC_FIELD_COUNT; i++) {
+    OptimisticField field = (OptimisticField) i;
+    OptimisticValue& pending = this->optimistic_[field];
+    if (!pending.pending) {
+      continue;
+    }
+    if (optimistic_field_value(msg, field) != pending.value) {
+      pending_left = true;
+      continue;
+    }
+    pending.pending = false;
+    this->cancel_timeout(OPTIMISTIC_TIMEOUTS[field]);
+    uint32_t elapsed = now - pending.started;
+    this->confirm_time_max_ = this->confirm_time_valid_ ? std::max(this->confirm_time_max_, elapsed) : elapsed;
+    this->confirm_time_valid_ = true;
+    if (this->should_log(LOG_CATEGORY_COMMANDS, ESPHOME_LOG_LEVEL_DEBUG)) {
+      ESP_LOGD(TAG, "Confirmed %s %s in %ums", optimistic_field_to_string(field),
+               optimistic_value_to_string(field, pending.value).c_str(), (unsigned) elapsed);
     }
+  }
+  this->has_optimistic_ = pending_left;
+}
 
-    // Log detailed info
-    ESP_LOGI(TAG, "  Speed Model: %s", speed_model_to_string(msg.speed_model));
-    ESP_LOGI(TAG, "  Steps: Eco=%d, Cruise=%d, Sport=%d, Hike=%d",
-             msg.step_economy, msg.step_cruise, msg.step_sport, msg.step_hike);
-    ESP_LOGI(TAG, "  Deep: CX=%d, SC=%d", msg.deep_cx, msg.deep_sc);
-    ESP_LOGI(TAG, "  Version: %.1f, Locked: %s, AT: %d", msg.version,
-             msg.is_safe_model ? "YES" : "NO", msg.at_flag);
+void HikeITBLEComponent::rollback_optimistic(OptimisticField field) {
+  OptimisticValue& pending = this->optimistic_[field];
+  if (!pending.pending) {
+    return;
+  }
+  pending.pending = false;
+  this->cancel_timeout(OPTIMISTIC_TIMEOUTS[field]);
+  this->commands_failed_++;
+  if (this->should_log(LOG_CATEGORY_ERRORS, ESPHOME_LOG_LEVEL_WARN)) {
+    ESP_LOGW(TAG, "%s %s not confirmed within %ums, reverting", optimistic_field_to_string(field),
+             optimistic_value_to_string(field, pending.value).c_str(), (unsigned) this->optimistic_timeout_);
   }
+  if (this->has_cached_state_) {
+    this->publish_field(field, optimistic_field_value(this->last_message_, field));
+  }
+#ifdef USE_HIKEIT_BLE_ON_COMMAND_FAILED
+  this->command_failed_callbacks_.call(field, pending.value);
+#endif
+}
 
-  // Trigger message callback
-  std::string hex_msg = format_hex(data, MESSAGE_LENGTH);
-  this->message_callbacks_.call(hex_msg);
+void HikeITBLEComponent::publish_field(OptimisticField field, uint8_t value) {
+  switch (field) {
+    case OPTIMISTIC_MODEL:
+#ifdef USE_HIKEIT_BLE_SELECT
+      if (this->speed_select_ != nullptr) {
+        this->speed_select_->publish_state(speed_model_to_string((SpeedModel) value));
+      }
+#endif
+      break;
+    case OPTIMISTIC_STEP:
+#ifdef USE_HIKEIT_BLE_NUMBER
+      if (this->step_number_ != nullptr) {
+        this->step_number_->publish_state(value);
+      }
+#endif
+      break;
+    default:
+#ifdef USE_HIKEIT_BLE_SWITCH
+      if (this->locked_switch_ != nullptr) {
+        this->locked_switch_->publish_state(value != 0);
+      }
+#endif
+      break;
+  }
 }
 
-bool HikeITBLEComponent::parse_message(const uint8_t* data, size_t len,
-                                       ParsedMessage& msg) {
-  if (len != MESSAGE_LENGTH) {
+bool HikeITBLEComponent::take_confirm_time(uint32_t& max) {
+  if (!this->confirm_time_valid_) {
     return false;
   }
+  max = this->confirm_time_max_;
+  this->confirm_time_valid_ = false;
+  return true;
+}
+
+void HikeITBLEComponent::start_round_trip(uint8_t type, const uint8_t* content) {
+  // Only commands the device reflects in its status can be timed. A
+  // newer command restarts the measurement, it supersedes the older one.
+  if (type != MSG_STATUS && type != MSG_LOCK && type != MSG_UNLOCK) {
+    return;
+  }
+  this->rtt_pending_ = true;
+  this->rtt_type_ = type;
+  memcpy(this->rtt_content_, content, sizeof(this->rtt_content_));
+  this->rtt_started_ = millis();
+}
+
+void HikeITBLEComponent::check_round_trip(const ParsedMessage& msg) {
+  uint32_t elapsed = millis() - this->rtt_started_;
+  if (elapsed > RTT_TIMEOUT) {
+    this->rtt_pending_ = false;
+    return;
+  }
+
+  if (!status_reflects(msg, this->rtt_type_, this->rtt_content_)) {
+    return;
+  }
+
+  this->rtt_pending_ = false;
+  if (this->rtt_sample_count_ < RTT_SAMPLE_COUNT) {
+    this->rtt_samples_[this->rtt_sample_count_++] = std::min<uint32_t>(elapsed, UINT16_MAX);
+  }
+}
+
+bool HikeITBLEComponent::take_round_trip_stats(uint32_t& p50, uint32_t& max) {
+  if (this->rtt_sample_count_ == 0) {
+    return false;
+  }
+
+  auto begin = this->rtt_samples_.begin();
+  auto end = begin + this->rtt_sample_count_;
+  auto mid = begin + this->rtt_sample_count_ / 2;
+  std::nth_element(begin, mid, end);
+  p50 = *mid;
+  max = *std::max_element(begin, end);
+  this->rtt_sample_count_ = 0;
+  return true;
+}
+
+#ifdef USE_HIKEIT_BLE_CAPTURE
+void HikeITBLEComponent::capture_frame(CaptureDirection direction,
+                                       const uint8_t* frame) {
+  // The ring is frozen while it is being dumped
+  if (this->capture_dumping_) {
+    this->capture_skipped_++;
+    return;
+  }
+
+  size_t index = (this->capture_head_ + this->capture_count_) % this->capture_capacity_;
+  if (this->capture_count_ == this->capture_capacity_) {
+    // Full, overwrite the oldest record
+    this->capture_head_ = (this->capture_head_ + 1) % this->capture_capacity_;
+  } else {
+    this->capture_count_++;
+  }
+
+  CaptureRecord& record = this->capture_[index];
+  record.timestamp = millis();
+  record.direction = direction;
+  memcpy(record.frame, frame, MESSAGE_LENGTH);
+}
+
+void HikeITBLEComponent::dump_capture() {
+  if (this->capture_ == nullptr) {
+    ESP_LOGW(TAG, "Frame capture is not enabled (set capture_size)");
+    return;
+  }
+  if (this->capture_dumping_) {
+    return;
+  }
+
+  // Header line first, then the records oldest to newest. Lines are
+  // numbered so a reader can detect lines dropped by the logger.
+  uint8_t header[CAPTURE_HEADER_SIZE] = {'H', 'K', 'C', 'P', CAPTURE_VERSION,
+                                         CAPTURE_RECORD_SIZE, 0, 0};
+  uint32_t count = this->capture_count_;
+  for (size_t i = 0; i < 4; i++) {
+    header[8 + i] = (count >> (i * 8)) & 0xFF;
+  }
+
+  ESP_LOGI(TAG, "CAPTURE BEGIN %u frames", (unsigned) count);
+  ESP_LOGI(TAG, "CAPTURE 0 %s", base64_encode(header, sizeof(header)).c_str());
+
+  this->capture_dumping_ = true;
+  this->capture_skipped_ = 0;
+  this->capture_dump_index_ = 0;
+  this->capture_dump_line_ = 1;
+
+  // Spread the lines over several loop iterations so the logger keeps up
+  this->set_interval("capture_dump", 20, [this]() { this->dump_capture_lines(); });
+}
+
+void HikeITBLEComponent::dump_capture_lines() {
+  uint8_t buffer[CAPTURE_RECORDS_PER_LINE * CAPTURE_RECORD_SIZE];
+
+  for (size_t line = 0; line < CAPTURE_LINES_PER_TICK; line++) {
+    if (this->capture_dump_index_ >= this->capture_count_) {
+      ESP_LOGI(TAG, "CAPTURE END (%u frames not captured during dump)",
+               (unsigned) this->capture_skipped_);
+      this->cancel_interval("capture_dump");
+      this->capture_dumping_ = false;
+      return;
+    }
+
+    size_t length = 0;
+    for (size_t i = 0; i < CAPTURE_RECORDS_PER_LINE &&
+                       this->capture_dump_index_ < this->capture_count_;
+         i++) {
+      size_t index = (this->capture_head_ + this->capture_dump_index_++) %
+                     this->capture_capacity_;
+      const CaptureRecord& record = this->capture_[index];
+      uint8_t* out = buffer + length;
+      out[0] = record.timestamp & 0xFF;
+      out[1] = (record.timestamp >> 8) & 0xFF;
+      out[2] = (record.timestamp >> 16) & 0xFF;
+      out[3] = (record.timestamp >> 24) & 0xFF;
+      out[4] = record.direction;
+      memcpy(out + 5, record.frame, MESSAGE_LENGTH);
+      length += CAPTURE_RECORD_SIZE;
+    }
+
+    ESP_LOGI(TAG, "CAPTURE %u %s", (unsigned) this->capture_dump_line_++,
+             base64_encode(buffer, length).c_str());
+  }
+}
 
-  // Check header
-  if (data[0] != HEADER_BYTE_1 || data[1] != HEADER_BYTE_2) {
+void HikeITBLEComponent::clear_capture() {
+  if (this->capture_dumping_) {
+    this->cancel_interval("capture_dump");
+    this->capture_dumping_ = false;
+  }
+  this->capture_head_ = 0;
+  this->capture_count_ = 0;
+}
+#endif  // USE_HIKEIT_BLE_CAPTURE
+
+bool HikeITBLEComponent::parse_message(const uint8_t* data, size_t len,
+                                       ParsedMessage& msg) {
+  // Frames from notifications arrive here already checked by the
+  // reassembler, which counts the rejects. These checks are for direct
+  // callers with raw frames (the host decode driver).
+  if (len != MESSAGE_LENGTH || data[0] != HEADER_BYTE_1 || data[1] != HEADER_BYTE_2) {
     return false;
   }
 
@@ -594,15 +1712,12 @@ bool HikeITBLEComponent::parse_message(const uint8_t* data, size_t len,
   msg.checksum = data[18];
 
   // Verify checksum
-  uint8_t calc_checksum = this->calculate_checksum(&data[2], 16);
-  if (calc_checksum != msg.checksum) {
-    ESP_LOGW(TAG, "Checksum mismatch: expected %02X, got %02X", calc_checksum,
-             msg.checksum);
+  if (this->calculate_checksum(&data[2], 16) != msg.checksum) {
     return false;
   }
 
   // Parse Type 02 specific data
-  if (msg.type == 0x02) {
+  if (msg.type == MSG_STATUS) {
     this->parse_type02(data, msg);
   }
 
@@ -610,75 +1725,132 @@ bool HikeITBLEComponent::parse_message(const uint8_t* data, size_t len,
 }
 
 void HikeITBLEComponent::parse_type02(const uint8_t* data, ParsedMessage& msg) {
-  uint8_t b1 = data[5];  // content[1]
-  uint8_t b2 = data[6];  // content[2]
-  uint8_t b3 = data[7];  // content[3]
-
-  uint8_t b3_val = b3 & 0xFF;
-  msg.at_flag = b3_val >> 7;
-  msg.support_sl = ((b3_val >> 4) & 1) == 1;
-
-  // Determine speed model
-  if ((b3 & 0x07) == 0) {
-    uint8_t model_byte = data[4];  // content[0]
-
-    if (model_byte == 0) {
-      msg.speed_model = SPEED_ECONOMY;
-      msg.step_economy = b1 & 0x0F;
-    } else if (model_byte == 1) {
-      msg.speed_model = SPEED_NORMAL;
-    } else if (model_byte == 2) {
-      msg.speed_model = SPEED_CRUISE;
-      msg.step_cruise = ((b1 & 0xFF) >> 4) & 0x0F;
-    } else if (model_byte == 3) {
-      msg.speed_model = SPEED_SPORT;
-      msg.step_sport = b2 & 0x0F;
-    } else if (model_byte == 4) {
-      msg.speed_model = SPEED_HIKE_IT;
-      msg.step_hike = ((b2 & 0xFF) >> 4) & 0x0F;
-    } else if (model_byte == 5) {
-      msg.speed_model = SPEED_AUTO;
-    }
-  } else if ((b3 & 0x01) == 1) {
-    msg.speed_model = SPEED_LAUNCH;
-  } else if (((b3_val >> 1) & 1) == 1) {
-    msg.speed_model = SPEED_ANTI_SLIP;
-  } else if (((b3_val >> 2) & 1) == 1) {
-    msg.speed_model = SPEED_VALET;
-  } else if (((b3_val >> 3) & 1) == 1) {
-    msg.speed_model = SPEED_SL;
+  const uint8_t* content = &data[4];
+
+  msg.at_flag = get_field(content, FIELD_AT_FLAG);
+  msg.support_sl = get_field(content, FIELD_SUPPORT_SL) == 1;
+
+  // Determine speed model; only the active model's step is reported
+  SpeedModel model;
+  if (decode_speed_model(content, model)) {
+    msg.speed_model = model;
+    uint8_t step = get_field(content, SPEED_MODEL_STEP[model]);
+    switch (model) {
+      case SPEED_ECONOMY:
+        msg.step_economy = step;
+        break;
+      case SPEED_CRUISE:
+        msg.step_cruise = step;
+        break;
+      case SPEED_SPORT:
+        msg.step_sport = step;
+        break;
+      case SPEED_HIKE_IT:
+        msg.step_hike = step;
+        break;
+      default:
+        break;
+    }
   }
 
   // Parse additional data
-  msg.deep_cx = data[8] & 0xFF;
-  msg.deep_sc = data[9] & 0xFF;
+  msg.deep_cx = get_field(content, FIELD_DEEP_CX);
+  msg.deep_sc = get_field(content, FIELD_DEEP_SC);
 
-  uint8_t b10 = data[10];
-  uint8_t study_high = b10 >> 4;
+  uint8_t study_high = get_field(content, FIELD_STUDY_PHASE);
+  uint8_t study_low = get_field(content, FIELD_STUDY_TIME);
   if (study_high == 1) {
     msg.study_state = 1;
-    msg.study_time = b10 & 0x0F;
+    msg.study_time = study_low;
   } else if (study_high > 1) {
-    msg.study_state = (b10 & 0x0F) == 0 ? 0 : 3;
+    msg.study_state = study_low == 0 ? 0 : 3;
   }
 
-  msg.version = data[11] / 10.0f;
-  msg.is_safe_model = data[12] == 0;
+  msg.version = get_field(content, FIELD_VERSION) / 10.0f;
+  msg.is_safe_model = get_field(content, FIELD_UNLOCKED) == 0;
+  msg.notice = decode_notice(content);
+}
+
+void HikeITBLEComponent::load_session() {
+  // One preference slot per configured device
+  uint32_t hash = fnv1_hash("hikeit_ble_session") ^ (uint32_t) this->address_ ^
+                  (uint32_t) (this->address_ >> 32);
+  this->session_pref_ = global_preferences->make_preference<SessionCache>(hash, true);
 
-  uint8_t b13 = data[13];
-  if (((b13 >> 2) & 1) == 1) {
-    msg.notice = "C1";
-  } else if (((b13 >> 3) & 1) == 1) {
-    msg.notice = "C2";
-  } else if (((b13 >> 4) & 1) == 1) {
-    msg.notice = "C3";
+  SessionCache cache{};
+  if (!this->session_pref_.load(&cache) || !cache.verified ||
+      cache.address != this->address_ || cache.device_id == 0) {
+    return;
   }
+
+  this->session_ = cache;
+  ESP_LOGD(TAG, "Loaded session: ID %08X, handle 0x%04X", cache.device_id,
+           cache.char_handle);
+}
+
+void HikeITBLEComponent::save_session() {
+  if (!this->session_cache_enabled_) {
+    return;
+  }
+
+  SessionCache cache{};
+  cache.address = this->address_;
+  cache.device_id = this->device_id_;
+  cache.char_handle = this->char_handle_;
+  cache.verified = true;
+
+  // Avoid flash writes when nothing changed
+  if (this->session_.verified && this->session_.device_id == cache.device_id &&
+      this->session_.char_handle == cache.char_handle) {
+    return;
+  }
+
+  this->session_ = cache;
+  if (!this->session_pref_.save(&this->session_)) {
+    ESP_LOGW(TAG, "Failed to save session");
+    return;
+  }
+  ESP_LOGD(TAG, "Saved session: ID %08X, handle 0x%04X", cache.device_id,
+           cache.char_handle);
+}
+
+void HikeITBLEComponent::invalidate_session(const char* reason) {
+  if (!this->session_.verified) {
+    return;
+  }
+
+  ESP_LOGW(TAG, "Discarding cached session: %s", reason);
+  this->session_ = SessionCache{};
+  this->session_pref_.save(&this->session_);
+}
+
+bool HikeITBLEComponent::restore_session() {
+  if (!this->session_.verified || this->char_handle_ != this->session_.char_handle) {
+    return false;
+  }
+
+  // Already verified with this device; the first status frame confirms
+  // the device ID and falls back to the handshake if it differs
+  ESP_LOGI(TAG, "Restored verified session, skipping verification");
+  this->device_id_ = this->session_.device_id;
+  this->session_restored_ = true;
+  this->reconnect_attempt_ = 0;
+  this->verify_time_ = millis() - this->connect_started_;
+  this->set_state(STATE_VERIFIED);
+#ifdef USE_HIKEIT_BLE_ON_VERIFIED
+  this->verified_callbacks_.call();
+#endif
+  return true;
 }
 
 bool HikeITBLEComponent::connection_allowed_() const {
+#ifdef USE_HIKEIT_BLE_CONNECT_SWITCH
   // If no switch configured, always allow connection
   if (this->connect_switch_ == nullptr) return true;
   return this->connect_switch_->state;
+#else
+  return true;
+#endif
 }
 
 }  // namespace hikeit_ble
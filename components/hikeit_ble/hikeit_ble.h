@@ -3,11 +3,23 @@
 #include "esphome/core/component.h"
 #include "esphome/core/log.h"
 #include "esphome/core/automation.h"
+#include "esphome/core/preferences.h"
 #include "esphome/components/ble_client/ble_client.h"
-#include <vector>
+#include "hikeit_protocol.h"
+#include <array>
+#include <memory>
 #include <string>
+#include <type_traits>
 
+#ifdef USE_HIKEIT_BLE_CONNECT_SWITCH
 #include "esphome/components/switch/switch.h"
+#endif
+
+#if defined(USE_HIKEIT_BLE_ON_SPEED_MODEL_CHANGE) || defined(USE_HIKEIT_BLE_ON_STEP_CHANGE) || \
+    defined(USE_HIKEIT_BLE_ON_LOCK_CHANGE) || defined(USE_HIKEIT_BLE_ON_NOTICE) || \
+    defined(USE_HIKEIT_BLE_ON_STUDY_PROGRESS)
+#define USE_HIKEIT_BLE_CHANGE_TRIGGERS
+#endif
 
 namespace esphome {
 namespace hikeit_ble {
@@ -18,10 +30,34 @@ static const char *const TAG = "hikeit_ble";
 static const char *SERVICE_UUID = "0000ffe0-0000-1000-8000-00805f9b34fb";
 static const char *NOTIFY_UUID = "0000ffe1-0000-1000-8000-00805f9b34fb";
 
-// Protocol constants
-static const uint8_t HEADER_BYTE_1 = 0xAA;
-static const uint8_t HEADER_BYTE_2 = 0x55;
-static const uint8_t MESSAGE_LENGTH = 19;
+// One complete frame, built in place
+using Frame = std::array<uint8_t, MESSAGE_LENGTH>;
+
+// Outbound write queue depth
+static const size_t WRITE_QUEUE_SIZE = 8;
+
+// Frames packed into one write at most, and the ATT header the MTU must
+// leave room for. Every link starts at the default MTU, one frame per write.
+static const size_t MAX_FRAMES_PER_WRITE = 4;
+static const uint16_t ATT_HEADER_LENGTH = 3;
+static const uint16_t DEFAULT_MTU = 23;
+
+// Reassembly ring buffer size (power of two, must exceed MESSAGE_LENGTH)
+static const size_t REASSEMBLY_BUFFER_SIZE = 128;
+
+// Round-trip samples kept between metric sensor updates
+static const size_t RTT_SAMPLE_COUNT = 32;
+// Give up on matching a command to its reflected status after this long
+static const uint32_t RTT_TIMEOUT = 5000;
+
+// Frame capture dump format: 12 byte header ("HKCP", version, record size,
+// 2 reserved, uint32 LE record count) followed by the records, each a
+// uint32 LE millis() timestamp, a direction byte and the raw frame
+static const uint8_t CAPTURE_VERSION = 1;
+static const size_t CAPTURE_HEADER_SIZE = 12;
+static const size_t CAPTURE_RECORD_SIZE = 5 + MESSAGE_LENGTH;
+static const size_t CAPTURE_RECORDS_PER_LINE = 4;
+static const size_t CAPTURE_LINES_PER_TICK = 8;
 
 // Forward declarations for Entity classes (defined elsewhere, e.g., in their own component files or core)
 // NOTE: These are only needed because they are used as pointers in HikeITBLEComponent below.
@@ -31,55 +67,213 @@ class HikeITLockedSwitch;
 class HikeITButton;
 class HikeITStatusSensor;
 
-// Speed model enumeration
-enum SpeedModel : uint8_t {
-  SPEED_NORMAL = 1,
-  SPEED_ECONOMY = 0,
-  SPEED_CRUISE = 2,
-  SPEED_SPORT = 3,
-  SPEED_HIKE_IT = 4,
-  SPEED_AUTO = 5,
-  SPEED_LAUNCH = 6,
-  SPEED_ANTI_SLIP = 7,
-  SPEED_VALET = 8,
-  SPEED_SL = 9
+// SpeedModel, NoticeCode and the Type 02 field tables are generated into
+// hikeit_protocol.h from protocol_schema.py
+const char *speed_model_to_string(SpeedModel model);
+SpeedModel string_to_speed_model(const std::string &value);
+
+const char *notice_to_string(NoticeCode notice);
+
+// Entity-controlled status fields, published before the device confirms them
+enum OptimisticField : uint8_t {
+  OPTIMISTIC_MODEL,
+  OPTIMISTIC_STEP,
+  OPTIMISTIC_LOCK,
+  OPTIMISTIC_FIELD_COUNT
 };
 
-SpeedModel string_to_speed_model(const std::string &value);
+struct OptimisticValue {
+  bool pending{false};
+  uint8_t value{0};
+  uint32_t started{0};
+};
+
+const char *optimistic_field_to_string(OptimisticField field);
+std::string optimistic_value_to_string(OptimisticField field, uint8_t value);
 
-// Parsed message structure
+// Parsed message structure. Fixed layout and trivially copyable, so
+// parsing and caching a frame never touches the heap.
 struct ParsedMessage {
-  uint8_t count;
-  uint8_t type;
-  uint8_t content[10];
-  uint32_t device_id;
-  uint8_t checksum;
+  uint8_t count{0};
+  uint8_t type{0};
+  uint8_t content[CONTENT_LENGTH]{};
+  uint32_t device_id{0};
+  uint8_t checksum{0};
   
   // Type 02 specific data
-  SpeedModel speed_model;
-  uint8_t step_economy;
-  uint8_t step_cruise;
-  uint8_t step_sport;
-  uint8_t step_hike;
-  uint8_t deep_cx;
-  uint8_t deep_sc;
-  float version;
-  bool is_safe_model;
-  std::string notice;
-  uint8_t study_state;
-  uint8_t study_time;
-  uint8_t at_flag;
-  bool support_sl;
-  
-  ParsedMessage() : count(0), type(0), device_id(0), checksum(0),
-                    speed_model(SPEED_ECONOMY), step_economy(0), step_cruise(0),
-                    step_sport(0), step_hike(0), deep_cx(0), deep_sc(0),
-                    version(0.0f), is_safe_model(false), study_state(0),
-                    study_time(0), at_flag(0), support_sl(true) {
-    memset(content, 0, sizeof(content));
+  SpeedModel speed_model{SPEED_ECONOMY};
+  uint8_t step_economy{0};
+  uint8_t step_cruise{0};
+  uint8_t step_sport{0};
+  uint8_t step_hike{0};
+  uint8_t deep_cx{0};
+  uint8_t deep_sc{0};
+  float version{0.0f};
+  bool is_safe_model{false};
+  NoticeCode notice{NOTICE_NONE};
+  uint8_t study_state{0};
+  uint8_t study_time{0};
+  uint8_t at_flag{0};
+  bool support_sl{true};
+};
+
+static_assert(std::is_trivially_copyable<ParsedMessage>::value,
+              "ParsedMessage must stay trivially copyable");
+
+// ------------------------------------------------------------------
+// Streaming frame reassembler
+// ------------------------------------------------------------------
+// Notifications may carry any number of bytes. Bytes are pushed into a
+// fixed ring buffer and complete, checksum-valid frames are pulled out one
+// at a time. On a bad header or checksum the reassembler drops a single
+// byte and resyncs on the next 0xAA55 header.
+class FrameReassembler {
+ public:
+  // Copy as many bytes as fit, returns the number of bytes accepted
+  size_t push(const uint8_t *data, size_t len);
+  // Copy the next complete frame into out (MESSAGE_LENGTH bytes)
+  bool next(uint8_t *out);
+  void clear();
+
+  size_t size() const { return this->size_; }
+  uint32_t get_checksum_rejects() const { return this->checksum_rejects_; }
+  // Once per run of skipped bytes that did not follow a checksum reject,
+  // and once per partial frame dropped by clear()
+  uint32_t get_framing_rejects() const { return this->framing_rejects_; }
+  uint32_t get_discarded_bytes() const { return this->discarded_bytes_; }
+
+ protected:
+  uint8_t peek_(size_t offset) const {
+    return this->buffer_[(this->head_ + offset) & (REASSEMBLY_BUFFER_SIZE - 1)];
   }
+  void consume_(size_t count);
+  void skip_byte_();
+
+  std::array<uint8_t, REASSEMBLY_BUFFER_SIZE> buffer_{};
+  size_t head_{0};
+  size_t size_{0};
+  uint32_t checksum_rejects_{0};
+  uint32_t framing_rejects_{0};
+  uint32_t discarded_bytes_{0};
+  // Skipping bytes since the last good frame. A run started by a checksum
+  // reject is already counted as that reject.
+  bool skipping_{false};
 };
 
+// ------------------------------------------------------------------
+// Outbound write queue
+// ------------------------------------------------------------------
+// Type 02 configuration fields a host write can change
+enum ConfigField : uint8_t {
+  CONFIG_MODEL_BYTE = 1 << 0,  // content[0]
+  CONFIG_MODEL_BITS = 1 << 1,  // content[3] special model bits
+  CONFIG_STEP_ECO = 1 << 2,    // content[1] low nibble
+  CONFIG_STEP_CRUISE = 1 << 3, // content[1] high nibble
+  CONFIG_STEP_SPORT = 1 << 4,  // content[2] low nibble
+  CONFIG_STEP_HIKE = 1 << 5,   // content[2] high nibble
+  CONFIG_AT_FLAG = 1 << 6,     // content[3] bit 7
+};
+
+// Pending Type 02 change. Merged per field (last writer wins) and applied
+// to the freshest cached status when the frame is actually written.
+struct ConfigChange {
+  uint8_t fields{0};
+  uint8_t model_byte{0};
+  uint8_t model_bits{0};
+  uint8_t step_economy{0};
+  uint8_t step_cruise{0};
+  uint8_t step_sport{0};
+  uint8_t step_hike{0};
+  uint8_t at_flag{0};
+
+  void merge(const ConfigChange &other);
+  void apply(uint8_t *content) const;
+};
+
+// Queued outbound command. Type 02 entries carry no content, they are
+// built from the pending ConfigChange when written.
+struct QueuedCommand {
+  uint8_t type;
+  uint8_t content[CONTENT_LENGTH];
+};
+
+// Commands the device confirms, at most one of each in flight: a newer
+// command of the same kind supersedes the older one
+enum InFlightKind : uint8_t {
+  IN_FLIGHT_CONFIG,  // Type 02, confirmed by the status that reflects it
+  IN_FLIGHT_LOCK,    // Type 05/06, confirmed by the status lock state
+  IN_FLIGHT_VERIFY,  // Type 09, confirmed by the verify response
+  IN_FLIGHT_KIND_COUNT
+};
+
+// Written command waiting for its confirmation. Retransmitted with a
+// doubled deadline each time, until max_retransmits is used up.
+struct InFlightCommand {
+  bool active{false};
+  bool due{false};  // deadline passed, resend on the next write slot
+  uint8_t type{0};
+  uint8_t content[CONTENT_LENGTH]{};
+  uint8_t attempts{0};  // writes so far, the first one included
+  uint32_t deadline{0};
+};
+
+// Session learned from a verified connection, persisted per MAC so a
+// reconnect can skip the verify handshake (protocol.md section 5.1)
+struct SessionCache {
+  uint64_t address;
+  uint32_t device_id;
+  uint16_t char_handle;
+  bool verified;
+};
+
+// ------------------------------------------------------------------
+// Log rate limits
+// ------------------------------------------------------------------
+// Hot-path log lines are grouped so each group has its own limit
+enum LogCategory : uint8_t {
+  LOG_CATEGORY_FRAMES,    // notification and write hex dumps
+  LOG_CATEGORY_COMMANDS,  // "Sending ..." lines and merged writes
+  LOG_CATEGORY_STATUS,    // status dumps
+  LOG_CATEGORY_ERRORS,    // checksum, resync and parse failures
+  LOG_CATEGORY_COUNT
+};
+
+// Which Type 02 status frames are logged
+enum StatusLogMode : uint8_t {
+  STATUS_LOG_NONE,
+  STATUS_LOG_CHANGES,
+  STATUS_LOG_ALL
+};
+
+// Token bucket: rate lines per second on average, up to burst back to
+// back. A rate of 0 disables the limit.
+struct LogBucket {
+  float rate{0.0f};
+  float burst{1.0f};
+  float tokens{1.0f};
+  uint32_t last_refill{0};
+  uint32_t suppressed{0};
+
+  void configure(float rate, uint16_t burst);
+  bool take(uint32_t now);
+};
+
+#ifdef USE_HIKEIT_BLE_CAPTURE
+// ------------------------------------------------------------------
+// Frame capture
+// ------------------------------------------------------------------
+enum CaptureDirection : uint8_t {
+  CAPTURE_RX = 0,
+  CAPTURE_TX = 1
+};
+
+struct CaptureRecord {
+  uint32_t timestamp;
+  CaptureDirection direction;
+  uint8_t frame[MESSAGE_LENGTH];
+};
+#endif  // USE_HIKEIT_BLE_CAPTURE
+
 // Connection states
 enum ConnectionState {
   STATE_DISCONNECTED,
@@ -112,68 +306,232 @@ class HikeITBLEComponent : public Component, public ble_client::BLEClientNode {
   void set_address(uint64_t address);
   void set_address(const uint8_t *address);
   void set_pin(const std::string &pin) { this->pin_ = pin; }
+  void set_write_interval(uint32_t write_interval) { this->write_interval_ = write_interval; }
+  void set_frames_per_write(uint8_t frames) { this->frames_per_write_ = frames; }
+  void set_session_cache(bool session_cache) { this->session_cache_enabled_ = session_cache; }
+  void set_reconnect_delay(uint32_t delay) { this->reconnect_delay_ = delay; }
+  void set_reconnect_max_delay(uint32_t delay) { this->reconnect_max_delay_ = delay; }
+  void set_reconnect_jitter(float jitter) { this->reconnect_jitter_ = jitter; }
+  void set_log_limit(LogCategory category, float rate, uint16_t burst) {
+    this->log_buckets_[category].configure(rate, burst);
+  }
+  void set_status_log(StatusLogMode mode) { this->status_log_ = mode; }
+  void set_log_summary_interval(uint32_t interval) { this->log_summary_interval_ = interval; }
+  void set_optimistic_timeout(uint32_t timeout) { this->optimistic_timeout_ = timeout; }
+  void set_ack_timeout(uint32_t timeout) { this->ack_timeout_ = timeout; }
+  void set_max_retransmits(uint8_t retransmits) { this->max_retransmits_ = retransmits; }
+#ifdef USE_HIKEIT_BLE_CAPTURE
+  void set_capture_size(size_t size) { this->capture_capacity_ = size; }
+#endif
   
-  // Entity setters (using forward declared types)
+  // Entity setters (using forward declared types). Each platform defines
+  // USE_HIKEIT_BLE_<PLATFORM> when it is configured.
+#ifdef USE_HIKEIT_BLE_SELECT
   void set_speed_select(HikeITSpeedSelect *select) { this->speed_select_ = select; }
+#endif
+#ifdef USE_HIKEIT_BLE_NUMBER
   void set_step_number(HikeITStepNumber *number) { this->step_number_ = number; }
+#endif
+#ifdef USE_HIKEIT_BLE_SWITCH
   void set_locked_switch(HikeITLockedSwitch *sw) { this->locked_switch_ = sw; }
+#endif
+#ifdef USE_HIKEIT_BLE_BUTTON
   void set_screen_button(HikeITButton *btn) { this->screen_button_ = btn; }
   void set_auto_button(HikeITButton *btn) { this->auto_button_ = btn; }
+#endif
+#ifdef USE_HIKEIT_BLE_TEXT_SENSOR
   void set_status_sensor(HikeITStatusSensor *sensor) { this->status_sensor_ = sensor; }
+#endif
   
+#ifdef USE_HIKEIT_BLE_CONNECT_SWITCH
   void set_connect_switch(switch_::Switch *sw) { this->connect_switch_ = sw; }
+#endif
 
   // Command methods
   void send_verify_command();
   void send_disconnect_command();
   void send_screen_command();
-  void send_speed_model_command(SpeedModel model, uint8_t at_flag);
-  void send_step_command(uint8_t step, SpeedModel model);
+  // Return false when nothing was queued
+  bool send_speed_model_command(SpeedModel model, uint8_t at_flag);
+  bool send_step_command(uint8_t step, SpeedModel model);
   void send_auto_command(bool enable);
-  void send_safe_mode_command(const std::string &password, bool enable);
+  bool send_safe_mode_command(const std::string &password, bool enable);
+  
+  // Entity requests. The select, number and switch never publish their own
+  // state, the component does. While verified (and with optimistic_timeout
+  // set) the value is published at once and held until a status confirms
+  // it, or reverted when optimistic_timeout passes without one; otherwise
+  // it is published once the device reports it.
+  void request_speed_model(SpeedModel model);
+  void request_step(uint8_t step);
+  void request_locked(bool locked);
+  bool is_pending(OptimisticField field) const { return this->optimistic_[field].pending; }
+  
+#ifdef USE_HIKEIT_BLE_CAPTURE
+  // Frame capture
+  void dump_capture();
+  void clear_capture();
+  size_t get_capture_count() const { return this->capture_count_; }
+#endif
   
   // State getters
   ConnectionState get_state() const { return this->state_; }
   bool is_connected() const { return this->state_ >= STATE_CONNECTED; }
   bool is_verified() const { return this->state_ == STATE_VERIFIED; }
+  bool has_session() const { return this->session_.verified; }
   const ParsedMessage& get_last_message() const { return this->last_message_; }
   const std::string& get_pin() const { return this->pin_; }
   
-  // Automation callbacks (These are now fully visible)
+  // Write queue statistics
+  size_t get_write_queue_depth() const { return this->write_queue_size_; }
+  size_t get_write_queue_high_water() const { return this->write_queue_high_water_; }
+  uint32_t get_writes_merged() const { return this->writes_merged_; }
+  uint32_t get_writes_dropped() const { return this->writes_dropped_; }
+  uint32_t get_writes_sent() const { return this->writes_sent_; }
+  uint32_t get_frames_packed() const { return this->frames_packed_; }
+  uint16_t get_mtu() const { return this->mtu_; }
+  uint32_t get_retransmits() const { return this->retransmits_; }
+  uint32_t get_commands_lost() const { return this->commands_lost_; }
+  bool is_in_flight(InFlightKind kind) const { return this->in_flight_[kind].active; }
+  
+  // Link metrics (cumulative since boot)
+  uint32_t get_frames_received() const { return this->frames_received_; }
+  // Rejects are only counted by the reassembler, every frame parsed from a
+  // notification has already passed its header and checksum checks
+  uint32_t get_checksum_rejects() const { return this->reassembler_.get_checksum_rejects(); }
+  uint32_t get_framing_rejects() const { return this->reassembler_.get_framing_rejects(); }
+  uint32_t get_reconnect_count() const { return this->reconnect_count_; }
+  // Time from link open to verified for the last connection, 0 if none yet
+  uint32_t get_verify_time() const { return this->verify_time_; }
+  // Round-trip p50/max in ms since the previous call, false if no samples
+  bool take_round_trip_stats(uint32_t &p50, uint32_t &max);
+  // Longest entity request to confirmation time in ms since the previous
+  // call, false if nothing was confirmed
+  bool take_confirm_time(uint32_t &max);
+  // Entity requests reverted because no status confirmed them
+  uint32_t get_commands_failed() const { return this->commands_failed_; }
+  
+  // Automation callbacks, compiled in only when the trigger is configured
+#ifdef USE_HIKEIT_BLE_ON_CONNECTED
   void add_on_connected_callback(std::function<void()> &&callback) {
     this->connected_callbacks_.add(std::move(callback));
   }
+#endif
+#ifdef USE_HIKEIT_BLE_ON_DISCONNECTED
   void add_on_disconnected_callback(std::function<void()> &&callback) {
     this->disconnected_callbacks_.add(std::move(callback));
   }
+#endif
+#ifdef USE_HIKEIT_BLE_ON_VERIFIED
   void add_on_verified_callback(std::function<void()> &&callback) {
     this->verified_callbacks_.add(std::move(callback));
   }
+#endif
+#ifdef USE_HIKEIT_BLE_ON_MESSAGE
   void add_on_message_callback(std::function<void(const std::string &)> &&callback) {
     this->message_callbacks_.add(std::move(callback));
   }
+#endif
+  // Field change callbacks get the decoded values of the status that
+  // changed them (and the previous model for model changes)
+#ifdef USE_HIKEIT_BLE_ON_SPEED_MODEL_CHANGE
+  void add_on_speed_model_change_callback(std::function<void(SpeedModel, SpeedModel)> &&callback) {
+    this->speed_model_change_callbacks_.add(std::move(callback));
+  }
+#endif
+#ifdef USE_HIKEIT_BLE_ON_STEP_CHANGE
+  void add_on_step_change_callback(std::function<void(uint8_t, SpeedModel)> &&callback) {
+    this->step_change_callbacks_.add(std::move(callback));
+  }
+#endif
+#ifdef USE_HIKEIT_BLE_ON_LOCK_CHANGE
+  void add_on_lock_change_callback(std::function<void(bool)> &&callback) {
+    this->lock_change_callbacks_.add(std::move(callback));
+  }
+#endif
+#ifdef USE_HIKEIT_BLE_ON_NOTICE
+  void add_on_notice_callback(std::function<void(NoticeCode)> &&callback) {
+    this->notice_callbacks_.add(std::move(callback));
+  }
+#endif
+#ifdef USE_HIKEIT_BLE_ON_STUDY_PROGRESS
+  void add_on_study_progress_callback(std::function<void(uint8_t, uint8_t)> &&callback) {
+    this->study_progress_callbacks_.add(std::move(callback));
+  }
+#endif
+#ifdef USE_HIKEIT_BLE_ON_COMMAND_FAILED
+  void add_on_command_failed_callback(std::function<void(OptimisticField, uint8_t)> &&callback) {
+    this->command_failed_callbacks_.add(std::move(callback));
+  }
+#endif
   
  protected:
   // Protocol implementation
   uint8_t get_sequence();
   uint8_t calculate_checksum(const uint8_t *data, size_t len);
-  std::vector<uint8_t> build_message(uint8_t type, const uint8_t *content);
+  void build_message(uint8_t type, const uint8_t *content, uint8_t *out);
   bool parse_message(const uint8_t *data, size_t len, ParsedMessage &msg);
   void parse_type02(const uint8_t *data, ParsedMessage &msg);
   
   // BLE operations
   void start_notify();
-  void send_command(const std::vector<uint8_t> &data);
+  void send_command(const uint8_t *data, size_t len);
+  bool enqueue_command(uint8_t type, const uint8_t *content);
+  bool enqueue_config(const ConfigChange &change);
+  bool push_queue(uint8_t type, const uint8_t *content);
+  void schedule_write();
+  void process_write_queue();
+  bool build_queued_frame(uint8_t *out);
+  size_t frames_per_write() const;
+  uint16_t wanted_mtu() const { return this->frames_per_write_ * MESSAGE_LENGTH + ATT_HEADER_LENGTH; }
+  void clear_write_queue();
+  void track_in_flight(uint8_t type, const uint8_t *content);
+  void confirm_in_flight(const ParsedMessage &msg);
+  bool has_due_retransmit() const;
+  bool build_retransmit(uint8_t *out);
+  void check_in_flight();
+  void schedule_ack_check();
+  void clear_in_flight();
   void handle_notification(const uint8_t *data, uint16_t length);
   void process_message(const uint8_t *data);
+  void publish_changes(const ParsedMessage &msg);
+#ifdef USE_HIKEIT_BLE_CHANGE_TRIGGERS
+  void trigger_changes(const ParsedMessage &msg);
+#endif
+  void log_status(const ParsedMessage &msg);
+  // Level enabled and the category has a token left; check before formatting
+  bool should_log(LogCategory category, int level);
+  void log_summary();
+#ifdef USE_HIKEIT_BLE_CAPTURE
+  void capture_frame(CaptureDirection direction, const uint8_t *frame);
+#endif
+  void start_optimistic(OptimisticField field, uint8_t value);
+  void reconcile_optimistic(const ParsedMessage &msg);
+  void rollback_optimistic(OptimisticField field);
+  // Publishes an optimistic or reverted value; device statuses go through
+  // publish_changes, which skips fields still pending
+  void publish_field(OptimisticField field, uint8_t value);
+  void start_round_trip(uint8_t type, const uint8_t *content);
+  void check_round_trip(const ParsedMessage &msg);
+#ifdef USE_HIKEIT_BLE_CAPTURE
+  void dump_capture_lines();
+#endif
   
   // Connection management
   void attempt_connection();
+  void schedule_reconnect(bool clean_drop);
+  uint32_t next_reconnect_delay();
   void handle_connection();
   void handle_disconnection();
   void set_state(ConnectionState state);
   void update_status_text();
   
+  // Session cache
+  void load_session();
+  void save_session();
+  void invalidate_session(const char *reason);
+  bool restore_session();
+  
   // Configuration
   uint64_t address_{0};
   std::string pin_{"123"};
@@ -181,11 +539,50 @@ class HikeITBLEComponent : public Component, public ble_client::BLEClientNode {
   // State
   ConnectionState state_{STATE_DISCONNECTED};
   uint8_t sequence_counter_{0};
+  bool sequence_synced_{false};
   uint32_t device_id_{0};
   ParsedMessage last_message_;
   bool has_cached_state_{false};
-  uint32_t last_connection_attempt_{0};
-  uint32_t reconnect_delay_{5000};
+  bool publish_all_{true};
+  
+  // Reconnect scheduler
+  uint32_t reconnect_delay_{1000};
+  uint32_t reconnect_max_delay_{300000};
+  float reconnect_jitter_{0.2f};
+  uint32_t reconnect_attempt_{0};
+  bool reconnect_pending_{false};
+  
+  // Persisted session
+  bool session_cache_enabled_{true};
+  ESPPreferenceObject session_pref_;
+  SessionCache session_{};
+  bool session_restored_{false};
+  
+  // Outbound write queue (FIFO ring, at most one merged Type 02 entry)
+  std::array<QueuedCommand, WRITE_QUEUE_SIZE> write_queue_{};
+  size_t write_queue_head_{0};
+  size_t write_queue_size_{0};
+  ConfigChange pending_config_;
+  bool config_queued_{false};
+  bool write_scheduled_{false};
+  uint32_t write_interval_{50};
+  uint32_t last_write_{0};
+  size_t write_queue_high_water_{0};
+  uint32_t writes_merged_{0};
+  uint32_t writes_dropped_{0};
+  uint32_t writes_sent_{0};
+  
+  // Frames per write wanted, and the MTU negotiated for this link
+  uint8_t frames_per_write_{1};
+  uint16_t mtu_{DEFAULT_MTU};
+  uint32_t frames_packed_{0};
+  
+  // Written commands waiting for confirmation, by kind
+  std::array<InFlightCommand, IN_FLIGHT_KIND_COUNT> in_flight_{};
+  uint32_t ack_timeout_{200};
+  uint8_t max_retransmits_{2};
+  uint32_t retransmits_{0};
+  uint32_t commands_lost_{0};
   
   // BLE handles
   uint16_t service_handle_{0};
@@ -193,54 +590,207 @@ class HikeITBLEComponent : public Component, public ble_client::BLEClientNode {
   uint16_t notify_handle_{0};
   uint16_t notify_descr_handle_{0};
   
-  // Message buffer for handling split messages
-  std::vector<uint8_t> message_buffer_;
+  // Reassembles frames split across (or packed into) notifications
+  FrameReassembler reassembler_;
+  
+  // Link metrics
+  uint32_t frames_received_{0};
+  uint32_t reconnect_count_{0};
+  bool link_dropped_{false};
+  uint32_t connect_started_{0};
+  uint32_t verify_time_{0};
+  
+  // Log limits and the counters at the previous summary line
+  std::array<LogBucket, LOG_CATEGORY_COUNT> log_buckets_{};
+  StatusLogMode status_log_{STATUS_LOG_CHANGES};
+  uint32_t log_summary_interval_{0};
+  uint32_t summary_frames_{0};
+  uint32_t summary_checksum_rejects_{0};
+  uint32_t summary_framing_rejects_{0};
+  uint32_t summary_writes_{0};
+  uint32_t summary_retransmits_{0};
+  uint32_t summary_suppressed_{0};
+  
+  // Command waiting for its reflected status, and collected round trips
+  bool rtt_pending_{false};
+  uint8_t rtt_type_{0};
+  uint8_t rtt_content_[4]{};
+  uint32_t rtt_started_{0};
+  std::array<uint16_t, RTT_SAMPLE_COUNT> rtt_samples_{};
+  size_t rtt_sample_count_{0};
+  
+  // Optimistic entity values waiting for a confirming status
+  uint32_t optimistic_timeout_{2000};
+  std::array<OptimisticValue, OPTIMISTIC_FIELD_COUNT> optimistic_{};
+  bool has_optimistic_{false};
+  uint32_t confirm_time_max_{0};
+  bool confirm_time_valid_{false};
+  uint32_t commands_failed_{0};
+  
+#ifdef USE_HIKEIT_BLE_CAPTURE
+  // Frame capture ring, allocated in setup()
+  std::unique_ptr<CaptureRecord[]> capture_;
+  size_t capture_capacity_{0};
+  size_t capture_head_{0};
+  size_t capture_count_{0};
+  bool capture_dumping_{false};
+  size_t capture_dump_index_{0};
+  size_t capture_dump_line_{0};
+  uint32_t capture_skipped_{0};
+#endif
   
   // Entities
+#ifdef USE_HIKEIT_BLE_SELECT
   HikeITSpeedSelect *speed_select_{nullptr};
+#endif
+#ifdef USE_HIKEIT_BLE_NUMBER
   HikeITStepNumber *step_number_{nullptr};
+#endif
+#ifdef USE_HIKEIT_BLE_SWITCH
   HikeITLockedSwitch *locked_switch_{nullptr};
+#endif
+#ifdef USE_HIKEIT_BLE_BUTTON
   HikeITButton *screen_button_{nullptr};
   HikeITButton *auto_button_{nullptr};
+#endif
+#ifdef USE_HIKEIT_BLE_TEXT_SENSOR
   HikeITStatusSensor *status_sensor_{nullptr};
+#endif
 
+#ifdef USE_HIKEIT_BLE_CONNECT_SWITCH
   switch_::Switch *connect_switch_{nullptr};
+#endif
   bool connection_allowed_() const;
   
   // Automation callbacks
+#ifdef USE_HIKEIT_BLE_ON_CONNECTED
   CallbackManager<void()> connected_callbacks_;
+#endif
+#ifdef USE_HIKEIT_BLE_ON_DISCONNECTED
   CallbackManager<void()> disconnected_callbacks_;
+#endif
+#ifdef USE_HIKEIT_BLE_ON_VERIFIED
   CallbackManager<void()> verified_callbacks_;
+#endif
+#ifdef USE_HIKEIT_BLE_ON_MESSAGE
   CallbackManager<void(const std::string &)> message_callbacks_;
+#endif
+#ifdef USE_HIKEIT_BLE_ON_SPEED_MODEL_CHANGE
+  CallbackManager<void(SpeedModel, SpeedModel)> speed_model_change_callbacks_;
+#endif
+#ifdef USE_HIKEIT_BLE_ON_STEP_CHANGE
+  CallbackManager<void(uint8_t, SpeedModel)> step_change_callbacks_;
+#endif
+#ifdef USE_HIKEIT_BLE_ON_LOCK_CHANGE
+  CallbackManager<void(bool)> lock_change_callbacks_;
+#endif
+#ifdef USE_HIKEIT_BLE_ON_NOTICE
+  CallbackManager<void(NoticeCode)> notice_callbacks_;
+#endif
+#ifdef USE_HIKEIT_BLE_ON_STUDY_PROGRESS
+  CallbackManager<void(uint8_t, uint8_t)> study_progress_callbacks_;
+#endif
+#ifdef USE_HIKEIT_BLE_ON_COMMAND_FAILED
+  CallbackManager<void(OptimisticField, uint8_t)> command_failed_callbacks_;
+#endif
 };
 
 // ------------------------------------------------------------------
 // Automation triggers - DEFINED SECOND
 // ------------------------------------------------------------------
 
+#ifdef USE_HIKEIT_BLE_ON_CONNECTED
 class ConnectedTrigger : public Trigger<> {
  public:
   // HikeITBLEComponent is now fully defined, resolving the error
   explicit ConnectedTrigger(HikeITBLEComponent *parent) { parent->add_on_connected_callback([this]() { this->trigger(); }); }
 };
+#endif
 
+#ifdef USE_HIKEIT_BLE_ON_DISCONNECTED
 class DisconnectedTrigger : public Trigger<> {
  public:
   explicit DisconnectedTrigger(HikeITBLEComponent *parent) { parent->add_on_disconnected_callback([this]() { this->trigger(); }); }
 };
+#endif
 
+#ifdef USE_HIKEIT_BLE_ON_VERIFIED
 class VerifiedTrigger : public Trigger<> {
  public:
   explicit VerifiedTrigger(HikeITBLEComponent *parent) { parent->add_on_verified_callback([this]() { this->trigger(); }); }
 };
+#endif
 
+#ifdef USE_HIKEIT_BLE_ON_MESSAGE
 class MessageReceivedTrigger : public Trigger<std::string> {
  public:
   explicit MessageReceivedTrigger(HikeITBLEComponent *parent) {
     parent->add_on_message_callback([this](const std::string &msg) { this->trigger(msg); });
   }
 };
+#endif
 
+// Field change triggers. Labels are formatted only when a trigger fires,
+// which happens once per change rather than once per frame.
+#ifdef USE_HIKEIT_BLE_ON_SPEED_MODEL_CHANGE
+class SpeedModelChangeTrigger : public Trigger<std::string, std::string> {
+ public:
+  explicit SpeedModelChangeTrigger(HikeITBLEComponent *parent) {
+    parent->add_on_speed_model_change_callback([this](SpeedModel model, SpeedModel previous) {
+      this->trigger(speed_model_to_string(model), speed_model_to_string(previous));
+    });
+  }
+};
+#endif
+
+#ifdef USE_HIKEIT_BLE_ON_STEP_CHANGE
+class StepChangeTrigger : public Trigger<uint8_t, std::string> {
+ public:
+  explicit StepChangeTrigger(HikeITBLEComponent *parent) {
+    parent->add_on_step_change_callback(
+        [this](uint8_t step, SpeedModel model) { this->trigger(step, speed_model_to_string(model)); });
+  }
+};
+#endif
+
+#ifdef USE_HIKEIT_BLE_ON_LOCK_CHANGE
+class LockChangeTrigger : public Trigger<bool> {
+ public:
+  explicit LockChangeTrigger(HikeITBLEComponent *parent) {
+    parent->add_on_lock_change_callback([this](bool locked) { this->trigger(locked); });
+  }
+};
+#endif
+
+#ifdef USE_HIKEIT_BLE_ON_NOTICE
+class NoticeTrigger : public Trigger<std::string> {
+ public:
+  explicit NoticeTrigger(HikeITBLEComponent *parent) {
+    parent->add_on_notice_callback([this](NoticeCode notice) { this->trigger(notice_to_string(notice)); });
+  }
+};
+#endif
+
+#ifdef USE_HIKEIT_BLE_ON_STUDY_PROGRESS
+class StudyProgressTrigger : public Trigger<uint8_t, uint8_t> {
+ public:
+  explicit StudyProgressTrigger(HikeITBLEComponent *parent) {
+    parent->add_on_study_progress_callback(
+        [this](uint8_t state, uint8_t time) { this->trigger(state, time); });
+  }
+};
+#endif
+
+#ifdef USE_HIKEIT_BLE_ON_COMMAND_FAILED
+class CommandFailedTrigger : public Trigger<std::string, std::string> {
+ public:
+  explicit CommandFailedTrigger(HikeITBLEComponent *parent) {
+    parent->add_on_command_failed_callback([this](OptimisticField field, uint8_t value) {
+      this->trigger(optimistic_field_to_string(field), optimistic_value_to_string(field, value));
+    });
+  }
+};
+#endif
 
 }  // namespace hikeit_ble
 }  // namespace esphome
\ No newline at end of file
@@ -1,4 +1,6 @@
 #pragma once
+#include "esphome/core/defines.h"
+#ifdef USE_HIKEIT_BLE_BUTTON
 #include "esphome/components/button/button.h"
 #include "hikeit_ble.h"
 
@@ -20,6 +22,13 @@ class HikeITButton : public button::Button, public Component {
         // Auto command - toggle AT flag
         bool current_at = this->parent_->get_last_message().at_flag != 0;
         this->parent_->send_auto_command(!current_at);
+      } else if (this->command_type_ == 2) {
+        // Dump captured frames to the log
+#ifdef USE_HIKEIT_BLE_CAPTURE
+        this->parent_->dump_capture();
+#else
+        ESP_LOGW(TAG, "Frame capture is not enabled (set capture_size)");
+#endif
       }
     }
   }
@@ -29,4 +38,5 @@ class HikeITButton : public button::Button, public Component {
 };
 
 }  // namespace hikeit_ble
-}  // namespace esphome
\ No newline at end of file
+}  // namespace esphome
+#endif  // USE_HIKEIT_BLE_BUTTON
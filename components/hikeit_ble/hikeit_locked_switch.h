@@ -1,4 +1,6 @@
 #pragma once
+#include "esphome/core/defines.h"
+#ifdef USE_HIKEIT_BLE_SWITCH
 #include "esphome/components/switch/switch.h"
 #include "hikeit_ble.h"
 
@@ -12,9 +14,7 @@ class HikeITLockedSwitch : public switch_::Switch, public Component {
  protected:
   void write_state(bool state) override {
     if (this->parent_ != nullptr) {
-      // Get PIN from parent component
-      this->parent_->send_safe_mode_command(this->parent_->get_pin(), state);
-      this->publish_state(state);
+      this->parent_->request_locked(state);
     }
   }
   
@@ -22,4 +22,5 @@ class HikeITLockedSwitch : public switch_::Switch, public Component {
 };
 
 }  // namespace hikeit_ble
-}  // namespace esphome
\ No newline at end of file
+}  // namespace esphome
+#endif  // USE_HIKEIT_BLE_SWITCH
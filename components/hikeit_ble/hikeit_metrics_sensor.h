@@ -0,0 +1,102 @@
+#pragma once
+#include "esphome/core/defines.h"
+#ifdef USE_HIKEIT_BLE_SENSOR
+#include "esphome/components/sensor/sensor.h"
+#include "hikeit_ble.h"
+
+namespace esphome {
+namespace hikeit_ble {
+
+// Publishes the link metrics collected by HikeITBLEComponent
+class HikeITMetricsSensor : public PollingComponent {
+ public:
+  void set_parent(HikeITBLEComponent *parent) { this->parent_ = parent; }
+  void set_frame_rate_sensor(sensor::Sensor *sensor) { this->frame_rate_sensor_ = sensor; }
+  void set_checksum_rejects_sensor(sensor::Sensor *sensor) { this->checksum_rejects_sensor_ = sensor; }
+  void set_length_rejects_sensor(sensor::Sensor *sensor) { this->length_rejects_sensor_ = sensor; }
+  void set_round_trip_p50_sensor(sensor::Sensor *sensor) { this->round_trip_p50_sensor_ = sensor; }
+  void set_round_trip_max_sensor(sensor::Sensor *sensor) { this->round_trip_max_sensor_ = sensor; }
+  void set_verify_time_sensor(sensor::Sensor *sensor) { this->verify_time_sensor_ = sensor; }
+  void set_reconnects_sensor(sensor::Sensor *sensor) { this->reconnects_sensor_ = sensor; }
+  void set_confirm_time_sensor(sensor::Sensor *sensor) { this->confirm_time_sensor_ = sensor; }
+  void set_commands_failed_sensor(sensor::Sensor *sensor) { this->commands_failed_sensor_ = sensor; }
+  void set_retransmits_sensor(sensor::Sensor *sensor) { this->retransmits_sensor_ = sensor; }
+  void set_commands_lost_sensor(sensor::Sensor *sensor) { this->commands_lost_sensor_ = sensor; }
+
+  void setup() override {
+    this->last_frames_ = this->parent_->get_frames_received();
+    this->last_update_ = millis();
+  }
+
+  void update() override {
+    uint32_t now = millis();
+    uint32_t frames = this->parent_->get_frames_received();
+    if (this->frame_rate_sensor_ != nullptr && now != this->last_update_) {
+      this->frame_rate_sensor_->publish_state((frames - this->last_frames_) * 1000.0f /
+                                              (now - this->last_update_));
+    }
+    this->last_frames_ = frames;
+    this->last_update_ = now;
+
+    if (this->checksum_rejects_sensor_ != nullptr) {
+      this->checksum_rejects_sensor_->publish_state(this->parent_->get_checksum_rejects());
+    }
+    if (this->length_rejects_sensor_ != nullptr) {
+      this->length_rejects_sensor_->publish_state(this->parent_->get_framing_rejects());
+    }
+
+    // Round trips are only published for intervals that had commands
+    uint32_t p50, max;
+    if (this->parent_->take_round_trip_stats(p50, max)) {
+      if (this->round_trip_p50_sensor_ != nullptr) {
+        this->round_trip_p50_sensor_->publish_state(p50);
+      }
+      if (this->round_trip_max_sensor_ != nullptr) {
+        this->round_trip_max_sensor_->publish_state(max);
+      }
+    }
+
+    // Slowest optimistic confirmation, only for intervals that had one
+    uint32_t confirm_time;
+    if (this->parent_->take_confirm_time(confirm_time) && this->confirm_time_sensor_ != nullptr) {
+      this->confirm_time_sensor_->publish_state(confirm_time);
+    }
+    if (this->commands_failed_sensor_ != nullptr) {
+      this->commands_failed_sensor_->publish_state(this->parent_->get_commands_failed());
+    }
+    if (this->retransmits_sensor_ != nullptr) {
+      this->retransmits_sensor_->publish_state(this->parent_->get_retransmits());
+    }
+    if (this->commands_lost_sensor_ != nullptr) {
+      this->commands_lost_sensor_->publish_state(this->parent_->get_commands_lost());
+    }
+
+    uint32_t verify_time = this->parent_->get_verify_time();
+    if (this->verify_time_sensor_ != nullptr && verify_time != 0) {
+      this->verify_time_sensor_->publish_state(verify_time);
+    }
+    if (this->reconnects_sensor_ != nullptr) {
+      this->reconnects_sensor_->publish_state(this->parent_->get_reconnect_count());
+    }
+  }
+
+ protected:
+  HikeITBLEComponent *parent_{nullptr};
+  sensor::Sensor *frame_rate_sensor_{nullptr};
+  sensor::Sensor *checksum_rejects_sensor_{nullptr};
+  sensor::Sensor *length_rejects_sensor_{nullptr};
+  sensor::Sensor *round_trip_p50_sensor_{nullptr};
+  sensor::Sensor *round_trip_max_sensor_{nullptr};
+  sensor::Sensor *verify_time_sensor_{nullptr};
+  sensor::Sensor *reconnects_sensor_{nullptr};
+  sensor::Sensor *confirm_time_sensor_{nullptr};
+  sensor::Sensor *commands_failed_sensor_{nullptr};
+  sensor::Sensor *retransmits_sensor_{nullptr};
+  sensor::Sensor *commands_lost_sensor_{nullptr};
+  uint32_t last_frames_{0};
+  uint32_t last_update_{0};
+};
+
+}  // namespace hikeit_ble
+}  // namespace esphome
+#endif  // USE_HIKEIT_BLE_SENSOR
@@ -0,0 +1,187 @@
+// Generated from components/hikeit_ble/protocol_schema.py, do not edit.
+// Regenerate with: python components/hikeit_ble/protocol_schema.py
+#pragma once
+
+#include <cstddef>
+#include <cstdint>
+#include <cstring>
+
+namespace esphome {
+namespace hikeit_ble {
+
+// Frame layout: header, sequence, type, content, device ID, checksum
+static const uint8_t HEADER_BYTE_1 = 0xAA;
+static const uint8_t HEADER_BYTE_2 = 0x55;
+static const uint8_t MESSAGE_LENGTH = 19;
+static const uint8_t CONTENT_LENGTH = 10;
+
+// Message types
+enum MessageType : uint8_t {
+  MSG_STUDY = 0x01,  // Host: start pedal learning
+  MSG_STATUS = 0x02,  // Device: status, Host: configuration write
+  MSG_LOCK = 0x05,  // Host: lock with PIN
+  MSG_UNLOCK = 0x06,  // Host: unlock with PIN
+  MSG_SCREEN = 0x08,  // Host: screen toggle
+  MSG_VERIFY = 0x09,  // Verify request and response
+};
+
+// First content byte of fixed host commands
+static const uint8_t CMD_VERIFY_CONNECT = 0x03;
+static const uint8_t CMD_VERIFY_DISCONNECT = 0x04;
+static const uint8_t CMD_STUDY_MODE = 0x16;
+static const uint8_t CMD_SCREEN = 0x24;
+
+// Speed model enumeration
+enum SpeedModel : uint8_t {
+  SPEED_ECONOMY = 0,
+  SPEED_NORMAL = 1,
+  SPEED_CRUISE = 2,
+  SPEED_SPORT = 3,
+  SPEED_HIKE_IT = 4,
+  SPEED_AUTO = 5,
+  SPEED_LAUNCH = 6,
+  SPEED_ANTI_SLIP = 7,
+  SPEED_VALET = 8,
+  SPEED_SL = 9,
+};
+
+static const uint8_t SPEED_MODEL_COUNT = 10;
+static const uint8_t NO_MODEL = 0xFF;
+
+// Fault notice reported in Type 02 content byte 9
+enum NoticeCode : uint8_t {
+  NOTICE_NONE = 0,
+  NOTICE_C1 = 1,
+  NOTICE_C2 = 2,
+  NOTICE_C3 = 3,
+};
+
+// Bitfield inside the 10 content bytes
+struct BitField {
+  uint8_t byte;
+  uint8_t shift;
+  uint8_t mask;  // unshifted, 0 for no field
+};
+
+// Type 02 content fields
+static constexpr BitField FIELD_MODEL_BYTE{0, 0, 0xFF};  // Speed model while no special model bit is set
+static constexpr BitField FIELD_STEP_ECONOMY{1, 0, 0x0F};  // Eco 4x4 step
+static constexpr BitField FIELD_STEP_CRUISE{1, 4, 0x0F};  // Cruise step
+static constexpr BitField FIELD_STEP_SPORT{2, 0, 0x0F};  // Sport step
+static constexpr BitField FIELD_STEP_HIKE{2, 4, 0x0F};  // Hike IT step
+static constexpr BitField FIELD_MODEL_BITS{3, 0, 0x0F};  // Special model bits (Launch, Anti-Slip, Valet, SL)
+static constexpr BitField FIELD_SUPPORT_SL{3, 4, 0x01};  // Device supports SL
+static constexpr BitField FIELD_AT_FLAG{3, 7, 0x01};  // Auto transmission
+static constexpr BitField FIELD_DEEP_CX{4, 0, 0xFF};  // Pedal depth CX
+static constexpr BitField FIELD_DEEP_SC{5, 0, 0xFF};  // Pedal depth SC
+static constexpr BitField FIELD_STUDY_TIME{6, 0, 0x0F};  // Pedal learning countdown
+static constexpr BitField FIELD_STUDY_PHASE{6, 4, 0x0F};  // Pedal learning phase
+static constexpr BitField FIELD_VERSION{7, 0, 0xFF};  // Firmware version in tenths
+static constexpr BitField FIELD_UNLOCKED{8, 0, 0xFF};  // Zero while locked
+static constexpr BitField FIELD_NOTICE_BITS{9, 2, 0x07};  // Notice bits, C1 to C3 in priority order
+static constexpr BitField NO_FIELD{0, 0, 0x00};
+
+// model_bits select the model only while one of these bits is set
+static const uint8_t MODEL_BITS_MODE_MASK = 0x07;
+// Bits of content byte 3 set by host writes (special models and AT flag)
+static const uint8_t CONFIG_BITS_MASK = 0x87;
+
+inline uint8_t get_field(const uint8_t *content, const BitField &field) {
+  return (content[field.byte] >> field.shift) & field.mask;
+}
+
+inline void set_field(uint8_t *content, const BitField &field, uint8_t value) {
+  uint8_t mask = field.mask << field.shift;
+  content[field.byte] = (content[field.byte] & ~mask) | ((value << field.shift) & mask);
+}
+
+// Per speed model tables, indexed by SpeedModel
+static constexpr const char *const SPEED_MODEL_LABELS[SPEED_MODEL_COUNT] = {
+    "Eco 4x4",
+    "Off",
+    "Cruise",
+    "Sport",
+    "Hike IT",
+    "Auto",
+    "Launch",
+    "Anti-Slip",
+    "Valet",
+    "SL",
+};
+// model_byte value selecting the model, NO_MODEL for bit-selected models
+static constexpr uint8_t SPEED_MODEL_BYTE[SPEED_MODEL_COUNT] = {
+    0x00, 0x01, 0x02, 0x03, 0x04, 0x05, 0xFF, 0xFF, 0xFF, 0xFF,
+};
+static constexpr uint8_t SPEED_MODEL_BITS[SPEED_MODEL_COUNT] = {
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x01, 0x02, 0x04, 0x08,
+};
+// Field holding the model's step, NO_FIELD if it has none
+static constexpr BitField SPEED_MODEL_STEP[SPEED_MODEL_COUNT] = {
+    FIELD_STEP_ECONOMY,
+    NO_FIELD,
+    FIELD_STEP_CRUISE,
+    FIELD_STEP_SPORT,
+    FIELD_STEP_HIKE,
+    NO_FIELD,
+    NO_FIELD,
+    NO_FIELD,
+    NO_FIELD,
+    NO_FIELD,
+};
+
+// Decoding tables
+static constexpr uint8_t MODEL_BYTE_TO_MODEL[6] = {
+    0x00, 0x01, 0x02, 0x03, 0x04, 0x05,
+};
+static constexpr uint8_t MODEL_BITS_TO_MODEL[16] = {
+    0xFF, 0x06, 0x07, 0x06, 0x08, 0x06, 0x07, 0x06, 0x09, 0x06, 0x07, 0x06, 0x08, 0x06, 0x07, 0x06,
+};
+static constexpr uint8_t NOTICE_BITS_TO_CODE[8] = {
+    0x00, 0x01, 0x02, 0x01, 0x03, 0x01, 0x02, 0x01,
+};
+
+// Model label lookup, perfect hash over (first char, length)
+static const uint8_t LABEL_HASH_MULT = 6;
+static const uint8_t LABEL_HASH_SIZE = 12;
+static constexpr uint8_t LABEL_HASH_TABLE[LABEL_HASH_SIZE] = {
+    0x02, 0x00, 0xFF, 0x07, 0xFF, 0x08, 0x06, 0x04, 0x09, 0x01, 0x05, 0x03,
+};
+
+inline const char *speed_model_label(SpeedModel model) {
+  return model < SPEED_MODEL_COUNT ? SPEED_MODEL_LABELS[model] : "Unknown";
+}
+
+inline bool speed_model_from_label(const char *label, size_t len, SpeedModel &model) {
+  if (len == 0) {
+    return false;
+  }
+  uint8_t code = LABEL_HASH_TABLE[((uint8_t) label[0] * LABEL_HASH_MULT + len) % LABEL_HASH_SIZE];
+  if (code == NO_MODEL || strlen(SPEED_MODEL_LABELS[code]) != len ||
+      memcmp(SPEED_MODEL_LABELS[code], label, len) != 0) {
+    return false;
+  }
+  model = (SpeedModel) code;
+  return true;
+}
+
+inline bool decode_speed_model(const uint8_t *content, SpeedModel &model) {
+  uint8_t code;
+  if ((content[FIELD_MODEL_BITS.byte] & MODEL_BITS_MODE_MASK) == 0) {
+    uint8_t value = get_field(content, FIELD_MODEL_BYTE);
+    code = value < sizeof(MODEL_BYTE_TO_MODEL) ? MODEL_BYTE_TO_MODEL[value] : NO_MODEL;
+  } else {
+    code = MODEL_BITS_TO_MODEL[get_field(content, FIELD_MODEL_BITS)];
+  }
+  if (code == NO_MODEL) {
+    return false;
+  }
+  model = (SpeedModel) code;
+  return true;
+}
+
+inline NoticeCode decode_notice(const uint8_t *content) {
+  return (NoticeCode) NOTICE_BITS_TO_CODE[get_field(content, FIELD_NOTICE_BITS)];
+}
+
+}  // namespace hikeit_ble
+}  // namespace esphome
@@ -1,4 +1,6 @@
 #pragma once
+#include "esphome/core/defines.h"
+#ifdef USE_HIKEIT_BLE_SELECT
 #include "esphome/components/select/select.h"
 #include "hikeit_ble.h"
 
@@ -12,9 +14,7 @@ class HikeITSpeedSelect : public select::Select, public Component {
  protected:
   void control(const std::string &value) override {
     if (this->parent_ != nullptr) {
-      SpeedModel model = string_to_speed_model(value);
-      uint8_t at_flag = this->parent_->get_last_message().at_flag;
-      this->parent_->send_speed_model_command(model, at_flag);
+      this->parent_->request_speed_model(string_to_speed_model(value));
     }
   }
   
@@ -22,4 +22,5 @@ class HikeITSpeedSelect : public select::Select, public Component {
 };
 
 }  // namespace hikeit_ble
-}  // namespace esphome
\ No newline at end of file
+}  // namespace esphome
+#endif  // USE_HIKEIT_BLE_SELECT
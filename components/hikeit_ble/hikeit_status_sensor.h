@@ -1,4 +1,6 @@
 #pragma once
+#include "esphome/core/defines.h"
+#ifdef USE_HIKEIT_BLE_TEXT_SENSOR
 #include "esphome/components/text_sensor/text_sensor.h"
 #include "hikeit_ble.h"
 
@@ -18,4 +20,5 @@ class HikeITStatusSensor : public text_sensor::TextSensor, public Component {
 };
 
 }  // namespace hikeit_ble
-}  // namespace esphome
\ No newline at end of file
+}  // namespace esphome
+#endif  // USE_HIKEIT_BLE_TEXT_SENSOR
@@ -1,4 +1,6 @@
 #pragma once
+#include "esphome/core/defines.h"
+#ifdef USE_HIKEIT_BLE_NUMBER
 #include "esphome/components/number/number.h"
 #include "hikeit_ble.h"
 
@@ -12,9 +14,7 @@ class HikeITStepNumber : public number::Number, public Component {
  protected:
   void control(float value) override {
     if (this->parent_ != nullptr) {
-      uint8_t step = (uint8_t)value;
-      SpeedModel model = this->parent_->get_last_message().speed_model;
-      this->parent_->send_step_command(step, model);
+      this->parent_->request_step((uint8_t)value);
     }
   }
   
@@ -22,4 +22,5 @@ class HikeITStepNumber : public number::Number, public Component {
 };
 
 }  // namespace hikeit_ble
-}  // namespace esphome
\ No newline at end of file
+}  // namespace esphome
+#endif  // USE_HIKEIT_BLE_NUMBER
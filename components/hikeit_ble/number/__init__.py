@@ -20,6 +20,7 @@ CONFIG_SCHEMA = (
 
 
 async def to_code(config):
+    cg.add_define("USE_HIKEIT_BLE_NUMBER")
     var = await number.new_number(config, min_value=0, max_value=15, step=1)
     await cg.register_component(var, config)
     parent = await cg.get_variable(config[CONF_HIKEIT_BLE_ID])
@@ -0,0 +1,523 @@
+"""HIKE IT protocol schema.
+
+Single description of the frame layout, message types, speed models and
+Type 02 content bitfields. It is the source for:
+
+- components/hikeit_ble/hikeit_protocol.h (C++ enums, lookup tables and
+  field accessors used by the component)
+- tests/hikeit_protocol.py (the same tables for the Python tools)
+- the select options, read by the ESPHome codegen
+
+After editing the schema regenerate both files:
+
+    python components/hikeit_ble/protocol_schema.py
+
+and use --check in CI to fail when they are out of date.
+"""
+
+import argparse
+import os
+import sys
+from typing import List, NamedTuple, Optional, Tuple
+
+# Frame layout: header, sequence, type, content, device ID, checksum
+FRAME_LENGTH = 19
+CONTENT_LENGTH = 10
+HEADER = (0xAA, 0x55)
+
+
+class MessageType(NamedTuple):
+    name: str
+    code: int
+    doc: str
+
+
+class Field(NamedTuple):
+    """Bitfield inside the 10 content bytes"""
+    name: str
+    byte: int
+    shift: int
+    width: int
+    doc: str
+
+    @property
+    def mask(self) -> int:
+        return (1 << self.width) - 1
+
+
+class SpeedModel(NamedTuple):
+    name: str
+    code: int
+    label: str
+    # Value of model_byte selecting this model, None for bit-selected models
+    model_byte: Optional[int]
+    # Value of model_bits selecting this model (0 for byte-selected models)
+    model_bits: int
+    # Field holding this model's step, None if it has no step
+    step: Optional[str]
+
+
+MESSAGE_TYPES = [
+    MessageType("STUDY", 0x01, "Host: start pedal learning"),
+    MessageType("STATUS", 0x02, "Device: status, Host: configuration write"),
+    MessageType("LOCK", 0x05, "Host: lock with PIN"),
+    MessageType("UNLOCK", 0x06, "Host: unlock with PIN"),
+    MessageType("SCREEN", 0x08, "Host: screen toggle"),
+    MessageType("VERIFY", 0x09, "Verify request and response"),
+]
+
+# First content byte of the fixed host commands (remaining bytes are zero)
+COMMANDS = [
+    ("VERIFY_CONNECT", 0x03),
+    ("VERIFY_DISCONNECT", 0x04),
+    ("STUDY_MODE", 0x16),
+    ("SCREEN", 0x24),
+]
+
+# Type 02 content
+STATUS_FIELDS = [
+    Field("model_byte", 0, 0, 8, "Speed model while no special model bit is set"),
+    Field("step_economy", 1, 0, 4, "Eco 4x4 step"),
+    Field("step_cruise", 1, 4, 4, "Cruise step"),
+    Field("step_sport", 2, 0, 4, "Sport step"),
+    Field("step_hike", 2, 4, 4, "Hike IT step"),
+    Field("model_bits", 3, 0, 4, "Special model bits (Launch, Anti-Slip, Valet, SL)"),
+    Field("support_sl", 3, 4, 1, "Device supports SL"),
+    Field("at_flag", 3, 7, 1, "Auto transmission"),
+    Field("deep_cx", 4, 0, 8, "Pedal depth CX"),
+    Field("deep_sc", 5, 0, 8, "Pedal depth SC"),
+    Field("study_time", 6, 0, 4, "Pedal learning countdown"),
+    Field("study_phase", 6, 4, 4, "Pedal learning phase"),
+    Field("version", 7, 0, 8, "Firmware version in tenths"),
+    Field("unlocked", 8, 0, 8, "Zero while locked"),
+    Field("notice_bits", 9, 2, 3, "Notice bits, C1 to C3 in priority order"),
+]
+
+# model_bits only select a model while one of these bits is set,
+# otherwise model_byte applies
+MODEL_BITS_MODE_MASK = 0x07
+
+# Bits of content byte 3 set by host writes (special models and AT flag)
+CONFIG_BITS_MASK = 0x87
+
+# Ordered by code. Bit-selected models are listed in decode priority.
+SPEED_MODELS = [
+    SpeedModel("ECONOMY", 0, "Eco 4x4", 0, 0, "step_economy"),
+    SpeedModel("NORMAL", 1, "Off", 1, 0, None),
+    SpeedModel("CRUISE", 2, "Cruise", 2, 0, "step_cruise"),
+    SpeedModel("SPORT", 3, "Sport", 3, 0, "step_sport"),
+    SpeedModel("HIKE_IT", 4, "Hike IT", 4, 0, "step_hike"),
+    SpeedModel("AUTO", 5, "Auto", 5, 0, None),
+    SpeedModel("LAUNCH", 6, "Launch", None, 0x01, None),
+    SpeedModel("ANTI_SLIP", 7, "Anti-Slip", None, 0x02, None),
+    SpeedModel("VALET", 8, "Valet", None, 0x04, None),
+    SpeedModel("SL", 9, "SL", None, 0x08, None),
+]
+
+# Select entity options, in display order. SL has no matching option on
+# the device.
+SELECT_OPTIONS = ["NORMAL", "ECONOMY", "CRUISE", "SPORT", "HIKE_IT", "AUTO", "LAUNCH", "ANTI_SLIP", "VALET"]
+
+# Python-only enum aliases kept for existing scripts
+PYTHON_ALIASES = {"ANIT_SLIP": "ANTI_SLIP"}
+
+# Notice codes; bit values are relative to notice_bits, first match wins
+NOTICES = [("C1", 0x01), ("C2", 0x02), ("C3", 0x04)]
+
+NO_MODEL = 0xFF
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CPP_OUTPUT = os.path.join(HERE, "hikeit_protocol.h")
+PYTHON_OUTPUT = os.path.join(HERE, "..", "..", "tests", "hikeit_protocol.py")
+
+GENERATED_NOTE = "Generated from components/hikeit_ble/protocol_schema.py, do not edit."
+
+
+def _field(name: str) -> Field:
+    return next(f for f in STATUS_FIELDS if f.name == name)
+
+
+def _model(name: str) -> SpeedModel:
+    return next(m for m in SPEED_MODELS if m.name == name)
+
+
+def select_labels() -> List[str]:
+    """Select entity options (model labels) in display order"""
+    return [_model(name).label for name in SELECT_OPTIONS]
+
+
+def validate():
+    """Check the schema is self-consistent before generating"""
+    codes = [m.code for m in SPEED_MODELS]
+    if codes != list(range(len(SPEED_MODELS))):
+        raise ValueError("Speed model codes must be 0..N-1 in order")
+    seen = {}
+    for f in STATUS_FIELDS:
+        if not 0 <= f.byte < CONTENT_LENGTH or f.shift + f.width > 8:
+            raise ValueError(f"Field {f.name} does not fit its byte")
+        mask = f.mask << f.shift
+        if seen.get(f.byte, 0) & mask:
+            raise ValueError(f"Field {f.name} overlaps another field")
+        seen[f.byte] = seen.get(f.byte, 0) | mask
+    for m in SPEED_MODELS:
+        if (m.model_byte is None) == (m.model_bits == 0):
+            raise ValueError(f"Speed model {m.name} needs exactly one of model_byte/model_bits")
+        if m.step is not None:
+            _field(m.step)
+    for name in SELECT_OPTIONS:
+        _model(name)
+
+
+def model_byte_table() -> List[int]:
+    """model_byte value -> model code"""
+    size = max(m.model_byte for m in SPEED_MODELS if m.model_byte is not None) + 1
+    table = [NO_MODEL] * size
+    for m in SPEED_MODELS:
+        if m.model_byte is not None:
+            table[m.model_byte] = m.code
+    return table
+
+
+def model_bits_table() -> List[int]:
+    """model_bits value -> model code, lowest listed bit wins"""
+    table = []
+    for value in range(1 << _field("model_bits").width):
+        match = next((m.code for m in SPEED_MODELS if m.model_bits and value & m.model_bits), NO_MODEL)
+        table.append(match)
+    return table
+
+
+def notice_table() -> List[int]:
+    """notice_bits value -> notice index (0 none, 1.. in NOTICES order)"""
+    table = []
+    for value in range(1 << _field("notice_bits").width):
+        table.append(next((i + 1 for i, (_, bit) in enumerate(NOTICES) if value & bit), 0))
+    return table
+
+
+def label_hash() -> Tuple[int, int, List[int]]:
+    """Find a collision-free hash of (first char, length) for the labels
+
+    Returns (multiplier, table size, table of model codes).
+    """
+    labels = [(m.label, m.code) for m in SPEED_MODELS]
+    for size in range(len(labels), 256):
+        for mult in range(1, 64):
+            table = [NO_MODEL] * size
+            for label, code in labels:
+                slot = (ord(label[0]) * mult + len(label)) % size
+                if table[slot] != NO_MODEL:
+                    break
+                table[slot] = code
+            else:
+                return mult, size, table
+    raise ValueError("No collision-free label hash found")
+
+
+def _hex_list(values, width=2) -> str:
+    return ", ".join(f"0x{v:0{width}X}" for v in values)
+
+
+def generate_cpp() -> str:
+    mult, size, label_table = label_hash()
+    byte_table = model_byte_table()
+    lines = [
+        f"// {GENERATED_NOTE}",
+        "// Regenerate with: python components/hikeit_ble/protocol_schema.py",
+        "#pragma once",
+        "",
+        "#include <cstddef>",
+        "#include <cstdint>",
+        "#include <cstring>",
+        "",
+        "namespace esphome {",
+        "namespace hikeit_ble {",
+        "",
+        "// Frame layout: header, sequence, type, content, device ID, checksum",
+        f"static const uint8_t HEADER_BYTE_1 = 0x{HEADER[0]:02X};",
+        f"static const uint8_t HEADER_BYTE_2 = 0x{HEADER[1]:02X};",
+        f"static const uint8_t MESSAGE_LENGTH = {FRAME_LENGTH};",
+        f"static const uint8_t CONTENT_LENGTH = {CONTENT_LENGTH};",
+        "",
+        "// Message types",
+        "enum MessageType : uint8_t {",
+    ]
+    for t in MESSAGE_TYPES:
+        lines.append(f"  MSG_{t.name} = 0x{t.code:02X},  // {t.doc}")
+    lines += ["};", "", "// First content byte of fixed host commands"]
+    for name, value in COMMANDS:
+        lines.append(f"static const uint8_t CMD_{name} = 0x{value:02X};")
+
+    lines += ["", "// Speed model enumeration", "enum SpeedModel : uint8_t {"]
+    lines += [f"  SPEED_{m.name} = {m.code}," for m in SPEED_MODELS]
+    lines += [
+        "};",
+        "",
+        f"static const uint8_t SPEED_MODEL_COUNT = {len(SPEED_MODELS)};",
+        f"static const uint8_t NO_MODEL = 0x{NO_MODEL:02X};",
+        "",
+        "// Fault notice reported in Type 02 content byte 9",
+        "enum NoticeCode : uint8_t {",
+        "  NOTICE_NONE = 0,",
+    ]
+    lines += [f"  NOTICE_{name} = {i + 1}," for i, (name, _) in enumerate(NOTICES)]
+    lines += [
+        "};",
+        "",
+        "// Bitfield inside the 10 content bytes",
+        "struct BitField {",
+        "  uint8_t byte;",
+        "  uint8_t shift;",
+        "  uint8_t mask;  // unshifted, 0 for no field",
+        "};",
+        "",
+        "// Type 02 content fields",
+    ]
+    for f in STATUS_FIELDS:
+        lines.append(f"static constexpr BitField FIELD_{f.name.upper()}{{{f.byte}, {f.shift}, 0x{f.mask:02X}}};  // {f.doc}")
+    lines += [
+        "static constexpr BitField NO_FIELD{0, 0, 0x00};",
+        "",
+        "// model_bits select the model only while one of these bits is set",
+        f"static const uint8_t MODEL_BITS_MODE_MASK = 0x{MODEL_BITS_MODE_MASK:02X};",
+        "// Bits of content byte 3 set by host writes (special models and AT flag)",
+        f"static const uint8_t CONFIG_BITS_MASK = 0x{CONFIG_BITS_MASK:02X};",
+        "",
+        "inline uint8_t get_field(const uint8_t *content, const BitField &field) {",
+        "  return (content[field.byte] >> field.shift) & field.mask;",
+        "}",
+        "",
+        "inline void set_field(uint8_t *content, const BitField &field, uint8_t value) {",
+        "  uint8_t mask = field.mask << field.shift;",
+        "  content[field.byte] = (content[field.byte] & ~mask) | ((value << field.shift) & mask);",
+        "}",
+        "",
+        "// Per speed model tables, indexed by SpeedModel",
+        "static constexpr const char *const SPEED_MODEL_LABELS[SPEED_MODEL_COUNT] = {",
+    ]
+    lines += [f'    "{m.label}",' for m in SPEED_MODELS]
+    lines += [
+        "};",
+        "// model_byte value selecting the model, NO_MODEL for bit-selected models",
+        "static constexpr uint8_t SPEED_MODEL_BYTE[SPEED_MODEL_COUNT] = {",
+        "    " + _hex_list(NO_MODEL if m.model_byte is None else m.model_byte for m in SPEED_MODELS) + ",",
+        "};",
+        "static constexpr uint8_t SPEED_MODEL_BITS[SPEED_MODEL_COUNT] = {",
+        "    " + _hex_list(m.model_bits for m in SPEED_MODELS) + ",",
+        "};",
+        "// Field holding the model's step, NO_FIELD if it has none",
+        "static constexpr BitField SPEED_MODEL_STEP[SPEED_MODEL_COUNT] = {",
+    ]
+    lines += [f"    {'FIELD_' + m.step.upper() if m.step else 'NO_FIELD'}," for m in SPEED_MODELS]
+    lines += [
+        "};",
+        "",
+        "// Decoding tables",
+        f"static constexpr uint8_t MODEL_BYTE_TO_MODEL[{len(byte_table)}] = {{",
+        "    " + _hex_list(byte_table) + ",",
+        "};",
+        f"static constexpr uint8_t MODEL_BITS_TO_MODEL[{len(model_bits_table())}] = {{",
+        "    " + _hex_list(model_bits_table()) + ",",
+        "};",
+        f"static constexpr uint8_t NOTICE_BITS_TO_CODE[{len(notice_table())}] = {{",
+        "    " + _hex_list(notice_table()) + ",",
+        "};",
+        "",
+        "// Model label lookup, perfect hash over (first char, length)",
+        f"static const uint8_t LABEL_HASH_MULT = {mult};",
+        f"static const uint8_t LABEL_HASH_SIZE = {size};",
+        "static constexpr uint8_t LABEL_HASH_TABLE[LABEL_HASH_SIZE] = {",
+        "    " + _hex_list(label_table) + ",",
+        "};",
+        "",
+        "inline const char *speed_model_label(SpeedModel model) {",
+        '  return model < SPEED_MODEL_COUNT ? SPEED_MODEL_LABELS[model] : "Unknown";',
+        "}",
+        "",
+        "inline bool speed_model_from_label(const char *label, size_t len, SpeedModel &model) {",
+        "  if (len == 0) {",
+        "    return false;",
+        "  }",
+        "  uint8_t code = LABEL_HASH_TABLE[((uint8_t) label[0] * LABEL_HASH_MULT + len) % LABEL_HASH_SIZE];",
+        "  if (code == NO_MODEL || strlen(SPEED_MODEL_LABELS[code]) != len ||",
+        "      memcmp(SPEED_MODEL_LABELS[code], label, len) != 0) {",
+        "    return false;",
+        "  }",
+        "  model = (SpeedModel) code;",
+        "  return true;",
+        "}",
+        "",
+        "inline bool decode_speed_model(const uint8_t *content, SpeedModel &model) {",
+        "  uint8_t code;",
+        "  if ((content[FIELD_MODEL_BITS.byte] & MODEL_BITS_MODE_MASK) == 0) {",
+        "    uint8_t value = get_field(content, FIELD_MODEL_BYTE);",
+        "    code = value < sizeof(MODEL_BYTE_TO_MODEL) ? MODEL_BYTE_TO_MODEL[value] : NO_MODEL;",
+        "  } else {",
+        "    code = MODEL_BITS_TO_MODEL[get_field(content, FIELD_MODEL_BITS)];",
+        "  }",
+        "  if (code == NO_MODEL) {",
+        "    return false;",
+        "  }",
+        "  model = (SpeedModel) code;",
+        "  return true;",
+        "}",
+        "",
+        "inline NoticeCode decode_notice(const uint8_t *content) {",
+        "  return (NoticeCode) NOTICE_BITS_TO_CODE[get_field(content, FIELD_NOTICE_BITS)];",
+        "}",
+        "",
+        "}  // namespace hikeit_ble",
+        "}  // namespace esphome",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def generate_python() -> str:
+    lines = [
+        '"""HIKE IT protocol tables',
+        "",
+        f"{GENERATED_NOTE}",
+        "Regenerate with: python components/hikeit_ble/protocol_schema.py",
+        '"""',
+        "",
+        "from enum import Enum",
+        "from typing import NamedTuple, Optional",
+        "",
+        f"FRAME_LENGTH = {FRAME_LENGTH}",
+        f"CONTENT_LENGTH = {CONTENT_LENGTH}",
+        f"HEADER = bytes([{_hex_list(HEADER)}])",
+        "",
+        "# Message types",
+    ]
+    lines += [f"MSG_{t.name} = 0x{t.code:02X}  # {t.doc}" for t in MESSAGE_TYPES]
+    lines += ["", "# Fixed host command payloads"]
+    lines += [f"CONTENT_{name} = bytes([0x{value:02X}]) + bytes({CONTENT_LENGTH - 1})" for name, value in COMMANDS]
+    lines += [
+        "",
+        "",
+        "class BitField(NamedTuple):",
+        '    """Bitfield inside the 10 content bytes"""',
+        "    byte: int",
+        "    shift: int",
+        "    mask: int",
+        "",
+        "",
+        "# Type 02 content fields",
+    ]
+    for f in STATUS_FIELDS:
+        lines.append(f"FIELD_{f.name.upper()} = BitField({f.byte}, {f.shift}, 0x{f.mask:02X})  # {f.doc}")
+    lines += [
+        "",
+        "# model_bits select the model only while one of these bits is set",
+        f"MODEL_BITS_MODE_MASK = 0x{MODEL_BITS_MODE_MASK:02X}",
+        "# Bits of content byte 3 set by host writes (special models and AT flag)",
+        f"CONFIG_BITS_MASK = 0x{CONFIG_BITS_MASK:02X}",
+        "",
+        "",
+        "def get_field(content, field: BitField) -> int:",
+        "    return (content[field.byte] >> field.shift) & field.mask",
+        "",
+        "",
+        "def set_field(content: bytearray, field: BitField, value: int) -> None:",
+        "    mask = field.mask << field.shift",
+        "    content[field.byte] = (content[field.byte] & ~mask & 0xFF) | ((value << field.shift) & mask)",
+        "",
+        "",
+        "class SpeedModel(Enum):",
+        '    """Speed model enumeration"""',
+    ]
+    lines += [f'    {m.name} = ({m.code}, "{m.label}")' for m in SPEED_MODELS]
+    for alias, target in PYTHON_ALIASES.items():
+        m = _model(target)
+        lines.append(f'    {alias} = ({m.code}, "{m.label}")  # alias of {target}')
+    lines += [
+        "",
+        "    def __init__(self, code, desc):",
+        "        self.code = code",
+        "        self.desc = desc",
+        "",
+        "    @property",
+        "    def model_byte(self) -> Optional[int]:",
+        '        """model_byte value selecting this model, None if bit-selected"""',
+        "        return SPEED_MODEL_BYTE[self.code]",
+        "",
+        "    @property",
+        "    def model_bits(self) -> int:",
+        "        return SPEED_MODEL_BITS[self.code]",
+        "",
+        "    @property",
+        "    def step_field(self) -> Optional[BitField]:",
+        "        return SPEED_MODEL_STEP[self.code]",
+        "",
+        "    @property",
+        "    def step_name(self) -> Optional[str]:",
+        '        """Name of the step field (and ParsedMessage attribute)"""',
+        "        return SPEED_MODEL_STEP_NAME[self.code]",
+        "",
+        "",
+        "# Per speed model tables, indexed by code",
+        "SPEED_MODEL_BY_CODE = (" + ", ".join(f"SpeedModel.{m.name}" for m in SPEED_MODELS) + ",)",
+        "SPEED_MODEL_BYTE = (" + ", ".join("None" if m.model_byte is None else str(m.model_byte) for m in SPEED_MODELS) + ",)",
+        "SPEED_MODEL_BITS = (" + _hex_list(m.model_bits for m in SPEED_MODELS) + ",)",
+        "SPEED_MODEL_STEP = (" + ", ".join(f"FIELD_{m.step.upper()}" if m.step else "None" for m in SPEED_MODELS) + ",)",
+        "SPEED_MODEL_STEP_NAME = (" + ", ".join(f'"{m.step}"' if m.step else "None" for m in SPEED_MODELS) + ",)",
+        "SPEED_MODEL_BY_LABEL = {model.desc: model for model in SPEED_MODEL_BY_CODE}",
+        "",
+        "# Select entity options in display order",
+        "SELECT_OPTIONS = (" + ", ".join(f'"{label}"' for label in select_labels()) + ",)",
+        "",
+        "# Decoding tables, None / 0 where nothing matches",
+        "MODEL_BYTE_TO_MODEL = (" + ", ".join("None" if c == NO_MODEL else f"SpeedModel.{SPEED_MODELS[c].name}" for c in model_byte_table()) + ",)",
+        "MODEL_BITS_TO_MODEL = (" + ", ".join("None" if c == NO_MODEL else f"SpeedModel.{SPEED_MODELS[c].name}" for c in model_bits_table()) + ",)",
+        "NOTICE_BITS_TO_CODE = (" + ", ".join(str(c) for c in notice_table()) + ",)",
+        "# Notice names indexed by notice code",
+        "NOTICE_CODES = (" + ", ".join(f'"{name}"' for name in [""] + [n for n, _ in NOTICES]) + ",)",
+        "",
+        "",
+        "def decode_speed_model(content) -> Optional[SpeedModel]:",
+        "    if content[FIELD_MODEL_BITS.byte] & MODEL_BITS_MODE_MASK == 0:",
+        "        value = get_field(content, FIELD_MODEL_BYTE)",
+        "        return MODEL_BYTE_TO_MODEL[value] if value < len(MODEL_BYTE_TO_MODEL) else None",
+        "    return MODEL_BITS_TO_MODEL[get_field(content, FIELD_MODEL_BITS)]",
+        "",
+        "",
+        "def decode_notice(content) -> str:",
+        "    return NOTICE_CODES[NOTICE_BITS_TO_CODE[get_field(content, FIELD_NOTICE_BITS)]]",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def outputs():
+    validate()
+    return [(CPP_OUTPUT, generate_cpp()), (os.path.normpath(PYTHON_OUTPUT), generate_python())]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the HIKE IT protocol tables")
+    parser.add_argument("--check", action="store_true", help="Fail if the generated files are out of date")
+    args = parser.parse_args(argv)
+
+    stale = []
+    for path, content in outputs():
+        try:
+            with open(path, encoding="utf-8") as f:
+                current = f.read()
+        except FileNotFoundError:
+            current = None
+        if current == content:
+            continue
+        if args.check:
+            stale.append(path)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+            print(f"Wrote {os.path.relpath(path)}")
+
+    if stale:
+        for path in stale:
+            print(f"Out of date: {os.path.relpath(path)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
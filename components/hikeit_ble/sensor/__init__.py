@@ -0,0 +1,108 @@
+import esphome.codegen as cg
+import esphome.config_validation as cv
+from esphome.components import sensor
+from esphome.const import (
+    CONF_ID,
+    ENTITY_CATEGORY_DIAGNOSTIC,
+    STATE_CLASS_MEASUREMENT,
+    STATE_CLASS_TOTAL_INCREASING,
+    UNIT_MILLISECOND,
+)
+from .. import hikeit_ble_ns, HikeITBLEComponent, CONF_HIKEIT_BLE_ID
+
+DEPENDENCIES = ["hikeit_ble"]
+
+ICON_PULSE = "mdi:pulse"
+ICON_ALERT = "mdi:alert-circle-outline"
+ICON_TIMER = "mdi:timer-outline"
+ICON_RECONNECT = "mdi:connection"
+ICON_RETRANSMIT = "mdi:repeat"
+
+UNIT_FRAMES_PER_SECOND = "frames/s"
+
+CONF_FRAME_RATE = "frame_rate"
+CONF_CHECKSUM_REJECTS = "checksum_rejects"
+CONF_LENGTH_REJECTS = "length_rejects"
+CONF_ROUND_TRIP_P50 = "round_trip_p50"
+CONF_ROUND_TRIP_MAX = "round_trip_max"
+CONF_VERIFY_TIME = "verify_time"
+CONF_RECONNECTS = "reconnects"
+CONF_CONFIRM_TIME = "confirm_time"
+CONF_COMMANDS_FAILED = "commands_failed"
+CONF_RETRANSMITS = "retransmits"
+CONF_COMMANDS_LOST = "commands_lost"
+
+HikeITMetricsSensor = hikeit_ble_ns.class_("HikeITMetricsSensor", cg.PollingComponent)
+
+
+def _counter_schema(icon):
+    return sensor.sensor_schema(
+        icon=icon,
+        accuracy_decimals=0,
+        state_class=STATE_CLASS_TOTAL_INCREASING,
+        entity_category=ENTITY_CATEGORY_DIAGNOSTIC,
+    )
+
+
+def _latency_schema():
+    return sensor.sensor_schema(
+        unit_of_measurement=UNIT_MILLISECOND,
+        icon=ICON_TIMER,
+        accuracy_decimals=0,
+        state_class=STATE_CLASS_MEASUREMENT,
+        entity_category=ENTITY_CATEGORY_DIAGNOSTIC,
+    )
+
+
+# Sensor key -> setter on HikeITMetricsSensor
+SENSORS = {
+    CONF_FRAME_RATE: "set_frame_rate_sensor",
+    CONF_CHECKSUM_REJECTS: "set_checksum_rejects_sensor",
+    CONF_LENGTH_REJECTS: "set_length_rejects_sensor",
+    CONF_ROUND_TRIP_P50: "set_round_trip_p50_sensor",
+    CONF_ROUND_TRIP_MAX: "set_round_trip_max_sensor",
+    CONF_VERIFY_TIME: "set_verify_time_sensor",
+    CONF_RECONNECTS: "set_reconnects_sensor",
+    CONF_CONFIRM_TIME: "set_confirm_time_sensor",
+    CONF_COMMANDS_FAILED: "set_commands_failed_sensor",
+    CONF_RETRANSMITS: "set_retransmits_sensor",
+    CONF_COMMANDS_LOST: "set_commands_lost_sensor",
+}
+
+CONFIG_SCHEMA = (
+    cv.Schema({
+        cv.GenerateID(): cv.declare_id(HikeITMetricsSensor),
+        cv.GenerateID(CONF_HIKEIT_BLE_ID): cv.use_id(HikeITBLEComponent),
+        cv.Optional(CONF_FRAME_RATE): sensor.sensor_schema(
+            unit_of_measurement=UNIT_FRAMES_PER_SECOND,
+            icon=ICON_PULSE,
+            accuracy_decimals=1,
+            state_class=STATE_CLASS_MEASUREMENT,
+            entity_category=ENTITY_CATEGORY_DIAGNOSTIC,
+        ),
+        cv.Optional(CONF_CHECKSUM_REJECTS): _counter_schema(ICON_ALERT),
+        cv.Optional(CONF_LENGTH_REJECTS): _counter_schema(ICON_ALERT),
+        cv.Optional(CONF_ROUND_TRIP_P50): _latency_schema(),
+        cv.Optional(CONF_ROUND_TRIP_MAX): _latency_schema(),
+        cv.Optional(CONF_VERIFY_TIME): _latency_schema(),
+        cv.Optional(CONF_RECONNECTS): _counter_schema(ICON_RECONNECT),
+        cv.Optional(CONF_CONFIRM_TIME): _latency_schema(),
+        cv.Optional(CONF_COMMANDS_FAILED): _counter_schema(ICON_ALERT),
+        cv.Optional(CONF_RETRANSMITS): _counter_schema(ICON_RETRANSMIT),
+        cv.Optional(CONF_COMMANDS_LOST): _counter_schema(ICON_ALERT),
+    })
+    .extend(cv.polling_component_schema("60s"))
+)
+
+
+async def to_code(config):
+    cg.add_define("USE_HIKEIT_BLE_SENSOR")
+    var = cg.new_Pvariable(config[CONF_ID])
+    await cg.register_component(var, config)
+    parent = await cg.get_variable(config[CONF_HIKEIT_BLE_ID])
+    cg.add(var.set_parent(parent))
+
+    for key, setter in SENSORS.items():
+        if key in config:
+            sens = await sensor.new_sensor(config[key])
+            cg.add(getattr(var, setter)(sens))
@@ -20,6 +20,7 @@ CONFIG_SCHEMA = (
 
 
 async def to_code(config):
+    cg.add_define("USE_HIKEIT_BLE_SWITCH")
     var = await switch.new_switch(config)
     await cg.register_component(var, config)
     parent = await cg.get_variable(config[CONF_HIKEIT_BLE_ID])
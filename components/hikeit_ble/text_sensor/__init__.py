@@ -20,6 +20,7 @@ CONFIG_SCHEMA = (
 
 
 async def to_code(config):
+    cg.add_define("USE_HIKEIT_BLE_TEXT_SENSOR")
     var = await text_sensor.new_text_sensor(config)
     await cg.register_component(var, config)
     parent = await cg.get_variable(config[CONF_HIKEIT_BLE_ID])
@@ -0,0 +1,689 @@
+// Host driver for HikeITBLEComponent.
+//
+// Builds the firmware component against the stand-ins in include/ and plays
+// the ESP-IDF side: GATTC events (open, service discovery, notify
+// registration, notifications, disconnect) go into gattc_event_handler() and
+// a scripted device answers the component's writes.
+//
+//   hikeit_host bench [--iterations N] [--repeat R] [--check-alloc] [--json]
+//   hikeit_host decode < frames.txt      one hex frame per line -> JSON lines
+//   hikeit_host session                  connect, verify, commands, reconnect
+//
+// Common options: --log-level none|error|warn|info|config|debug|verbose
+//                 --log-rate R (lines/s per log category, burst 10; 0 = no limit)
+//                 --log-summary MS (summary line interval)
+
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <new>
+#include <string>
+#include <vector>
+
+#include "host_runtime.h"
+#include "hikeit_ble/hikeit_ble.h"
+#include "hikeit_ble/hikeit_button.h"
+#include "hikeit_ble/hikeit_locked_switch.h"
+#include "hikeit_ble/hikeit_speed_select.h"
+#include "hikeit_ble/hikeit_status_sensor.h"
+#include "hikeit_ble/hikeit_step_number.h"
+
+// ------------------------------------------------------------------
+// Allocation counter
+// ------------------------------------------------------------------
+static uint64_t allocations = 0;
+
+void *operator new(size_t size) {
+  allocations++;
+  if (void *ptr = std::malloc(size ? size : 1))
+    return ptr;
+  throw std::bad_alloc();
+}
+void *operator new[](size_t size) { return operator new(size); }
+void operator delete(void *ptr) noexcept { std::free(ptr); }
+void operator delete[](void *ptr) noexcept { std::free(ptr); }
+void operator delete(void *ptr, size_t) noexcept { std::free(ptr); }
+void operator delete[](void *ptr, size_t) noexcept { std::free(ptr); }
+
+namespace esphome {
+namespace hikeit_ble {
+namespace host_driver {
+
+static const uint32_t DEVICE_ID = 0x31E311E6;
+static const uint64_t DEVICE_ADDRESS = 0xC4BE8400A1B2ULL;
+
+// SL supported, deep CX=2 SC=3, V2.5, unlocked (same as the Python simulator)
+static const uint8_t DEFAULT_STATUS[CONTENT_LENGTH] = {0x00, 0x53, 0x74, 0x10, 0x02,
+                                                       0x03, 0x00, 0x19, 0x01, 0x00};
+
+// Protected members the driver calls directly
+class HostComponent : public HikeITBLEComponent {
+ public:
+  using HikeITBLEComponent::parse_message;
+};
+
+class HostSpeedSelect : public HikeITSpeedSelect {
+ public:
+  using HikeITSpeedSelect::control;
+};
+
+class HostStepNumber : public HikeITStepNumber {
+ public:
+  using HikeITStepNumber::control;
+};
+
+class HostLockedSwitch : public HikeITLockedSwitch {
+ public:
+  using HikeITLockedSwitch::write_state;
+};
+
+// Optimistic template switch, as used for connect_switch in the README
+class HostConnectSwitch : public switch_::Switch {
+ protected:
+  void write_state(bool state) override { this->publish_state(state); }
+};
+
+static void build_frame(uint8_t seq, uint8_t type, const uint8_t *content, uint32_t device_id,
+                        uint8_t *out) {
+  out[0] = HEADER_BYTE_1;
+  out[1] = HEADER_BYTE_2;
+  out[2] = seq;
+  out[3] = type;
+  memcpy(&out[4], content, CONTENT_LENGTH);
+  out[14] = device_id >> 24;
+  out[15] = device_id >> 16;
+  out[16] = device_id >> 8;
+  out[17] = device_id;
+  uint8_t sum = 0;
+  for (size_t i = 2; i < MESSAGE_LENGTH - 1; i++)
+    sum += out[i];
+  out[18] = sum;
+}
+
+// ------------------------------------------------------------------
+// Scripted device: answers verify, applies Type 02 writes and lock
+// commands and replies with its status, like tests/hikeit_simulator.py
+// (the PIN is not checked)
+// ------------------------------------------------------------------
+class ScriptedDevice {
+ public:
+  void on_write(const uint8_t *data, uint16_t len) {
+    for (uint16_t offset = 0; offset + MESSAGE_LENGTH <= len; offset += MESSAGE_LENGTH) {
+      if (this->drop_frames > 0) {
+        this->drop_frames--;
+        continue;
+      }
+      this->handle_frame_(data + offset);
+    }
+  }
+
+  void send_status() { this->queue_(MSG_STATUS, this->status); }
+
+  bool pop(Frame &frame) {
+    if (this->outbox_size_ == 0)
+      return false;
+    frame = this->outbox_[this->outbox_head_];
+    this->outbox_head_ = (this->outbox_head_ + 1) % OUTBOX_SIZE;
+    this->outbox_size_--;
+    return true;
+  }
+
+  void clear() {
+    this->outbox_head_ = 0;
+    this->outbox_size_ = 0;
+  }
+
+  uint8_t status[CONTENT_LENGTH]{};
+  uint32_t device_id{DEVICE_ID};
+  bool accept_verify{true};
+  // Drop Type 02 writes, as a device that missed the command would
+  bool ignore_config{false};
+  // Frames lost on the air before reaching the device
+  uint32_t drop_frames{0};
+  uint32_t frames_received{0};
+
+ protected:
+  static const size_t OUTBOX_SIZE = 16;
+
+  void handle_frame_(const uint8_t *frame) {
+    this->frames_received++;
+    const uint8_t *content = &frame[4];
+    switch (frame[3]) {
+      case MSG_VERIFY:
+        if (content[0] == CMD_VERIFY_CONNECT) {
+          uint8_t reply[CONTENT_LENGTH] = {(uint8_t) (this->accept_verify ? 0x01 : 0x00)};
+          this->queue_(MSG_VERIFY, reply);
+        }
+        break;
+      case MSG_STATUS:
+        if (this->ignore_config)
+          break;
+        set_field(this->status, FIELD_MODEL_BYTE, get_field(content, FIELD_MODEL_BYTE));
+        this->status[1] = content[1];
+        this->status[2] = content[2];
+        this->status[3] = (this->status[3] & ~CONFIG_BITS_MASK) | (content[3] & CONFIG_BITS_MASK);
+        this->send_status();
+        break;
+      case MSG_LOCK:
+      case MSG_UNLOCK:
+        set_field(this->status, FIELD_UNLOCKED, frame[3] == MSG_UNLOCK ? 1 : 0);
+        this->send_status();
+        break;
+      default:
+        break;
+    }
+  }
+
+  void queue_(uint8_t type, const uint8_t *content) {
+    if (this->outbox_size_ == OUTBOX_SIZE)
+      return;
+    Frame &frame = this->outbox_[(this->outbox_head_ + this->outbox_size_) % OUTBOX_SIZE];
+    build_frame(this->seq_++, type, content, this->device_id, frame.data());
+    this->outbox_size_++;
+  }
+
+  std::array<Frame, OUTBOX_SIZE> outbox_{};
+  size_t outbox_head_{0};
+  size_t outbox_size_{0};
+  uint8_t seq_{0};
+};
+
+// ------------------------------------------------------------------
+// Component wired up the way the generated main.cpp does it
+// ------------------------------------------------------------------
+// --log-rate / --log-summary, applied to every Harness
+static float log_rate = 0.0f;
+static uint32_t log_summary_interval = 0;
+
+// Local MTU the BLE core configures for the whole stack
+static const uint16_t STACK_MTU = 517;
+
+class Harness {
+ public:
+  Harness() {
+    memcpy(this->device.status, DEFAULT_STATUS, CONTENT_LENGTH);
+    host::set_millis(1000);
+    host::set_write_hook([this](uint16_t handle, const uint8_t *data, uint16_t len) {
+      if (handle != this->client.characteristic_handle)
+        return;
+      if (len > this->mtu - ATT_HEADER_LENGTH)
+        this->oversized_writes++;
+      if (len > MESSAGE_LENGTH)
+        this->packed_writes++;
+      this->device.on_write(data, len);
+    });
+
+    this->component.set_address(DEVICE_ADDRESS);
+    this->component.set_pin("1234");
+    // Packing is opt-in; the stack's local MTU is set by the BLE core
+    this->component.set_frames_per_write(2);
+    esp_ble_gatt_set_local_mtu(STACK_MTU);
+    for (int category = 0; category < LOG_CATEGORY_COUNT; category++)
+      this->component.set_log_limit(static_cast<LogCategory>(category), log_rate, 10);
+    this->component.set_log_summary_interval(log_summary_interval);
+    this->component.set_ble_client_parent(&this->client);
+    this->select.set_parent(&this->component);
+    this->component.set_speed_select(&this->select);
+    this->number.set_parent(&this->component);
+    this->component.set_step_number(&this->number);
+    this->locked.set_parent(&this->component);
+    this->component.set_locked_switch(&this->locked);
+    this->screen.set_parent(&this->component);
+    this->component.set_screen_button(&this->screen);
+    this->status.set_parent(&this->component);
+    this->component.set_status_sensor(&this->status);
+    this->connect_switch.publish_state(true);
+    this->component.set_connect_switch(&this->connect_switch);
+    this->component.add_on_verified_callback([this]() { this->verified_count++; });
+  }
+
+  ~Harness() { host::set_write_hook(nullptr); }
+
+  void boot() {
+    this->status.setup();
+    this->component.setup();
+    this->component.dump_config();
+    this->loop();
+  }
+
+  void loop() {
+    if (this->component.is_loop_enabled())
+      this->component.loop();
+  }
+
+  void event(esp_gattc_cb_event_t event, esp_ble_gattc_cb_param_t &param) {
+    this->component.gattc_event_handler(event, this->client.get_gattc_if(), &param);
+  }
+
+  // What ESP-IDF delivers for a successful connection: link open, service
+  // discovery, notify registration. The device then starts streaming status.
+  void open() {
+    esp_ble_gattc_cb_param_t param{};
+    param.open.status = ESP_GATT_OK;
+    param.open.mtu = DEFAULT_MTU;
+    this->event(ESP_GATTC_OPEN_EVT, param);
+    // ble_client's own MTU exchange settles on the smaller of the two MTUs
+    this->mtu = std::min(host::get_local_mtu(), this->peer_mtu);
+    param = {};
+    param.cfg_mtu.status = ESP_GATT_OK;
+    param.cfg_mtu.mtu = this->mtu;
+    this->event(ESP_GATTC_CFG_MTU_EVT, param);
+    param = {};
+    param.search_cmpl.status = ESP_GATT_OK;
+    this->event(ESP_GATTC_SEARCH_CMPL_EVT, param);
+    param = {};
+    param.reg_for_notify.status = ESP_GATT_OK;
+    param.reg_for_notify.handle = this->client.characteristic_handle;
+    this->event(ESP_GATTC_REG_FOR_NOTIFY_EVT, param);
+    this->device.send_status();
+  }
+
+  void drop() {
+    this->device.clear();
+    esp_ble_gattc_cb_param_t param{};
+    this->event(ESP_GATTC_DISCONNECT_EVT, param);
+    this->loop();
+  }
+
+  void notify(const uint8_t *data, uint16_t len) {
+    esp_ble_gattc_cb_param_t param{};
+    param.notify.handle = this->client.characteristic_handle;
+    param.notify.value = const_cast<uint8_t *>(data);
+    param.notify.value_len = len;
+    param.notify.is_notify = true;
+    this->event(ESP_GATTC_NOTIFY_EVT, param);
+  }
+
+  // Deliver the device's queued frames, one notification each
+  void flush() {
+    Frame frame;
+    while (this->device.pop(frame)) {
+      this->notify(frame.data(), frame.size());
+    }
+  }
+
+  // Let time pass in 10ms steps, delivering replies as they are produced
+  void run_for(uint32_t ms) {
+    for (uint32_t elapsed = 0; elapsed < ms; elapsed += 10) {
+      this->flush();
+      host::advance(10);
+      this->flush();
+      this->loop();
+    }
+  }
+
+  bool connect() {
+    this->open();
+    for (int i = 0; i < 100 && !this->component.is_verified(); i++) {
+      this->run_for(10);
+    }
+    this->run_for(100);
+    return this->component.is_verified();
+  }
+
+  ble_client::BLEClient client;
+  HostComponent component;
+  HostSpeedSelect select;
+  HostStepNumber number;
+  HostLockedSwitch locked;
+  HikeITButton screen;
+  HikeITStatusSensor status;
+  HostConnectSwitch connect_switch;
+  ScriptedDevice device;
+  unsigned verified_count{0};
+  // MTU the device accepts, and the one negotiated for the current link
+  uint16_t peer_mtu{185};
+  uint16_t mtu{DEFAULT_MTU};
+  unsigned packed_writes{0};
+  unsigned oversized_writes{0};
+  // Constructed after the component, as in the generated main.cpp
+  SpeedModelChangeTrigger model_change{&this->component};
+  StepChangeTrigger step_change{&this->component};
+  LockChangeTrigger lock_change{&this->component};
+  NoticeTrigger notice{&this->component};
+  StudyProgressTrigger study_progress{&this->component};
+  CommandFailedTrigger command_failed{&this->component};
+};
+
+// ------------------------------------------------------------------
+// bench
+// ------------------------------------------------------------------
+struct Result {
+  const char *name;
+  double ns_per_op;
+  double allocs_per_op;
+  size_t ops;
+  bool must_be_alloc_free;
+};
+
+// Fastest run of iterations calls after one warmup call; allocations are
+// averaged over every timed call
+template<typename F>
+static Result measure(const char *name, size_t iterations, int repeat, bool alloc_free, F &&op) {
+  op(0);
+  double best = 0;
+  uint64_t allocs = 0;
+  for (int r = 0; r < repeat; r++) {
+    uint64_t before = allocations;
+    auto start = std::chrono::steady_clock::now();
+    for (size_t i = 0; i < iterations; i++) {
+      op(i);
+    }
+    auto elapsed = std::chrono::duration<double, std::nano>(std::chrono::steady_clock::now() - start).count();
+    allocs += allocations - before;
+    double per_op = elapsed / iterations;
+    if (r == 0 || per_op < best)
+      best = per_op;
+  }
+  return Result{name, best, (double) allocs / (iterations * repeat), iterations, alloc_free};
+}
+
+static int run_bench(size_t iterations, int repeat, bool check_alloc, bool json) {
+  Harness harness;
+  harness.boot();
+  if (!harness.connect()) {
+    fprintf(stderr, "Scripted connect did not reach the verified state\n");
+    return 2;
+  }
+
+  Frame status_a, status_b;
+  build_frame(0x10, MSG_STATUS, DEFAULT_STATUS, DEVICE_ID, status_a.data());
+  uint8_t changed[CONTENT_LENGTH];
+  memcpy(changed, DEFAULT_STATUS, CONTENT_LENGTH);
+  changed[1] ^= 0x11;  // both step nibbles, whichever model is active
+  build_frame(0x11, MSG_STATUS, changed, DEVICE_ID, status_b.data());
+  uint8_t double_frame[2 * MESSAGE_LENGTH];
+  memcpy(double_frame, status_a.data(), MESSAGE_LENGTH);
+  memcpy(double_frame + MESSAGE_LENGTH, status_a.data(), MESSAGE_LENGTH);
+  const size_t split = 10;
+
+  std::vector<Result> results;
+  results.push_back(measure("notify_status_same", iterations, repeat, true, [&](size_t) {
+    harness.notify(status_a.data(), MESSAGE_LENGTH);
+  }));
+  results.push_back(measure("notify_status_changed", iterations, repeat, true, [&](size_t i) {
+    const Frame &frame = (i & 1) ? status_b : status_a;
+    harness.notify(frame.data(), MESSAGE_LENGTH);
+  }));
+  results.push_back(measure("notify_double_frame", iterations, repeat, true, [&](size_t) {
+    harness.notify(double_frame, sizeof(double_frame));
+  }));
+  results.push_back(measure("notify_split_frame", iterations, repeat, true, [&](size_t) {
+    harness.notify(status_a.data(), split);
+    harness.notify(status_a.data() + split, MESSAGE_LENGTH - split);
+  }));
+  results.push_back(measure("parse_status", iterations, repeat, true, [&](size_t) {
+    ParsedMessage msg;
+    harness.component.parse_message(status_a.data(), MESSAGE_LENGTH, msg);
+  }));
+
+  // Command -> write -> device reply -> published status. Each command waits
+  // out the write interval so it is written immediately.
+  const std::string models[2] = {"Cruise", "Sport"};
+  results.push_back(measure("command_round_trip", iterations / 10 + 1, repeat, false, [&](size_t i) {
+    host::advance(100);
+    harness.select.control(models[i & 1]);
+    host::run_due();
+    harness.flush();
+  }));
+
+  // Verified link drops and comes back on the cached session
+  results.push_back(measure("reconnect_restore", iterations / 100 + 1, repeat, false, [&](size_t) {
+    harness.drop();
+    harness.open();
+    harness.flush();
+  }));
+
+  bool alloc_free = true;
+  for (const auto &result : results) {
+    if (result.must_be_alloc_free && result.allocs_per_op > 0)
+      alloc_free = false;
+  }
+
+  if (json) {
+    printf("{\"iterations\": %zu, \"repeat\": %d, \"alloc_free\": %s, \"results\": {", iterations, repeat,
+           alloc_free ? "true" : "false");
+    for (size_t i = 0; i < results.size(); i++) {
+      printf("%s\"%s\": {\"ns_per_op\": %.1f, \"allocs_per_op\": %.3f, \"ops\": %zu}", i ? ", " : "",
+             results[i].name, results[i].ns_per_op, results[i].allocs_per_op, results[i].ops);
+    }
+    printf("}}\n");
+  } else {
+    printf("%-24s %12s %12s\n", "Benchmark", "ns/op", "allocs/op");
+    for (const auto &result : results) {
+      printf("%-24s %12.1f %12.3f%s\n", result.name, result.ns_per_op, result.allocs_per_op,
+             result.must_be_alloc_free && result.allocs_per_op > 0 ? "  <- allocates" : "");
+    }
+    printf("Frames received: %u, checksum rejects: %u, writes: %u\n",
+           (unsigned) harness.component.get_frames_received(),
+           (unsigned) harness.component.get_checksum_rejects(), (unsigned) host::get_write_count());
+  }
+
+  if (!harness.component.is_verified()) {
+    fprintf(stderr, "Component left the verified state during the benchmark\n");
+    return 2;
+  }
+  if (check_alloc && !alloc_free) {
+    fprintf(stderr, "Notification path allocated on the heap\n");
+    return 1;
+  }
+  return 0;
+}
+
+// ------------------------------------------------------------------
+// decode
+// ------------------------------------------------------------------
+static int hex_value(char c) {
+  if (c >= '0' && c <= '9')
+    return c - '0';
+  if (c >= 'a' && c <= 'f')
+    return c - 'a' + 10;
+  if (c >= 'A' && c <= 'F')
+    return c - 'A' + 10;
+  return -1;
+}
+
+// Hex digits with optional spaces/colons; false on anything else
+static bool parse_hex(const char *line, std::vector<uint8_t> &out) {
+  out.clear();
+  int high = -1;
+  for (const char *p = line; *p != '\0' && *p != '\n' && *p != '\r'; p++) {
+    if (*p == ' ' || *p == ':' || *p == '\t')
+      continue;
+    int value = hex_value(*p);
+    if (value < 0)
+      return false;
+    if (high < 0) {
+      high = value;
+    } else {
+      out.push_back((uint8_t) ((high << 4) | value));
+      high = -1;
+    }
+  }
+  return high < 0;
+}
+
+// The fields the firmware keeps in ParsedMessage, one JSON object per frame
+static int run_decode() {
+  HostComponent component;
+  char line[1024];
+  std::vector<uint8_t> data;
+  while (fgets(line, sizeof(line), stdin) != nullptr) {
+    if (line[0] == '#' || line[0] == '\n' || line[0] == '\r' || line[0] == '\0')
+      continue;
+    if (!parse_hex(line, data)) {
+      printf("{\"error\": \"invalid hex\"}\n");
+      continue;
+    }
+    ParsedMessage msg;
+    if (!component.parse_message(data.data(), data.size(), msg)) {
+      printf("{\"valid\": false}\n");
+      continue;
+    }
+    printf("{\"valid\": true, \"count\": %u, \"type\": %u, \"device_id\": \"%08X\", \"content\": \"",
+           msg.count, msg.type, (unsigned) msg.device_id);
+    for (uint8_t byte : msg.content)
+      printf("%02X", byte);
+    printf("\"");
+    if (msg.type == MSG_STATUS) {
+      printf(", \"speed_model\": %u, \"step_economy\": %u, \"step_cruise\": %u, \"step_sport\": %u, "
+             "\"step_hike\": %u, \"deep_cx\": %u, \"deep_sc\": %u, \"version_tenths\": %d, "
+             "\"locked\": %s, \"notice\": %u, \"study_state\": %u, \"study_time\": %u, "
+             "\"at_flag\": %u, \"support_sl\": %s",
+             msg.speed_model, msg.step_economy, msg.step_cruise, msg.step_sport, msg.step_hike,
+             msg.deep_cx, msg.deep_sc, (int) (msg.version * 10.0f + 0.5f),
+             msg.is_safe_model ? "true" : "false", msg.notice, msg.study_state, msg.study_time,
+             msg.at_flag, msg.support_sl ? "true" : "false");
+    }
+    printf("}\n");
+  }
+  return 0;
+}
+
+// ------------------------------------------------------------------
+// session
+// ------------------------------------------------------------------
+// One scripted session with the log on, useful under valgrind/ASan
+static int run_session() {
+  Harness harness;
+  harness.boot();
+  if (!harness.connect()) {
+    fprintf(stderr, "Scripted connect did not reach the verified state\n");
+    return 1;
+  }
+
+  harness.select.control("Cruise");
+  harness.run_for(100);
+  // A lost write is resent and still applied
+  harness.device.drop_frames = 1;
+  harness.number.control(5);
+  harness.run_for(500);
+  bool resent = harness.number.state == 5 && harness.component.get_retransmits() == 1;
+  harness.number.control(7);
+  harness.run_for(100);
+  harness.locked.write_state(true);
+  harness.run_for(100);
+  // Issued together, so packed into one write
+  harness.locked.write_state(false);
+  harness.screen.press();
+  harness.run_for(100);
+  bool packed = harness.packed_writes == 1;
+
+  // A write the device never applies shows at once, then reverts
+  harness.device.ignore_config = true;
+  harness.select.control("Sport");
+  harness.run_for(100);
+  bool optimistic = harness.select.state == "Sport";
+  harness.run_for(2000);
+  bool reverted = harness.select.state == "Cruise";
+  harness.device.ignore_config = false;
+
+  // A command that is never queued is neither shown nor counted as failed
+  uint32_t writes = host::get_write_count();
+  harness.component.set_pin("12a4");
+  harness.locked.write_state(true);
+  bool unqueued_shown = harness.locked.state;
+  harness.run_for(2000);
+  bool unqueued = !unqueued_shown && host::get_write_count() == writes;
+  harness.component.set_pin("1234");
+
+  harness.drop();
+  harness.run_for(100);
+  bool reconnected = harness.connect();
+
+  printf("Verified: %u times, model %s, step %.0f, locked %s, status \"%s\"\n", harness.verified_count,
+         harness.select.state.c_str(), harness.number.state, harness.locked.state ? "yes" : "no",
+         harness.status.state.c_str());
+  printf("Frames received: %u, device frames received: %u, writes: %u, timers pending: %zu\n",
+         (unsigned) harness.component.get_frames_received(), (unsigned) harness.device.frames_received,
+         (unsigned) host::get_write_count(), host::pending_timers());
+  printf("Triggers: model %u, step %u, lock %u, notice %u, study %u, command failed %u\n",
+         harness.model_change.get_fired(), harness.step_change.get_fired(), harness.lock_change.get_fired(),
+         harness.notice.get_fired(), harness.study_progress.get_fired(), harness.command_failed.get_fired());
+  printf("Optimistic: shown %s, reverted %s, unqueued ignored %s, failed %u\n", optimistic ? "yes" : "no",
+         reverted ? "yes" : "no", unqueued ? "yes" : "no", (unsigned) harness.component.get_commands_failed());
+  printf("Retransmits: %u, commands lost: %u, lost write recovered %s, reconnects %u\n",
+         (unsigned) harness.component.get_retransmits(), (unsigned) harness.component.get_commands_lost(),
+         resent ? "yes" : "no", (unsigned) harness.component.get_reconnect_count());
+  // The MTU exchange belongs to ble_client, the component must not start its own
+  printf("MTU: %u, MTU requests: %u, packed writes: %u, oversized writes: %u, frames packed: %u\n",
+         (unsigned) harness.mtu, (unsigned) host::get_mtu_requests(), harness.packed_writes, harness.oversized_writes,
+         (unsigned) harness.component.get_frames_packed());
+  bool ok = reconnected && harness.component.get_reconnect_count() == 1 && resent && packed && harness.oversized_writes == 0 && host::get_mtu_requests() == 0 && harness.component.get_commands_lost() == 1 && optimistic && reverted && unqueued && harness.command_failed.get_fired() == 1 && harness.select.state == "Cruise" && harness.number.state == 7 &&
+            !harness.locked.state && harness.verified_count == 2 && harness.lock_change.get_fired() == 2 &&
+            harness.notice.get_fired() == 0;
+  return ok ? 0 : 1;
+}
+
+}  // namespace host_driver
+}  // namespace hikeit_ble
+}  // namespace esphome
+
+static int log_level_from_name(const char *name) {
+  static const char *const NAMES[] = {"none", "error", "warn", "info", "config", "debug", "verbose"};
+  for (int i = 0; i < 7; i++) {
+    if (strcmp(name, NAMES[i]) == 0)
+      return i;
+  }
+  return -1;
+}
+
+static void usage() {
+  fprintf(stderr,
+          "usage: hikeit_host bench [--iterations N] [--repeat R] [--check-alloc] [--json]\n"
+          "       hikeit_host decode < frames.txt\n"
+          "       hikeit_host session\n"
+          "options: --log-level none|error|warn|info|config|debug|verbose\n"
+          "         --log-rate R  --log-summary MS\n");
+}
+
+int main(int argc, char **argv) {
+  using namespace esphome::hikeit_ble::host_driver;
+  if (argc < 2) {
+    usage();
+    return 2;
+  }
+  std::string mode = argv[1];
+  size_t iterations = 200000;
+  int repeat = 5;
+  bool check_alloc = false;
+  bool json = false;
+  int log_level = mode == "session" ? ESPHOME_LOG_LEVEL_INFO : ESPHOME_LOG_LEVEL_ERROR;
+
+  for (int i = 2; i < argc; i++) {
+    std::string arg = argv[i];
+    if (arg == "--iterations" && i + 1 < argc) {
+      iterations = std::strtoul(argv[++i], nullptr, 10);
+    } else if (arg == "--repeat" && i + 1 < argc) {
+      repeat = std::atoi(argv[++i]);
+    } else if (arg == "--check-alloc") {
+      check_alloc = true;
+    } else if (arg == "--json") {
+      json = true;
+    } else if (arg == "--log-level" && i + 1 < argc) {
+      log_level = log_level_from_name(argv[++i]);
+    } else if (arg == "--log-rate" && i + 1 < argc) {
+      log_rate = std::strtof(argv[++i], nullptr);
+    } else if (arg == "--log-summary" && i + 1 < argc) {
+      log_summary_interval = std::strtoul(argv[++i], nullptr, 10);
+    } else {
+      usage();
+      return 2;
+    }
+  }
+  if (iterations == 0 || repeat <= 0 || log_level < 0) {
+    usage();
+    return 2;
+  }
+  esphome::host::set_log_level(log_level);
+
+  if (mode == "bench")
+    return run_bench(iterations, repeat, check_alloc, json);
+  if (mode == "decode")
+    return run_decode();
+  if (mode == "session")
+    return run_session();
+  usage();
+  return 2;
+}
@@ -0,0 +1,308 @@
+// Host implementations of the ESPHome/ESP-IDF calls HikeITBLEComponent
+// makes. Everything is single-threaded and driven from the host driver.
+
+#include "host_runtime.h"
+
+#include <algorithm>
+#include <cstdarg>
+#include <cstdio>
+#include <map>
+#include <string>
+#include <utility>
+#include <vector>
+
+#include "esp_gattc.h"
+#include "esphome/components/ble_client/ble_client.h"
+#include "esphome/components/logger/logger.h"
+#include "esphome/core/component.h"
+#include "esphome/core/helpers.h"
+#include "esphome/core/log.h"
+#include "esphome/core/preferences.h"
+
+namespace esphome {
+
+// ------------------------------------------------------------------
+// Clock and scheduler
+// ------------------------------------------------------------------
+namespace {
+
+struct Timer {
+  uint64_t id;
+  Component *component;
+  std::string name;
+  uint32_t due;
+  uint32_t interval;  // 0 for a timeout
+  std::function<void()> callback;
+};
+
+uint32_t now_ms = 0;
+uint64_t next_timer_id = 1;
+std::vector<Timer> timers;
+
+// Wrap-safe "a is not after b"
+bool not_after(uint32_t a, uint32_t b) { return (int32_t) (a - b) <= 0; }
+
+bool cancel_timer(Component *component, const std::string &name, bool interval) {
+  for (auto it = timers.begin(); it != timers.end(); ++it) {
+    if (it->component == component && it->name == name && (it->interval != 0) == interval) {
+      timers.erase(it);
+      return true;
+    }
+  }
+  return false;
+}
+
+void add_timer(Component *component, const std::string &name, uint32_t delay, uint32_t interval,
+               std::function<void()> &&callback) {
+  // A named timer replaces the pending one of the same kind, as in ESPHome
+  if (!name.empty()) {
+    cancel_timer(component, name, interval != 0);
+  }
+  timers.push_back(Timer{next_timer_id++, component, name, now_ms + delay, interval, std::move(callback)});
+}
+
+// Index of the earliest timer due at or before limit, -1 if none
+int next_due(uint32_t limit) {
+  int best = -1;
+  for (size_t i = 0; i < timers.size(); i++) {
+    if (!not_after(timers[i].due, limit)) {
+      continue;
+    }
+    if (best < 0 || (int32_t) (timers[i].due - timers[best].due) < 0 ||
+        (timers[i].due == timers[best].due && timers[i].id < timers[best].id)) {
+      best = (int) i;
+    }
+  }
+  return best;
+}
+
+// Run one timer. Callbacks may add or cancel timers, so nothing refers into
+// the vector while the callback runs.
+void fire(size_t index) {
+  Timer &timer = timers[index];
+  if (timer.interval == 0) {
+    std::function<void()> callback = std::move(timer.callback);
+    timers.erase(timers.begin() + index);
+    callback();
+    return;
+  }
+  uint64_t id = timer.id;
+  timer.due += timer.interval;
+  std::function<void()> callback = std::move(timer.callback);
+  callback();
+  for (auto &t : timers) {
+    if (t.id == id) {
+      t.callback = std::move(callback);
+      break;
+    }
+  }
+}
+
+}  // namespace
+
+uint32_t millis() { return now_ms; }
+
+namespace setup_priority {
+const float DATA = 600.0f;
+}  // namespace setup_priority
+
+void Component::set_timeout(uint32_t timeout, std::function<void()> &&f) {
+  add_timer(this, "", timeout, 0, std::move(f));
+}
+void Component::set_timeout(const std::string &name, uint32_t timeout, std::function<void()> &&f) {
+  add_timer(this, name, timeout, 0, std::move(f));
+}
+bool Component::cancel_timeout(const std::string &name) { return cancel_timer(this, name, false); }
+void Component::set_interval(uint32_t interval, std::function<void()> &&f) {
+  add_timer(this, "", interval, interval, std::move(f));
+}
+void Component::set_interval(const std::string &name, uint32_t interval, std::function<void()> &&f) {
+  add_timer(this, name, interval, interval, std::move(f));
+}
+bool Component::cancel_interval(const std::string &name) { return cancel_timer(this, name, true); }
+
+namespace host {
+
+void set_millis(uint32_t now) { now_ms = now; }
+
+void advance(uint32_t ms) {
+  uint32_t target = now_ms + ms;
+  int index;
+  while ((index = next_due(target)) >= 0) {
+    if (!not_after(timers[index].due, now_ms)) {
+      now_ms = timers[index].due;
+    }
+    fire(index);
+  }
+  now_ms = target;
+}
+
+void run_due() {
+  int index;
+  while ((index = next_due(now_ms)) >= 0) {
+    fire(index);
+  }
+}
+
+size_t pending_timers() { return timers.size(); }
+
+void clear_timers() { timers.clear(); }
+
+}  // namespace host
+
+// ------------------------------------------------------------------
+// Logging
+// ------------------------------------------------------------------
+namespace logger {
+static Logger host_logger;
+Logger *global_logger = &host_logger;
+}  // namespace logger
+
+void esp_log_printf_(int level, const char *tag, const char *format, ...) {
+  if (level > logger::global_logger->get_log_level()) {
+    return;
+  }
+  static const char LEVEL_LETTERS[] = "-EWICDVV";
+  fprintf(stderr, "[%6u][%c][%s]: ", (unsigned) now_ms, LEVEL_LETTERS[level & 7], tag);
+  va_list args;
+  va_start(args, format);
+  vfprintf(stderr, format, args);
+  va_end(args);
+  fputc('\n', stderr);
+}
+
+namespace host {
+void set_log_level(int level) { logger::global_logger->set_log_level(level); }
+}  // namespace host
+
+// ------------------------------------------------------------------
+// Helpers
+// ------------------------------------------------------------------
+// Fixed-seed xorshift so backoff jitter is the same on every run
+static uint32_t random_state = 0x2545F491;
+
+uint32_t random_uint32() {
+  random_state ^= random_state << 13;
+  random_state ^= random_state >> 17;
+  random_state ^= random_state << 5;
+  return random_state;
+}
+
+float random_float() { return (random_uint32() >> 8) / 16777216.0f; }
+
+uint32_t fnv1_hash(const std::string &str) {
+  uint32_t hash = 2166136261UL;
+  for (char c : str) {
+    hash *= 16777619UL;
+    hash ^= (uint8_t) c;
+  }
+  return hash;
+}
+
+std::string base64_encode(const uint8_t *buf, size_t buf_len) {
+  static const char CHARS[] = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/";
+  std::string out;
+  out.reserve((buf_len + 2) / 3 * 4);
+  for (size_t i = 0; i < buf_len; i += 3) {
+    uint32_t chunk = (uint32_t) buf[i] << 16;
+    if (i + 1 < buf_len)
+      chunk |= (uint32_t) buf[i + 1] << 8;
+    if (i + 2 < buf_len)
+      chunk |= buf[i + 2];
+    out += CHARS[(chunk >> 18) & 0x3F];
+    out += CHARS[(chunk >> 12) & 0x3F];
+    out += i + 1 < buf_len ? CHARS[(chunk >> 6) & 0x3F] : '=';
+    out += i + 2 < buf_len ? CHARS[chunk & 0x3F] : '=';
+  }
+  return out;
+}
+
+// ------------------------------------------------------------------
+// Preferences
+// ------------------------------------------------------------------
+static std::map<uint32_t, std::vector<uint8_t>> preference_store;
+static ESPPreferences host_preferences;
+ESPPreferences *global_preferences = &host_preferences;
+
+bool ESPPreferenceObject::save_(const uint8_t *data, size_t len) {
+  if (!this->valid_)
+    return false;
+  preference_store[this->key_].assign(data, data + len);
+  return true;
+}
+
+bool ESPPreferenceObject::load_(uint8_t *data, size_t len) {
+  auto it = this->valid_ ? preference_store.find(this->key_) : preference_store.end();
+  if (it == preference_store.end() || it->second.size() != len)
+    return false;
+  std::copy(it->second.begin(), it->second.end(), data);
+  return true;
+}
+
+namespace host {
+void clear_preferences() { preference_store.clear(); }
+}  // namespace host
+
+// ------------------------------------------------------------------
+// BLE client
+// ------------------------------------------------------------------
+namespace ble_client {
+
+BLECharacteristic *BLEClient::get_characteristic(esp32_ble_tracker::ESPBTUUID service,
+                                                 esp32_ble_tracker::ESPBTUUID chr) {
+  if (this->characteristic_handle == 0)
+    return nullptr;
+  this->characteristic_.handle = this->characteristic_handle;
+  return &this->characteristic_;
+}
+
+void BLEClient::connect() { this->connect_requests++; }
+void BLEClient::disconnect() { this->disconnect_requests++; }
+void BLEClient::set_enabled(bool enabled) { this->enabled_ = enabled; }
+
+}  // namespace ble_client
+
+// ------------------------------------------------------------------
+// GATT client calls
+// ------------------------------------------------------------------
+namespace host {
+static WriteHook write_hook;
+static uint32_t write_count = 0;
+static uint32_t notify_registrations = 0;
+static uint16_t local_mtu = 23;
+static uint32_t mtu_requests = 0;
+
+void set_write_hook(WriteHook hook) { write_hook = std::move(hook); }
+uint32_t get_write_count() { return write_count; }
+uint32_t get_notify_registrations() { return notify_registrations; }
+uint16_t get_local_mtu() { return local_mtu; }
+uint32_t get_mtu_requests() { return mtu_requests; }
+}  // namespace host
+
+}  // namespace esphome
+
+esp_err_t esp_ble_gattc_write_char(esp_gatt_if_t gattc_if, uint16_t conn_id, uint16_t handle,
+                                   uint16_t value_len, uint8_t *value,
+                                   esp_gatt_write_type_t write_type, esp_gatt_auth_req_t auth_req) {
+  esphome::host::write_count++;
+  if (esphome::host::write_hook) {
+    esphome::host::write_hook(handle, value, value_len);
+  }
+  return ESP_OK;
+}
+
+esp_err_t esp_ble_gattc_register_for_notify(esp_gatt_if_t gattc_if, esp_bd_addr_t server_bda,
+                                            uint16_t handle) {
+  esphome::host::notify_registrations++;
+  return ESP_OK;
+}
+
+esp_err_t esp_ble_gattc_send_mtu_req(esp_gatt_if_t gattc_if, uint16_t conn_id) {
+  esphome::host::mtu_requests++;
+  return ESP_OK;
+}
+
+esp_err_t esp_ble_gatt_set_local_mtu(uint16_t mtu) {
+  esphome::host::local_mtu = mtu;
+  return ESP_OK;
+}
@@ -0,0 +1,40 @@
+#pragma once
+// Control surface of the host runtime behind the ESPHome/ESP-IDF stand-ins
+// in include/: a manual clock with the component scheduler, the GATT write
+// hook and counters the driver inspects.
+
+#include <cstddef>
+#include <cstdint>
+#include <functional>
+
+namespace esphome {
+namespace host {
+
+// Clock. millis() only moves when the driver advances it.
+void set_millis(uint32_t now);
+// Advance the clock by ms, running every timeout/interval that falls due on
+// the way in due order (the clock reads each timer's due time while it runs)
+void advance(uint32_t ms);
+// Run the timers already due at the current time
+void run_due();
+size_t pending_timers();
+// Drop every timer, e.g. between benchmark phases
+void clear_timers();
+
+// Called for every esp_ble_gattc_write_char() with the written bytes
+using WriteHook = std::function<void(uint16_t handle, const uint8_t *data, uint16_t len)>;
+void set_write_hook(WriteHook hook);
+uint32_t get_write_count();
+uint32_t get_notify_registrations();
+// Last esp_ble_gatt_set_local_mtu() value and esp_ble_gattc_send_mtu_req() calls
+uint16_t get_local_mtu();
+uint32_t get_mtu_requests();
+
+// Runtime log level (ESPHOME_LOG_LEVEL_*); messages above it are dropped
+void set_log_level(int level);
+
+// Forget everything saved through global_preferences
+void clear_preferences();
+
+}  // namespace host
+}  // namespace esphome
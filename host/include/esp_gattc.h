@@ -0,0 +1,91 @@
+#pragma once
+// Host stand-in for the ESP-IDF GATT client API: only the types, events and
+// calls HikeITBLEComponent uses. Values match ESP-IDF where it matters.
+
+#include <cstdint>
+
+typedef int esp_err_t;
+#define ESP_OK 0
+#define ESP_FAIL -1
+
+typedef uint8_t esp_gatt_if_t;
+typedef uint8_t esp_bd_addr_t[6];
+
+enum esp_gatt_status_t {
+  ESP_GATT_OK = 0x00,
+  ESP_GATT_ERROR = 0x85,
+};
+
+enum esp_gatt_write_type_t {
+  ESP_GATT_WRITE_TYPE_NO_RSP = 1,
+  ESP_GATT_WRITE_TYPE_RSP = 2,
+};
+
+enum esp_gatt_auth_req_t {
+  ESP_GATT_AUTH_REQ_NONE = 0,
+};
+
+enum esp_gattc_cb_event_t {
+  ESP_GATTC_REG_EVT = 0,
+  ESP_GATTC_UNREG_EVT = 1,
+  ESP_GATTC_OPEN_EVT = 2,
+  ESP_GATTC_READ_CHAR_EVT = 3,
+  ESP_GATTC_WRITE_CHAR_EVT = 4,
+  ESP_GATTC_CLOSE_EVT = 5,
+  ESP_GATTC_SEARCH_CMPL_EVT = 6,
+  ESP_GATTC_SEARCH_RES_EVT = 7,
+  ESP_GATTC_NOTIFY_EVT = 10,
+  ESP_GATTC_CFG_MTU_EVT = 18,
+  ESP_GATTC_REG_FOR_NOTIFY_EVT = 38,
+  ESP_GATTC_CONNECT_EVT = 40,
+  ESP_GATTC_DISCONNECT_EVT = 41,
+};
+
+union esp_ble_gattc_cb_param_t {
+  struct {
+    esp_gatt_status_t status;
+    uint16_t conn_id;
+    esp_bd_addr_t remote_bda;
+    uint16_t mtu;
+  } open;
+  struct {
+    esp_gatt_status_t status;
+    uint16_t conn_id;
+  } search_cmpl;
+  struct {
+    esp_gatt_status_t status;
+    uint16_t handle;
+  } reg_for_notify;
+  struct {
+    uint16_t conn_id;
+    esp_bd_addr_t remote_bda;
+    uint16_t handle;
+    uint16_t value_len;
+    uint8_t *value;
+    bool is_notify;
+  } notify;
+  struct {
+    esp_gatt_status_t status;
+    uint16_t conn_id;
+    uint16_t mtu;
+  } cfg_mtu;
+  struct {
+    esp_gatt_status_t status;
+    uint16_t conn_id;
+    uint16_t handle;
+    uint16_t offset;
+  } write;
+  struct {
+    int reason;
+    uint16_t conn_id;
+    esp_bd_addr_t remote_bda;
+  } disconnect;
+};
+
+esp_err_t esp_ble_gattc_write_char(esp_gatt_if_t gattc_if, uint16_t conn_id, uint16_t handle,
+                                   uint16_t value_len, uint8_t *value,
+                                   esp_gatt_write_type_t write_type, esp_gatt_auth_req_t auth_req);
+esp_err_t esp_ble_gattc_register_for_notify(esp_gatt_if_t gattc_if, esp_bd_addr_t server_bda,
+                                            uint16_t handle);
+esp_err_t esp_ble_gattc_send_mtu_req(esp_gatt_if_t gattc_if, uint16_t conn_id);
+esp_err_t esp_ble_gatt_set_local_mtu(uint16_t mtu);
@@ -0,0 +1,77 @@
+#pragma once
+// Host stand-in for the ESPHome BLE client. Nothing happens on the air: the
+// driver turns connect()/disconnect() requests into GATTC events itself.
+
+#include <cstdint>
+#include "esp_gattc.h"
+#include "esphome/core/component.h"
+
+namespace esphome {
+namespace esp32_ble_tracker {
+
+// Keeps the string pointer; the real class parses into a fixed struct, so
+// neither touches the heap
+class ESPBTUUID {
+ public:
+  static ESPBTUUID from_raw(const char *data) {
+    ESPBTUUID uuid;
+    uuid.raw_ = data;
+    return uuid;
+  }
+
+ protected:
+  const char *raw_{nullptr};
+};
+
+enum class ClientState { IDLE, CONNECTING, CONNECTED, ESTABLISHED };
+
+}  // namespace esp32_ble_tracker
+
+namespace ble_client {
+
+struct BLECharacteristic {
+  uint16_t handle;
+};
+
+class BLEClient {
+ public:
+  BLECharacteristic *get_characteristic(esp32_ble_tracker::ESPBTUUID service, esp32_ble_tracker::ESPBTUUID chr);
+  esp_gatt_if_t get_gattc_if() const { return 3; }
+  uint8_t *get_remote_bda() { return this->remote_bda_; }
+  uint16_t get_conn_id() const { return 0; }
+  uint16_t get_mtu() const { return this->mtu_; }
+  void connect();
+  void disconnect();
+  void set_enabled(bool enabled);
+  bool enabled() const { return this->enabled_; }
+
+  // Host side: requests made by the node since the driver last looked
+  unsigned connect_requests{0};
+  unsigned disconnect_requests{0};
+  // Handle returned for the component's characteristic, 0 = not found
+  uint16_t characteristic_handle{0x2a};
+
+ protected:
+  uint8_t remote_bda_[6]{};
+  uint16_t mtu_{23};
+  bool enabled_{false};
+  BLECharacteristic characteristic_{};
+};
+
+class BLEClientNode {
+ public:
+  virtual ~BLEClientNode() = default;
+  virtual void gattc_event_handler(esp_gattc_cb_event_t event, esp_gatt_if_t gattc_if,
+                                   esp_ble_gattc_cb_param_t *param) = 0;
+  virtual void loop() {}
+  void set_ble_client_parent(BLEClient *parent) { this->parent_ = parent; }
+  BLEClient *parent() { return this->parent_; }
+
+  esp32_ble_tracker::ClientState node_state{esp32_ble_tracker::ClientState::IDLE};
+
+ protected:
+  BLEClient *parent_{nullptr};
+};
+
+}  // namespace ble_client
+}  // namespace esphome
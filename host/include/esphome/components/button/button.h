@@ -0,0 +1,16 @@
+#pragma once
+
+namespace esphome {
+namespace button {
+
+class Button {
+ public:
+  virtual ~Button() = default;
+  void press() { this->press_action(); }
+
+ protected:
+  virtual void press_action() = 0;
+};
+
+}  // namespace button
+}  // namespace esphome
@@ -0,0 +1,22 @@
+#pragma once
+// Host logger: only the runtime log level, which the host ESP_LOGx macros
+// and the component's own level checks consult
+
+#include "esphome/core/log.h"
+
+namespace esphome {
+namespace logger {
+
+class Logger {
+ public:
+  int get_log_level() const { return this->log_level_; }
+  void set_log_level(int level) { this->log_level_ = level; }
+
+ protected:
+  int log_level_{ESPHOME_LOG_LEVEL_DEBUG};
+};
+
+extern Logger *global_logger;
+
+}  // namespace logger
+}  // namespace esphome
@@ -0,0 +1,22 @@
+#pragma once
+
+namespace esphome {
+namespace number {
+
+class Number {
+ public:
+  virtual ~Number() = default;
+  void publish_state(float state) {
+    this->state = state;
+    this->publishes++;
+  }
+
+  float state{0};
+  unsigned publishes{0};
+
+ protected:
+  virtual void control(float value) = 0;
+};
+
+}  // namespace number
+}  // namespace esphome
@@ -0,0 +1,24 @@
+#pragma once
+
+#include <string>
+
+namespace esphome {
+namespace select {
+
+class Select {
+ public:
+  virtual ~Select() = default;
+  void publish_state(const std::string &state) {
+    this->state = state;
+    this->publishes++;
+  }
+
+  std::string state;
+  unsigned publishes{0};
+
+ protected:
+  virtual void control(const std::string &value) = 0;
+};
+
+}  // namespace select
+}  // namespace esphome
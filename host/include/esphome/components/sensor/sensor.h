@@ -0,0 +1,19 @@
+#pragma once
+
+namespace esphome {
+namespace sensor {
+
+class Sensor {
+ public:
+  virtual ~Sensor() = default;
+  void publish_state(float state) {
+    this->state = state;
+    this->publishes++;
+  }
+
+  float state{0};
+  unsigned publishes{0};
+};
+
+}  // namespace sensor
+}  // namespace esphome
@@ -0,0 +1,34 @@
+#pragma once
+
+#include <functional>
+
+#include "esphome/core/helpers.h"
+
+namespace esphome {
+namespace switch_ {
+
+class Switch {
+ public:
+  virtual ~Switch() = default;
+  void publish_state(bool state) {
+    this->state = state;
+    this->publishes++;
+    this->state_callback_.call(state);
+  }
+  void add_on_state_callback(std::function<void(bool)> &&callback) {
+    this->state_callback_.add(std::move(callback));
+  }
+  void turn_on() { this->write_state(true); }
+  void turn_off() { this->write_state(false); }
+
+  bool state{false};
+  unsigned publishes{0};
+
+ protected:
+  virtual void write_state(bool state) = 0;
+
+  CallbackManager<void(bool)> state_callback_;
+};
+
+}  // namespace switch_
+}  // namespace esphome
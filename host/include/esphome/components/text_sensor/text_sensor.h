@@ -0,0 +1,21 @@
+#pragma once
+
+#include <string>
+
+namespace esphome {
+namespace text_sensor {
+
+class TextSensor {
+ public:
+  virtual ~TextSensor() = default;
+  void publish_state(const std::string &state) {
+    this->state = state;
+    this->publishes++;
+  }
+
+  std::string state;
+  unsigned publishes{0};
+};
+
+}  // namespace text_sensor
+}  // namespace esphome
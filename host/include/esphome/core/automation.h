@@ -0,0 +1,34 @@
+#pragma once
+
+#include "esphome/core/component.h"
+#include "esphome/core/helpers.h"
+
+namespace esphome {
+
+// Counts firings instead of running automations
+template<typename... Ts> class Trigger {
+ public:
+  void trigger(Ts... x) { this->fired_++; }
+  unsigned get_fired() const { return this->fired_; }
+
+ protected:
+  unsigned fired_{0};
+};
+
+template<typename... Ts> class Action {
+ public:
+  virtual ~Action() = default;
+  virtual void play(Ts... x) = 0;
+};
+
+template<typename T, typename... Ts> class Parented {
+ public:
+  Parented() = default;
+  explicit Parented(T *parent) : parent_(parent) {}
+  void set_parent(T *parent) { this->parent_ = parent; }
+
+ protected:
+  T *parent_{nullptr};
+};
+
+}  // namespace esphome
@@ -0,0 +1,54 @@
+#pragma once
+// Host stand-in for esphome::Component. Timeouts and intervals go to the
+// host scheduler (host_runtime.cpp) and run when the driver advances time.
+
+#include <cstdint>
+#include <functional>
+#include <string>
+
+#include "esphome/core/defines.h"
+#include "esphome/core/hal.h"
+
+namespace esphome {
+
+namespace setup_priority {
+extern const float DATA;
+}  // namespace setup_priority
+
+class Component {
+ public:
+  virtual ~Component() = default;
+  virtual void setup() {}
+  virtual void loop() {}
+  virtual void dump_config() {}
+  virtual float get_setup_priority() const { return 0.0f; }
+
+  void disable_loop() { this->loop_enabled_ = false; }
+  void enable_loop() { this->loop_enabled_ = true; }
+  bool is_loop_enabled() const { return this->loop_enabled_; }
+
+ protected:
+  void set_timeout(uint32_t timeout, std::function<void()> &&f);
+  void set_timeout(const std::string &name, uint32_t timeout, std::function<void()> &&f);
+  bool cancel_timeout(const std::string &name);
+  void set_interval(uint32_t interval, std::function<void()> &&f);
+  void set_interval(const std::string &name, uint32_t interval, std::function<void()> &&f);
+  bool cancel_interval(const std::string &name);
+
+  bool loop_enabled_{true};
+};
+
+class PollingComponent : public Component {
+ public:
+  PollingComponent() = default;
+  explicit PollingComponent(uint32_t update_interval) : update_interval_(update_interval) {}
+
+  virtual void update() = 0;
+  void set_update_interval(uint32_t update_interval) { this->update_interval_ = update_interval; }
+  uint32_t get_update_interval() const { return this->update_interval_; }
+
+ protected:
+  uint32_t update_interval_{60000};
+};
+
+}  // namespace esphome
@@ -0,0 +1,24 @@
+#pragma once
+// Host build: what ESPHome would generate for a configuration using every
+// hikeit_ble platform and trigger. Drop a define to build a reduced variant.
+
+#define USE_LOGGER
+#define USE_SENSOR
+#define USE_HIKEIT_BLE_SELECT
+#define USE_HIKEIT_BLE_NUMBER
+#define USE_HIKEIT_BLE_SWITCH
+#define USE_HIKEIT_BLE_BUTTON
+#define USE_HIKEIT_BLE_TEXT_SENSOR
+#define USE_HIKEIT_BLE_SENSOR
+#define USE_HIKEIT_BLE_CONNECT_SWITCH
+#define USE_HIKEIT_BLE_CAPTURE
+#define USE_HIKEIT_BLE_ON_CONNECTED
+#define USE_HIKEIT_BLE_ON_DISCONNECTED
+#define USE_HIKEIT_BLE_ON_VERIFIED
+#define USE_HIKEIT_BLE_ON_MESSAGE
+#define USE_HIKEIT_BLE_ON_SPEED_MODEL_CHANGE
+#define USE_HIKEIT_BLE_ON_STEP_CHANGE
+#define USE_HIKEIT_BLE_ON_LOCK_CHANGE
+#define USE_HIKEIT_BLE_ON_NOTICE
+#define USE_HIKEIT_BLE_ON_STUDY_PROGRESS
+#define USE_HIKEIT_BLE_ON_COMMAND_FAILED
@@ -0,0 +1,10 @@
+#pragma once
+
+#include <cstdint>
+
+namespace esphome {
+
+// Host clock, advanced by the driver (see host_runtime.h)
+uint32_t millis();
+
+}  // namespace esphome
@@ -0,0 +1,35 @@
+#pragma once
+
+#include <cstddef>
+#include <cstdint>
+#include <cstring>
+#include <functional>
+#include <string>
+#include <vector>
+
+#include "esphome/core/hal.h"
+
+namespace esphome {
+
+template<typename... X> class CallbackManager;
+
+template<typename... Ts> class CallbackManager<void(Ts...)> {
+ public:
+  void add(std::function<void(Ts...)> &&callback) { this->callbacks_.push_back(std::move(callback)); }
+  void call(Ts... args) {
+    for (auto &cb : this->callbacks_)
+      cb(args...);
+  }
+  size_t size() const { return this->callbacks_.size(); }
+  void operator()(Ts... args) { this->call(args...); }
+
+ protected:
+  std::vector<std::function<void(Ts...)>> callbacks_;
+};
+
+uint32_t random_uint32();
+float random_float();
+std::string base64_encode(const uint8_t *buf, size_t buf_len);
+uint32_t fnv1_hash(const std::string &str);
+
+}  // namespace esphome
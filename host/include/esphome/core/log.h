@@ -0,0 +1,56 @@
+#pragma once
+// Host logging: same macros and compile-time level as ESPHome, runtime level
+// taken from logger::global_logger, output on stderr.
+
+#define ESPHOME_LOG_LEVEL_NONE 0
+#define ESPHOME_LOG_LEVEL_ERROR 1
+#define ESPHOME_LOG_LEVEL_WARN 2
+#define ESPHOME_LOG_LEVEL_INFO 3
+#define ESPHOME_LOG_LEVEL_CONFIG 4
+#define ESPHOME_LOG_LEVEL_DEBUG 5
+#define ESPHOME_LOG_LEVEL_VERBOSE 6
+#define ESPHOME_LOG_LEVEL_VERY_VERBOSE 7
+
+#ifndef ESPHOME_LOG_LEVEL
+#define ESPHOME_LOG_LEVEL ESPHOME_LOG_LEVEL_DEBUG
+#endif
+
+namespace esphome {
+
+void esp_log_printf_(int level, const char *tag, const char *format, ...)
+    __attribute__((format(printf, 3, 4)));
+
+}  // namespace esphome
+
+#define ESPHOME_HOST_LOG_(level, tag, ...) ::esphome::esp_log_printf_(level, tag, __VA_ARGS__)
+
+#if ESPHOME_LOG_LEVEL >= ESPHOME_LOG_LEVEL_ERROR
+#define ESP_LOGE(tag, ...) ESPHOME_HOST_LOG_(ESPHOME_LOG_LEVEL_ERROR, tag, __VA_ARGS__)
+#else
+#define ESP_LOGE(tag, ...) do {} while (0)
+#endif
+#if ESPHOME_LOG_LEVEL >= ESPHOME_LOG_LEVEL_WARN
+#define ESP_LOGW(tag, ...) ESPHOME_HOST_LOG_(ESPHOME_LOG_LEVEL_WARN, tag, __VA_ARGS__)
+#else
+#define ESP_LOGW(tag, ...) do {} while (0)
+#endif
+#if ESPHOME_LOG_LEVEL >= ESPHOME_LOG_LEVEL_INFO
+#define ESP_LOGI(tag, ...) ESPHOME_HOST_LOG_(ESPHOME_LOG_LEVEL_INFO, tag, __VA_ARGS__)
+#else
+#define ESP_LOGI(tag, ...) do {} while (0)
+#endif
+#if ESPHOME_LOG_LEVEL >= ESPHOME_LOG_LEVEL_CONFIG
+#define ESP_LOGCONFIG(tag, ...) ESPHOME_HOST_LOG_(ESPHOME_LOG_LEVEL_CONFIG, tag, __VA_ARGS__)
+#else
+#define ESP_LOGCONFIG(tag, ...) do {} while (0)
+#endif
+#if ESPHOME_LOG_LEVEL >= ESPHOME_LOG_LEVEL_DEBUG
+#define ESP_LOGD(tag, ...) ESPHOME_HOST_LOG_(ESPHOME_LOG_LEVEL_DEBUG, tag, __VA_ARGS__)
+#else
+#define ESP_LOGD(tag, ...) do {} while (0)
+#endif
+#if ESPHOME_LOG_LEVEL >= ESPHOME_LOG_LEVEL_VERBOSE
+#define ESP_LOGV(tag, ...) ESPHOME_HOST_LOG_(ESPHOME_LOG_LEVEL_VERBOSE, tag, __VA_ARGS__)
+#else
+#define ESP_LOGV(tag, ...) do {} while (0)
+#endif
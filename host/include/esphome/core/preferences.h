@@ -0,0 +1,37 @@
+#pragma once
+// Host preferences, kept in memory for the lifetime of the process
+
+#include <cstddef>
+#include <cstdint>
+
+namespace esphome {
+
+class ESPPreferenceObject {
+ public:
+  ESPPreferenceObject() = default;
+  explicit ESPPreferenceObject(uint32_t key) : key_(key), valid_(true) {}
+
+  template<typename T> bool save(const T *src) {
+    return this->save_(reinterpret_cast<const uint8_t *>(src), sizeof(T));
+  }
+  template<typename T> bool load(T *dest) { return this->load_(reinterpret_cast<uint8_t *>(dest), sizeof(T)); }
+
+ protected:
+  bool save_(const uint8_t *data, size_t len);
+  bool load_(uint8_t *data, size_t len);
+
+  uint32_t key_{0};
+  bool valid_{false};
+};
+
+class ESPPreferences {
+ public:
+  template<typename T> ESPPreferenceObject make_preference(uint32_t type, bool in_flash) {
+    return ESPPreferenceObject(type);
+  }
+  template<typename T> ESPPreferenceObject make_preference(uint32_t type) { return ESPPreferenceObject(type); }
+};
+
+extern ESPPreferences *global_preferences;
+
+}  // namespace esphome
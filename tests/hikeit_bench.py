@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+HIKE IT Benchmark Suite
+Measures codec throughput, notification handling and the connect flow
+offline, and compares the results against a stored JSON baseline
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from hikeit_ble import BLEProtocol, HikeITBLE, SpeedModel, np
+from hikeit_simulator import DEFAULT_STATUS, SimulatedBus, SimulatedDevice
+
+BASELINE_VERSION = 1
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hikeit_bench_baseline.json")
+
+# Allowed slowdown before a benchmark counts as a regression (0.25 = 25%)
+DEFAULT_THRESHOLD = 0.25
+
+DEVICE_ID = bytes([0x31, 0xE3, 0x11, 0xE6])
+BATCH_FRAMES = 1024
+
+
+def _device_protocol() -> BLEProtocol:
+    protocol = BLEProtocol()
+    protocol.device_id = DEVICE_ID
+    return protocol
+
+
+def _status_frame() -> bytes:
+    return _device_protocol().build_message(0x02, DEFAULT_STATUS)
+
+
+def _verified_ble() -> HikeITBLE:
+    """HikeITBLE in the steady state: verified, device ID known"""
+    ble = HikeITBLE(verbose=False)
+    ble.protocol.device_id = DEVICE_ID
+    ble.verified = True
+    return ble
+
+
+def time_per_op(func: Callable[[], object], number: int, repeat: int) -> float:
+    """Fastest nanoseconds per call over repeat runs of number calls
+
+    The minimum is the run least disturbed by the rest of the system,
+    which keeps baseline comparisons stable on a busy machine.
+    """
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter_ns() - start) / number)
+    return min(samples)
+
+
+# ----------------------------------------------------------------------
+# Benchmarks: each returns (ns per op, ops per run)
+# ----------------------------------------------------------------------
+
+def bench_parse_status(number: int, repeat: int):
+    protocol = BLEProtocol()
+    frame = _status_frame()
+    return time_per_op(lambda: protocol.parse_message(frame), number, repeat), number
+
+
+def bench_parse_verify(number: int, repeat: int):
+    protocol = BLEProtocol()
+    frame = _device_protocol().build_message(0x09, bytes([0x01]) + bytes(9))
+    return time_per_op(lambda: protocol.parse_message(frame), number, repeat), number
+
+
+def bench_build_message(number: int, repeat: int):
+    protocol = _device_protocol()
+    return time_per_op(lambda: protocol.build_message(0x02, DEFAULT_STATUS), number, repeat), number
+
+
+def bench_build_into(number: int, repeat: int):
+    protocol = _device_protocol()
+    buffer = bytearray(19)
+    return time_per_op(lambda: protocol.build_into(buffer, 0, 0x02, DEFAULT_STATUS), number, repeat), number
+
+
+def bench_build_step(number: int, repeat: int):
+    protocol = _device_protocol()
+    return time_per_op(lambda: protocol.build_step_cmd(5, SpeedModel.CRUISE, DEFAULT_STATUS), number, repeat), number
+
+
+def bench_decode_batch(number: int, repeat: int):
+    """Per frame cost of decode_type02_batch over BATCH_FRAMES frames"""
+    protocol = _device_protocol()
+    buffer = b"".join(protocol.build_message(0x02, DEFAULT_STATUS) for _ in range(BATCH_FRAMES))
+    runs = max(1, number // BATCH_FRAMES)
+
+    def decode():
+        BLEProtocol.decode_type02_batch(BLEProtocol.frames_from_buffer(buffer))
+
+    return time_per_op(decode, runs, repeat) / BATCH_FRAMES, runs * BATCH_FRAMES
+
+
+def bench_notify_single(number: int, repeat: int):
+    ble = _verified_ble()
+    notification = bytearray(_status_frame())
+    return time_per_op(lambda: ble._handle_notification(notification), number, repeat), number
+
+
+def bench_notify_double(number: int, repeat: int):
+    """Cost per notification carrying two frames"""
+    ble = _verified_ble()
+    notification = bytearray(_status_frame() * 2)
+    return time_per_op(lambda: ble._handle_notification(notification), number, repeat), number
+
+
+def bench_connect_flow(number: int, repeat: int):
+    """connect() through verify and first status against a simulated device"""
+    runs = max(1, number // 1000)
+
+    async def connect_once() -> int:
+        device = SimulatedDevice(status_rate=0.0)
+        bus = SimulatedBus([device])
+        ble = HikeITBLE(verbose=False, client_factory=bus.client_factory, scanner=bus.scanner)
+        start = time.perf_counter_ns()
+        if not await ble.connect(device.address) or ble.last_status is None:
+            raise RuntimeError("Simulated connect failed")
+        elapsed = time.perf_counter_ns() - start
+        await ble.disconnect()
+        return elapsed
+
+    async def run() -> List[float]:
+        samples = []
+        for _ in range(repeat):
+            total = 0
+            for _ in range(runs):
+                total += await connect_once()
+            samples.append(total / runs)
+        return samples
+
+    # connect() reports progress on stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        samples = asyncio.run(run())
+    return min(samples), runs
+
+
+BENCHMARKS: Dict[str, Callable[[int, int], tuple]] = {
+    "parse_status": bench_parse_status,
+    "parse_verify": bench_parse_verify,
+    "build_message": bench_build_message,
+    "build_into": bench_build_into,
+    "build_step_cmd": bench_build_step,
+    "decode_batch_per_frame": bench_decode_batch,
+    "notify_single_frame": bench_notify_single,
+    "notify_double_frame": bench_notify_double,
+    "connect_verify_status": bench_connect_flow,
+}
+
+# Need numpy; skipped when it is not installed
+NUMPY_BENCHMARKS = {"decode_batch_per_frame"}
+
+
+def run_benchmarks(names: Optional[List[str]] = None, number: int = 20000, repeat: int = 5) -> dict:
+    """Run the selected benchmarks and return a baseline-format report"""
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        if name in NUMPY_BENCHMARKS and np is None:
+            continue
+        ns_per_op, ops = bench(number, repeat)
+        results[name] = {"ns_per_op": round(ns_per_op, 1), "ops": ops}
+    return {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "number": number,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD,
+            thresholds: Optional[Dict[str, float]] = None) -> List[dict]:
+    """Compare a report to a baseline, one row per benchmark
+
+    A benchmark regresses when it is slower than its baseline by more than
+    its threshold (per-benchmark thresholds override the default).
+    """
+    thresholds = thresholds or {}
+    rows = []
+    for name, result in report["results"].items():
+        base = baseline.get("results", {}).get(name)
+        limit = thresholds.get(name, threshold)
+        if base is None:
+            rows.append({"name": name, "current": result["ns_per_op"], "baseline": None,
+                         "change": None, "threshold": limit, "status": "new"})
+            continue
+        change = result["ns_per_op"] / base["ns_per_op"] - 1.0 if base["ns_per_op"] else 0.0
+        if change > limit:
+            status = "regressed"
+        elif change < -limit:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({"name": name, "current": result["ns_per_op"], "baseline": base["ns_per_op"],
+                     "change": round(change, 4), "threshold": limit, "status": status})
+    return rows
+
+
+def print_report(report: dict, rows: Optional[List[dict]] = None):
+    print("\n" + "="*78)
+    print(f"HIKE IT BENCHMARKS (Python {report['python']}, {report['machine']})")
+    print("="*78)
+    if rows is None:
+        for name, result in report["results"].items():
+            print(f"{name:26s} {result['ns_per_op']:14.1f} ns/op")
+    else:
+        print(f"{'Benchmark':26s} {'ns/op':>12s} {'baseline':>12s} {'change':>9s}  Status")
+        for row in rows:
+            base = "" if row["baseline"] is None else f"{row['baseline']:.1f}"
+            change = "" if row["change"] is None else f"{row['change'] * 100:+.1f}%"
+            mark = {"regressed": "❌", "improved": "🚀", "new": "🆕"}.get(row["status"], "✅")
+            print(f"{row['name']:26s} {row['current']:12.1f} {base:>12s} {change:>9s}  {mark} {row['status']}")
+    print("="*78)
+
+
+def parse_thresholds(values: List[str]) -> Dict[str, float]:
+    """name=fraction pairs, e.g. connect_verify_status=0.5"""
+    thresholds = {}
+    for value in values:
+        name, _, limit = value.partition("=")
+        if name not in BENCHMARKS or not limit:
+            raise argparse.ArgumentTypeError(f"Invalid threshold: {value}")
+        thresholds[name] = float(limit)
+    return thresholds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HIKE IT codec and connection benchmarks")
+    parser.add_argument("benchmarks", nargs="*", metavar="BENCHMARK",
+                        help=f"Benchmarks to run (default: all): {', '.join(BENCHMARKS)}")
+    parser.add_argument("--number", type=int, default=20000, help="Calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per benchmark (fastest is kept)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--compare", action="store_true", help="Compare against the baseline, exit 1 on regression")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown as a fraction (default 0.25)")
+    parser.add_argument("--threshold-for", action="append", default=[], metavar="NAME=FRACTION",
+                        help="Per-benchmark threshold, may be repeated")
+    parser.add_argument("--json", action="store_true", help="Print the report (and comparison) as JSON")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmark: {', '.join(unknown)}")
+    try:
+        thresholds = parse_thresholds(args.threshold_for)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    report = run_benchmarks(args.benchmarks, number=args.number, repeat=args.repeat)
+
+    rows = None
+    if args.compare:
+        try:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        except OSError as e:
+            print(f"❌ Cannot read baseline: {e}")
+            sys.exit(2)
+        if baseline.get("version") != BASELINE_VERSION:
+            print(f"❌ Unsupported baseline version {baseline.get('version')}")
+            sys.exit(2)
+        rows = compare(report, baseline, args.threshold, thresholds)
+
+    if args.json:
+        print(json.dumps({"report": report, "comparison": rows}, indent=2))
+    else:
+        print_report(report, rows)
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"💾 Baseline written to {args.baseline}")
+
+    if rows and any(row["status"] == "regressed" for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrupted by user")
+        sys.exit(0)
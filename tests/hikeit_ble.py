@@ -5,48 +5,123 @@ Handles complete BLE communication with HIKE IT devices
 """
 
 import asyncio
+import struct
 import sys
-from bleak import BleakScanner, BleakClient
-from typing import Optional, List, Tuple
-from dataclasses import dataclass
-from enum import Enum
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, Optional, List, Tuple
+from dataclasses import dataclass, field
+
+try:
+    from bleak import BleakScanner, BleakClient
+except ImportError:  # Only needed for real hardware, see hikeit_simulator.py
+    BleakScanner = BleakClient = None
+
+try:
+    import numpy as np
+except ImportError:  # Batch decoding is optional
+    np = None
+
+from hikeit_protocol import (
+    CONFIG_BITS_MASK,
+    CONTENT_LENGTH,
+    CONTENT_SCREEN,
+    CONTENT_STUDY_MODE,
+    CONTENT_VERIFY_CONNECT,
+    CONTENT_VERIFY_DISCONNECT,
+    FIELD_AT_FLAG,
+    FIELD_DEEP_CX,
+    FIELD_DEEP_SC,
+    FIELD_MODEL_BITS,
+    FIELD_MODEL_BYTE,
+    FIELD_NOTICE_BITS,
+    FIELD_STUDY_PHASE,
+    FIELD_STUDY_TIME,
+    FIELD_SUPPORT_SL,
+    FIELD_UNLOCKED,
+    FIELD_VERSION,
+    FRAME_LENGTH,
+    HEADER,
+    MODEL_BITS_MODE_MASK,
+    MODEL_BITS_TO_MODEL,
+    MODEL_BYTE_TO_MODEL,
+    NOTICE_BITS_TO_CODE,
+    NOTICE_CODES,
+    SpeedModel,
+    decode_notice,
+    decode_speed_model,
+    get_field,
+    set_field,
+)
 
 # BLE UUIDs
 SERVICE_UUID = "0000ffe0-0000-1000-8000-00805f9b34fb"
 NOTIFY_UUID = "0000ffe1-0000-1000-8000-00805f9b34fb"
 
-# Protocol constants
-HEADER = "AA55"
+# Protocol constants (frame layout and Type 02 fields: hikeit_protocol.py)
 SCAN_PREFIX = "HIKE"
+NO_DEVICE_ID = bytes(4)
+
+# Frame layout: header, sequence, type, content, device ID, checksum
+FRAME_STRUCT = struct.Struct(">2sBB10s4sB")
+FRAME_PREFIX_STRUCT = struct.Struct(">2sBB")
+
+# Request timeouts (seconds)
+FIRST_STATUS_TIMEOUT = 1.0
+VERIFY_TIMEOUT = 5.0
+COMMAND_TIMEOUT = 2.0
+
+# A write carries the MTU less the 3 byte ATT header. Links start at the
+# default MTU, room for one frame per write.
+DEFAULT_MTU = 23
+ATT_HEADER_LENGTH = 3
 
+# Seconds a scanned device stays in the discovery cache
+DISCOVERY_TTL = 30.0
 
-class SpeedModel(Enum):
-    """Speed model enumeration"""
-    ECONOMY = (0, "Eco 4x4")
-    NORMAL = (1, "Off")
-    CRUISE = (2, "Cruise")
-    SPORT = (3, "Sport")
-    HIKE_IT = (4, "Hike IT")
-    AUTO = (5, "Auto")
-    LAUNCH = (6, "Launch")
-    ANIT_SLIP = (7, "Anti-Slip")
-    VALET = (8, "Valet")
-    SL = (9, "SL")
+# Subscriber queues (statuses()/frames()): what happens when one is full
+#   block        the dispatcher waits for the subscriber, holding back everyone
+#   drop_oldest  the oldest queued message is discarded
+#   latest       only the newest message is kept
+SUBSCRIPTION_POLICIES = ("block", "drop_oldest", "latest")
+SUBSCRIPTION_QUEUE_SIZE = 64
+# Notifications queued for the dispatcher before the oldest is dropped
+NOTIFICATION_BACKLOG = 256
 
-    def __init__(self, code, desc):
-        self.code = code
-        self.desc = desc
+# Columns produced by BLEProtocol.decode_type02_batch
+TYPE02_BATCH_FIELDS = [
+    ("valid", "?"),           # header, checksum and type all OK
+    ("header_ok", "?"),
+    ("checksum_ok", "?"),
+    ("count", "u1"),
+    ("msg_type", "u1"),
+    ("device_id", ">u4"),
+    ("speed_model", "i1"),    # SpeedModel code, -1 when unknown
+    ("step_economy", "u1"),
+    ("step_cruise", "u1"),
+    ("step_sport", "u1"),
+    ("step_hike", "u1"),
+    ("deep_cx", "u1"),
+    ("deep_sc", "u1"),
+    ("study_state", "u1"),
+    ("study_time", "u1"),
+    ("version_raw", "u1"),    # firmware version in tenths
+    ("is_safe_model", "?"),
+    ("notice", "u1"),         # index into NOTICE_CODES
+    ("at_flag", "u1"),
+    ("support_sl", "?"),
+]
 
 
 @dataclass
 class ParsedMessage:
     """Parsed BLE message data"""
-    raw: str
+    raw: bytes
     count: int
     msg_type: int
-    content: str
-    device_id: str
-    checksum: str
+    content: bytes
+    device_id: bytes
+    checksum: int
     speed_model: Optional[SpeedModel] = None
     step_economy: int = 0
     step_cruise: int = 0
@@ -62,8 +137,18 @@ class ParsedMessage:
     at_flag: int = 0
     support_sl: bool = True
 
+    @property
+    def hex(self) -> str:
+        """Uppercase hex of the raw frame"""
+        return self.raw.hex().upper()
+
+    @property
+    def device_id_hex(self) -> str:
+        """Uppercase hex of the device ID"""
+        return self.device_id.hex().upper()
+
     def __str__(self):
-        result = f"Message Type {self.msg_type:02X} | Count: {self.count} | ID: {self.device_id}"
+        result = f"Message Type {self.msg_type:02X} | Count: {self.count} | ID: {self.device_id_hex}"
         if self.msg_type == 2:
             result += f"\n  Speed Model: {self.speed_model.desc if self.speed_model else 'Unknown'}"
             result += f"\n  Steps: Eco={self.step_economy}, Cruise={self.step_cruise}, Sport={self.step_sport}, Hike={self.step_hike}"
@@ -76,92 +161,126 @@ class ParsedMessage:
 
 
 class BLEProtocol:
-    """BLE Protocol handler"""
+    """BLE Protocol handler
+
+    Works on bytes-like objects (bytes, bytearray, memoryview) throughout;
+    hex is only produced for display.
+    """
     
     def __init__(self):
         self.sequence_counter = 0
-        self.device_id = "00000000"
+        self.device_id = NO_DEVICE_ID
+        # Reusable transmit buffer, the header never changes
+        self._tx_buffer = bytearray(FRAME_LENGTH)
+        self._tx_buffer[0:2] = HEADER
     
-    def get_sequence(self) -> str:
+    def get_sequence(self) -> int:
         """Get current sequence and increment"""
-        seq = f"{self.sequence_counter:02X}"
+        seq = self.sequence_counter
         self.sequence_counter = (self.sequence_counter + 1) % 256
         return seq
     
-    def calculate_checksum(self, data: str) -> str:
-        """Calculate checksum for message"""
-        total = 0
-        # Convert hex string to bytes and sum them
-        for i in range(0, len(data), 2):
-            total += int(data[i:i+2], 16)
-        checksum = total & 0xFF
-        return f"{checksum:02X}"
+    @staticmethod
+    def calculate_checksum(data) -> int:
+        """Calculate checksum over the frame body (sequence..device ID)"""
+        return sum(data) & 0xFF
+    
+    def build_into(self, buffer, offset: int, msg_type: int, content) -> None:
+        """Build a complete frame in place at buffer[offset:offset + 19]"""
+        if len(content) != CONTENT_LENGTH:
+            raise ValueError(f"Content must be {CONTENT_LENGTH} bytes")
+        
+        FRAME_PREFIX_STRUCT.pack_into(buffer, offset, HEADER, self.get_sequence(), msg_type)
+        buffer[offset + 4:offset + 14] = content
+        buffer[offset + 14:offset + 18] = self.device_id
+        body = memoryview(buffer)[offset + 2:offset + 18]
+        buffer[offset + 18] = self.calculate_checksum(body)
     
-    def build_message(self, msg_type: str, content: str) -> str:
+    def build_message(self, msg_type: int, content) -> bytes:
         """Build a complete message with header, sequence, checksum"""
-        seq = self.get_sequence()
-        body = seq + msg_type + content + self.device_id
-        checksum = self.calculate_checksum(body)
-        return HEADER + body + checksum
+        self.build_into(self._tx_buffer, 0, msg_type, content)
+        return bytes(self._tx_buffer)
     
-    def build_verify_connect(self) -> str:
+    @staticmethod
+    def reflected_by(command) -> Optional[Callable[[ParsedMessage], bool]]:
+        """Predicate matching the Type 02 status that reflects a host command
+        
+        Returns None for commands without a visible status effect.
+        """
+        msg_type = command[3]
+        if msg_type == 0x02:
+            target = bytes(command[4:8])
+            return lambda parsed: (
+                parsed.content[0:3] == target[0:3]
+                and (parsed.content[3] & CONFIG_BITS_MASK) == (target[3] & CONFIG_BITS_MASK)
+            )
+        if msg_type in (0x05, 0x06):
+            locked = msg_type == 0x05
+            return lambda parsed: parsed.is_safe_model == locked
+        return None
+    
+    @staticmethod
+    def pack_frames(frames: Iterable[bytes], max_length: int) -> List[bytes]:
+        """Group whole frames into write payloads of at most max_length bytes
+        
+        Frames keep their order and are never split; a payload always holds
+        at least one frame, so a small MTU gives one frame per write.
+        """
+        writes: List[bytes] = []
+        current = bytearray()
+        for frame in frames:
+            if current and len(current) + len(frame) > max_length:
+                writes.append(bytes(current))
+                current.clear()
+            current += frame
+        if current:
+            writes.append(bytes(current))
+        return writes
+    
+    def build_verify_connect(self) -> bytes:
         """Build verification connect command (Type 09, subtype 03)"""
-        return self.build_message("09", "03000000000000000000")
+        return self.build_message(0x09, CONTENT_VERIFY_CONNECT)
     
-    def build_verify_disconnect(self) -> str:
+    def build_verify_disconnect(self) -> bytes:
         """Build verification disconnect command (Type 09, subtype 04)"""
-        return self.build_message("09", "04000000000000000000")
+        return self.build_message(0x09, CONTENT_VERIFY_DISCONNECT)
     
-    def build_study_mode(self) -> str:
+    def build_study_mode(self) -> bytes:
         """Build study mode command (Type 01)"""
-        return self.build_message("01", "16000000000000000000")
+        return self.build_message(0x01, CONTENT_STUDY_MODE)
     
-    def build_screen_cmd(self) -> str:
+    def build_screen_cmd(self) -> bytes:
         """Build screen command (Type 08)"""
-        return self.build_message("08", "24000000000000000000")
+        return self.build_message(0x08, CONTENT_SCREEN)
     
-    def build_model_cmd(self, model: SpeedModel, at_flag: int, current_content: str) -> str:
+    def build_model_cmd(self, model: SpeedModel, at_flag: int, current_content) -> bytes:
         """Build speed model command (Type 02)"""
-        # Parse current content to preserve other settings
-        content_bytes = bytes.fromhex(current_content)
-        new_bytes = bytearray(content_bytes)
-        
-        if model.code <= 5:
-            new_bytes[0] = model.code
-            new_bytes[3] = 0
-        elif model == SpeedModel.LAUNCH:
-            new_bytes[3] = 1
-        elif model == SpeedModel.ANIT_SLIP:
-            new_bytes[3] = 2
-        else:
-            new_bytes[3] = 4
+        # Copy current content to preserve other settings
+        new_bytes = bytearray(current_content)
         
-        new_bytes[3] = new_bytes[3] | (at_flag << 7)
+        # Byte-selected models clear the model bits, the others set theirs
+        if model.model_byte is not None:
+            set_field(new_bytes, FIELD_MODEL_BYTE, model.model_byte)
+        new_bytes[FIELD_MODEL_BITS.byte] = model.model_bits
+        set_field(new_bytes, FIELD_AT_FLAG, at_flag)
         new_bytes[4] = 0
         new_bytes[5] = 0
         new_bytes[6] = 0
         
-        return self.build_message("02", new_bytes.hex().upper())
+        return self.build_message(0x02, new_bytes)
     
-    def build_step_cmd(self, step: int, model: SpeedModel, current_content: str) -> str:
+    def build_step_cmd(self, step: int, model: SpeedModel, current_content) -> bytes:
         """Build step adjustment command (Type 02)"""
-        content_bytes = bytes.fromhex(current_content)
-        new_bytes = bytearray(content_bytes)
+        new_bytes = bytearray(current_content)
         
         step = max(0, step)
         
-        if model == SpeedModel.ECONOMY:
-            new_bytes[1] = (new_bytes[1] & 0xF0) | (step & 0x0F)
-        elif model == SpeedModel.CRUISE:
-            new_bytes[1] = (new_bytes[1] & 0x0F) | ((step << 4) & 0xF0)
-        elif model == SpeedModel.SPORT:
-            new_bytes[2] = (new_bytes[2] & 0xF0) | (step & 0x0F)
-        elif model == SpeedModel.HIKE_IT:
-            new_bytes[2] = (new_bytes[2] & 0x0F) | ((step << 4) & 0xF0)
+        if model.step_field is not None:
+            set_field(new_bytes, model.step_field, step)
         
-        return self.build_message("02", new_bytes.hex().upper())
+        return self.build_message(0x02, new_bytes)
     
-    def build_safe_mode_cmd(self, password: str, enable: bool) -> str:
+    def build_safe_mode_cmd(self, password: str, enable: bool) -> bytes:
         """Build safe mode lock/unlock command (Type 05/06)
         
         Args:
@@ -169,7 +288,7 @@ class BLEProtocol:
             enable: True to lock (Type 05), False to unlock (Type 06)
         
         Returns:
-            Complete hex command string
+            Complete 19-byte frame
         
         Raises:
             ValueError: If password is not numeric
@@ -181,38 +300,32 @@ class BLEProtocol:
         if len(password) > 4:
             raise ValueError("Password must be 1-4 digits")
         
-        msg_type = "05" if enable else "06"
+        msg_type = 0x05 if enable else 0x06
         
         # Pad to 4 digits (takes last 4 chars, matching Java behavior)
-        pwd = ("0000" + password)[-4:]
+        pwd = bytes.fromhex(("0000" + password)[-4:])
         
-        # Byte swap to little-endian (e.g., "0123" becomes "2301")
-        pwd_swapped = pwd[2:4] + pwd[0:2]
+        # Byte swap to little-endian (e.g., "0123" becomes 23 01)
+        pwd_swapped = pwd[1:2] + pwd[0:1]
         
         # Duplicate password and pad with zeros
-        content = (pwd_swapped + pwd_swapped + "000000000000").upper()
+        content = pwd_swapped + pwd_swapped + bytes(6)
         
         return self.build_message(msg_type, content)
     
-    def parse_message(self, hex_data: str) -> Optional[ParsedMessage]:
-        """Parse received BLE message"""
-        if not hex_data.startswith(HEADER):
-            return None
-        
-        if len(hex_data) != 38:
+    def parse_message(self, data) -> Optional[ParsedMessage]:
+        """Parse a received 19-byte frame from any bytes-like object"""
+        view = memoryview(data)
+        if len(view) != FRAME_LENGTH:
             return None
         
         try:
-            data_bytes = bytes.fromhex(hex_data)
-            
-            count = data_bytes[2]
-            msg_type = data_bytes[3]
-            content = hex_data[8:28]
-            device_id = hex_data[28:36]
-            checksum = hex_data[36:38]
+            header, count, msg_type, content, device_id, checksum = FRAME_STRUCT.unpack_from(view)
+            if header != HEADER:
+                return None
             
             parsed = ParsedMessage(
-                raw=hex_data,
+                raw=bytes(view),
                 count=count,
                 msg_type=msg_type,
                 content=content,
@@ -222,7 +335,7 @@ class BLEProtocol:
             
             # Parse Type 02 messages (status/model info)
             if msg_type == 2:
-                self._parse_type02(parsed, data_bytes)
+                self._parse_type02(parsed, view)
             
             return parsed
         
@@ -230,150 +343,721 @@ class BLEProtocol:
             print(f"Error parsing message: {e}")
             return None
     
-    def _parse_type02(self, parsed: ParsedMessage, data_bytes: bytes):
+    @staticmethod
+    def frames_from_buffer(data):
+        """View a concatenated capture buffer as an N x 19 uint8 array"""
+        if np is None:
+            raise RuntimeError("numpy is required for batch decoding")
+        flat = np.frombuffer(data, dtype=np.uint8)
+        if flat.size % FRAME_LENGTH:
+            raise ValueError(f"Buffer length {flat.size} is not a multiple of {FRAME_LENGTH}")
+        return flat.reshape(-1, FRAME_LENGTH)
+    
+    @staticmethod
+    def decode_type02_batch(frames):
+        """Decode an N x 19 uint8 array of frames into a structured array
+        
+        Columns are listed in TYPE02_BATCH_FIELDS. Field values match
+        _parse_type02 frame for frame; rows that are not Type 02 keep the
+        ParsedMessage defaults (speed_model -1 stands for None).
+        """
+        if np is None:
+            raise RuntimeError("numpy is required for batch decoding")
+        
+        frames = np.asarray(frames, dtype=np.uint8)
+        if frames.ndim != 2 or frames.shape[1] != FRAME_LENGTH:
+            raise ValueError(f"Expected an N x {FRAME_LENGTH} array, got shape {frames.shape}")
+        
+        out = np.zeros(frames.shape[0], dtype=np.dtype(TYPE02_BATCH_FIELDS))
+        
+        out["header_ok"] = (frames[:, 0] == HEADER[0]) & (frames[:, 1] == HEADER[1])
+        body_sum = frames[:, 2:18].sum(axis=1, dtype=np.uint32)
+        out["checksum_ok"] = (body_sum & 0xFF) == frames[:, 18]
+        out["count"] = frames[:, 2]
+        out["msg_type"] = frames[:, 3]
+        out["device_id"] = frames[:, 14:18].copy().view(">u4").ravel()
+        
+        is_type02 = frames[:, 3] == 0x02
+        out["valid"] = out["header_ok"] & out["checksum_ok"] & is_type02
+        
+        content = frames[:, 4:4 + CONTENT_LENGTH]
+        
+        def column(field):
+            return (content[:, field.byte] >> field.shift) & field.mask
+        
+        # Speed model: model byte unless one of the Launch/Anti-Slip/Valet
+        # bits is set, both through the generated decoding tables
+        byte_to_model = np.full(256, -1, dtype=np.int8)
+        byte_to_model[:len(MODEL_BYTE_TO_MODEL)] = [m.code if m else -1 for m in MODEL_BYTE_TO_MODEL]
+        bits_to_model = np.array([m.code if m else -1 for m in MODEL_BITS_TO_MODEL], dtype=np.int8)
+        by_byte = (content[:, FIELD_MODEL_BITS.byte] & MODEL_BITS_MODE_MASK) == 0
+        model = np.where(
+            by_byte,
+            byte_to_model[column(FIELD_MODEL_BYTE)],
+            bits_to_model[column(FIELD_MODEL_BITS)],
+        )
+        out["speed_model"] = np.where(is_type02, model, -1)
+        
+        # Only the active model's step is reported
+        for speed_model in SpeedModel:
+            if speed_model.step_field is not None:
+                active = is_type02 & (model == speed_model.code)
+                out[speed_model.step_name] = np.where(active, column(speed_model.step_field), 0)
+        
+        out["at_flag"] = np.where(is_type02, column(FIELD_AT_FLAG), 0)
+        out["support_sl"] = np.where(is_type02, column(FIELD_SUPPORT_SL) == 1, True)
+        
+        out["deep_cx"] = np.where(is_type02, column(FIELD_DEEP_CX), 0)
+        out["deep_sc"] = np.where(is_type02, column(FIELD_DEEP_SC), 0)
+        
+        study_high = column(FIELD_STUDY_PHASE)
+        study_low = column(FIELD_STUDY_TIME)
+        study_state = np.select(
+            [study_high == 1, (study_high > 1) & (study_low != 0)],
+            [1, 3],
+            default=0,
+        )
+        out["study_state"] = np.where(is_type02, study_state, 0)
+        out["study_time"] = np.where(is_type02 & (study_high == 1), study_low, 0)
+        
+        out["version_raw"] = np.where(is_type02, column(FIELD_VERSION), 0)
+        out["is_safe_model"] = is_type02 & (column(FIELD_UNLOCKED) == 0)
+        
+        notice = np.asarray(NOTICE_BITS_TO_CODE, dtype=np.uint8)[column(FIELD_NOTICE_BITS)]
+        out["notice"] = np.where(is_type02, notice, 0)
+        
+        return out
+    
+    def _parse_type02(self, parsed: ParsedMessage, data_bytes):
         """Parse Type 02 message details"""
-        b1 = data_bytes[5]  # content byte 1
-        b2 = data_bytes[6]  # content byte 2
-        b3 = data_bytes[7]  # content byte 3
-        
-        b3_val = b3 & 0xFF
-        parsed.at_flag = b3_val >> 7
-        parsed.support_sl = ((b3_val >> 4) & 1) == 1
-        
-        # Determine speed model
-        if (b3 & 0x07) == 0:
-            model_byte = data_bytes[4]
-            if model_byte == 0:
-                parsed.speed_model = SpeedModel.ECONOMY
-                parsed.step_economy = b1 & 0x0F
-            elif model_byte == 1:
-                parsed.speed_model = SpeedModel.NORMAL
-            elif model_byte == 2:
-                parsed.speed_model = SpeedModel.CRUISE
-                parsed.step_cruise = ((b1 & 0xFF) >> 4) & 0x0F
-            elif model_byte == 3:
-                parsed.speed_model = SpeedModel.SPORT
-                parsed.step_sport = b2 & 0x0F
-            elif model_byte == 4:
-                parsed.speed_model = SpeedModel.HIKE_IT
-                parsed.step_hike = ((b2 & 0xFF) >> 4) & 0x0F
-            elif model_byte == 5:
-                parsed.speed_model = SpeedModel.AUTO
-        elif (b3 & 0x01) == 1:
-            parsed.speed_model = SpeedModel.LAUNCH
-        elif ((b3_val >> 1) & 1) == 1:
-            parsed.speed_model = SpeedModel.ANIT_SLIP
-        elif ((b3_val >> 2) & 1) == 1:
-            parsed.speed_model = SpeedModel.VALET
-        elif ((b3_val >> 3) & 1) == 1:
-            parsed.speed_model = SpeedModel.SL
+        content = data_bytes[4:4 + CONTENT_LENGTH]
+        
+        parsed.at_flag = get_field(content, FIELD_AT_FLAG)
+        parsed.support_sl = get_field(content, FIELD_SUPPORT_SL) == 1
+        
+        # Determine speed model; only the active model's step is reported
+        model = decode_speed_model(content)
+        if model is not None:
+            parsed.speed_model = model
+            if model.step_field is not None:
+                setattr(parsed, model.step_name, get_field(content, model.step_field))
         
         # Parse additional data
-        parsed.deep_cx = data_bytes[8] & 0xFF
-        parsed.deep_sc = data_bytes[9] & 0xFF
+        parsed.deep_cx = get_field(content, FIELD_DEEP_CX)
+        parsed.deep_sc = get_field(content, FIELD_DEEP_SC)
         
-        b10 = data_bytes[10]
-        study_high = b10 >> 4
+        study_high = get_field(content, FIELD_STUDY_PHASE)
+        study_low = get_field(content, FIELD_STUDY_TIME)
         if study_high == 1:
             parsed.study_state = 1
-            parsed.study_time = b10 & 0x0F
+            parsed.study_time = study_low
         elif study_high > 1:
-            parsed.study_state = 0 if (b10 & 0x0F) == 0 else 3
+            parsed.study_state = 0 if study_low == 0 else 3
+        
+        parsed.version = f"V{get_field(content, FIELD_VERSION) / 10.0:.1f}"
+        parsed.is_safe_model = get_field(content, FIELD_UNLOCKED) == 0
         
-        parsed.version = f"V{data_bytes[11] / 10.0:.1f}"
-        parsed.is_safe_model = data_bytes[12] == 0
+        notice = decode_notice(content)
+        if notice:
+            parsed.notice = notice
+
+
+class FrameReassembler:
+    """Streaming frame reassembler
+    
+    Notifications of any length are copied into a fixed ring buffer and
+    complete, checksum-valid frames are emitted exactly once. A bad header
+    or checksum drops a single byte and resyncs on the next AA55 header.
+    """
+    
+    def __init__(self, capacity: int = 256):
+        if capacity <= FRAME_LENGTH:
+            raise ValueError(f"Capacity must exceed {FRAME_LENGTH} bytes")
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._frame = bytearray(FRAME_LENGTH)
+        self._frame_view = memoryview(self._frame)
+        self._head = 0
+        self._size = 0
+        self.checksum_rejects = 0
+        self.discarded_bytes = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def clear(self):
+        """Drop any buffered partial frame"""
+        self._head = 0
+        self._size = 0
+    
+    def push(self, data) -> int:
+        """Copy as many bytes as fit, returns the number accepted"""
+        capacity = len(self._buffer)
+        count = min(len(data), capacity - self._size)
+        tail = (self._head + self._size) % capacity
+        first = min(count, capacity - tail)
+        self._view[tail:tail + first] = data[:first]
+        if count > first:
+            self._view[0:count - first] = data[first:count]
+        self._size += count
+        return count
+    
+    def _peek(self, offset: int) -> int:
+        return self._buffer[(self._head + offset) % len(self._buffer)]
+    
+    def _consume(self, count: int):
+        self._head = (self._head + count) % len(self._buffer)
+        self._size -= count
+    
+    def next_frame(self) -> Optional[memoryview]:
+        """Return the next complete frame, or None if more data is needed
+        
+        The returned view is reused by the next call.
+        """
+        capacity = len(self._buffer)
+        while self._size >= 2:
+            # Resync: skip bytes until a header is at the front
+            if self._peek(0) != HEADER[0] or self._peek(1) != HEADER[1]:
+                self._consume(1)
+                self.discarded_bytes += 1
+                continue
+            
+            # Wait for the rest of the frame
+            if self._size < FRAME_LENGTH:
+                return None
+            
+            head = self._head
+            first = min(FRAME_LENGTH, capacity - head)
+            self._frame_view[0:first] = self._view[head:head + first]
+            if first < FRAME_LENGTH:
+                self._frame_view[first:] = self._view[0:FRAME_LENGTH - first]
+            
+            if BLEProtocol.calculate_checksum(self._frame_view[2:18]) != self._frame[18]:
+                # Corrupt frame or false header, drop the header byte and resync
+                self._consume(1)
+                self.checksum_rejects += 1
+                self.discarded_bytes += 1
+                continue
+            
+            self._consume(FRAME_LENGTH)
+            return self._frame_view
         
-        b13 = data_bytes[13]
-        if ((b13 >> 2) & 1) == 1:
-            parsed.notice = "C1"
-        elif ((b13 >> 3) & 1) == 1:
-            parsed.notice = "C2"
-        elif ((b13 >> 4) & 1) == 1:
-            parsed.notice = "C3"
+        # A lone byte can only be kept if it may start a header
+        if self._size == 1 and self._peek(0) != HEADER[0]:
+            self._consume(1)
+            self.discarded_bytes += 1
+        return None
+    
+    def feed(self, data) -> Iterator[memoryview]:
+        """Push a notification and yield every frame it completes"""
+        view = memoryview(data)
+        while len(view):
+            accepted = self.push(view)
+            view = view[accepted:]
+            frame = self.next_frame()
+            while frame is not None:
+                yield frame
+                frame = self.next_frame()
+
+
+class RequestTimeoutError(TimeoutError):
+    """No matching response arrived in time"""
+
+
+@dataclass
+class PendingRequest:
+    """Request waiting for a response of a given type"""
+    seq: Optional[int]
+    expect: int
+    match: Optional[Callable[[ParsedMessage], bool]]
+    future: asyncio.Future = field(repr=False)
+
+
+class Subscription:
+    """Bounded message queue for one consumer of HikeITBLE
+
+    Iterate with ``async for``; iteration ends once the subscription is
+    closed and drained. dropped counts messages discarded by the policy.
+    """
+
+    def __init__(self, status_only: bool = False, policy: str = "drop_oldest",
+                 maxsize: int = SUBSCRIPTION_QUEUE_SIZE):
+        if policy not in SUBSCRIPTION_POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}, expected one of {', '.join(SUBSCRIPTION_POLICIES)}")
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.status_only = status_only
+        self.policy = policy
+        self.maxsize = 1 if policy == "latest" else maxsize
+        self.dropped = 0
+        self.closed = False
+        self._items: deque = deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def offer(self, message: ParsedMessage) -> bool:
+        """Queue without waiting; False only for a full block subscription"""
+        if self.closed:
+            return True
+        if len(self._items) >= self.maxsize:
+            if self.policy == "block":
+                return False
+            self._items.popleft()
+            self.dropped += 1
+        self._items.append(message)
+        self._not_empty.set()
+        if len(self._items) >= self.maxsize:
+            self._not_full.clear()
+        return True
+
+    async def put(self, message: ParsedMessage):
+        """Queue, waiting for room under the block policy"""
+        while not self.offer(message):
+            await self._not_full.wait()
+
+    async def get(self) -> ParsedMessage:
+        """Next message; raises StopAsyncIteration once closed and drained"""
+        while not self._items:
+            if self.closed:
+                raise StopAsyncIteration
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        message = self._items.popleft()
+        self._not_full.set()
+        return message
+
+    def close(self):
+        self.closed = True
+        self._not_empty.set()
+        self._not_full.set()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> ParsedMessage:
+        return await self.get()
+
+
+@dataclass
+class DiscoveredDevice:
+    """Device seen by a scan"""
+    name: str
+    address: str
+    rssi: Optional[int]
+    seen_at: float
+    # Scanner's device object; BleakClient accepts it in place of the
+    # address and then connects without scanning again
+    device: object = field(default=None, repr=False)
+
+    @property
+    def is_hike(self) -> bool:
+        return SCAN_PREFIX in self.name.upper()
+
+
+class DiscoveryCache:
+    """Recently seen devices by address, expiring ttl seconds after last seen"""
+
+    def __init__(self, ttl: float = DISCOVERY_TTL):
+        self.ttl = ttl
+        self._entries: Dict[str, DiscoveredDevice] = {}
+
+    def __len__(self) -> int:
+        return len(self.fresh())
+
+    def add(self, entry: DiscoveredDevice):
+        previous = self._entries.get(entry.address.upper())
+        # Advertisements without a scan response carry no name, keep the known one
+        if not entry.name and previous is not None:
+            entry.name = previous.name
+        self._entries[entry.address.upper()] = entry
+
+    def get(self, address: str) -> Optional[DiscoveredDevice]:
+        entry = self._entries.get(address.upper())
+        if entry is None or time.monotonic() - entry.seen_at > self.ttl:
+            return None
+        return entry
+
+    def fresh(self) -> List[DiscoveredDevice]:
+        """Unexpired entries, most recently seen first; drops the rest"""
+        now = time.monotonic()
+        self._entries = {k: e for k, e in self._entries.items() if now - e.seen_at <= self.ttl}
+        return sorted(self._entries.values(), key=lambda e: e.seen_at, reverse=True)
+
+    def clear(self):
+        self._entries.clear()
 
 
 class HikeITBLE:
     """Main BLE communication handler"""
     
-    def __init__(self):
+    def __init__(self, verbose: bool = True, client_factory=None, scanner=None,
+                 discovery_cache: Optional[DiscoveryCache] = None, discovery_ttl: float = DISCOVERY_TTL):
+        """
+        Args:
+            verbose: Print every received frame
+            client_factory: Callable taking a MAC (or a scanned device
+                object) and returning a BleakClient-like object (defaults
+                to BleakClient)
+            scanner: BleakScanner-like class, called with
+                detection_callback=... and started/stopped around a scan
+                (defaults to BleakScanner)
+            discovery_cache: Cache of scanned devices, may be shared
+                between instances (default: a new one with discovery_ttl)
+            discovery_ttl: Seconds a scanned device stays cached
+        """
+        self.client_factory = client_factory or BleakClient
+        self.scanner = scanner or BleakScanner
+        self.discovery_cache = discovery_cache if discovery_cache is not None else DiscoveryCache(discovery_ttl)
         self.client: Optional[BleakClient] = None
         self.protocol = BLEProtocol()
         self.connected = False
         self.verified = False
         self.last_message: Optional[ParsedMessage] = None
+        # Latest Type 02 status, the base for configuration commands
+        self.last_status: Optional[ParsedMessage] = None
+        self.last_status_at = 0.0
+        self.reassembler = FrameReassembler()
+        self._pending: List[PendingRequest] = []
+        # Raw notifications waiting for the dispatcher task
+        self._notifications: deque = deque()
+        self._notification_ready = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.notifications_dropped = 0
+        self._subscriptions: List[Subscription] = []
+        # Per-frame output; disable for capture analysis
+        self.verbose = verbose
     
-    async def scan_all_devices(self, duration: int = 10) -> List[Tuple[str, str]]:
-        """Scan for all BLE devices"""
-        print(f"\n🔍 Scanning for ALL BLE devices for {duration} seconds...")
-        devices = await BleakScanner.discover(timeout=duration)
+    async def scan_stream(
+        self,
+        duration: float = 10,
+        hike_only: bool = True,
+        targets: Optional[Iterable[str]] = None,
+        limit: Optional[int] = None,
+        use_cache: bool = True,
+    ) -> AsyncIterator[DiscoveredDevice]:
+        """Yield devices as they are detected instead of after the whole scan
+        
+        Fresh discovery cache entries come first, then live detections;
+        each device is yielded once. Ends after duration seconds, once
+        every address in targets has been seen (only targets are yielded
+        then), or after limit devices. If the cache already satisfies
+        targets or limit no scan is started. Every detection refreshes the
+        cache. Call aclose() when abandoning the stream early so the
+        scanner stops.
+        """
+        wanted = {address.upper() for address in targets} if targets is not None else None
+        seen = set()
         
-        results = []
-        for device in devices:
-            name = device.name or "Unknown"
-            results.append((name, device.address))
+        def accept(entry: DiscoveredDevice) -> bool:
+            address = entry.address.upper()
+            if address in seen:
+                return False
+            if wanted is not None:
+                return address in wanted
+            return not hike_only or entry.is_hike
         
+        def done() -> bool:
+            return ((wanted is not None and wanted <= seen)
+                    or (limit is not None and len(seen) >= limit))
+        
+        if use_cache:
+            for entry in self.discovery_cache.fresh():
+                if accept(entry):
+                    seen.add(entry.address.upper())
+                    yield entry
+                    if done():
+                        return
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        def on_detection(device, advertisement_data):
+            name = getattr(advertisement_data, "local_name", None) or device.name or ""
+            rssi = getattr(advertisement_data, "rssi", None)
+            queue.put_nowait(DiscoveredDevice(name, device.address, rssi, time.monotonic(), device))
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration
+        scanner = self.scanner(detection_callback=on_detection)
+        await scanner.start()
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return
+                try:
+                    entry = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    return
+                self.discovery_cache.add(entry)
+                if not accept(entry):
+                    continue
+                seen.add(entry.address.upper())
+                yield entry
+                if done():
+                    return
+        finally:
+            await scanner.stop()
+    
+    async def find_device(self, address: str, timeout: float = 10) -> Optional[DiscoveredDevice]:
+        """Cached entry for address, else scan until it is seen (or timeout)"""
+        stream = self.scan_stream(timeout, targets=[address])
+        try:
+            async for entry in stream:
+                return entry
+        finally:
+            await stream.aclose()
+        return None
+    
+    async def scan_all_devices(self, duration: int = 10, limit: Optional[int] = None) -> List[Tuple[str, str]]:
+        """Scan for all BLE devices, stopping early after limit devices"""
+        print(f"\n🔍 Scanning for ALL BLE devices for {duration} seconds...")
+        results = [(entry.name or "Unknown", entry.address)
+                   async for entry in self.scan_stream(duration, hike_only=False, limit=limit)]
         return sorted(results, key=lambda x: x[0])
     
-    async def scan_hike_devices(self, duration: int = 10) -> List[Tuple[str, str]]:
-        """Scan for HIKE IT devices only"""
+    async def scan_hike_devices(self, duration: int = 10, limit: Optional[int] = None) -> List[Tuple[str, str]]:
+        """Scan for HIKE IT devices only, stopping early after limit devices"""
         print(f"\n🔍 Scanning for HIKE IT devices for {duration} seconds...")
-        devices = await BleakScanner.discover(timeout=duration)
-        
-        results = []
-        for device in devices:
-            name = device.name or ""
-            if SCAN_PREFIX in name.upper():
-                results.append((name, device.address))
-        
+        results = [(entry.name, entry.address) async for entry in self.scan_stream(duration, limit=limit)]
         return sorted(results, key=lambda x: x[0])
     
+    def subscribe(self, status_only: bool = False, policy: str = "drop_oldest",
+                  maxsize: int = SUBSCRIPTION_QUEUE_SIZE) -> Subscription:
+        """Register a queue that receives every parsed message (or only Type 02)
+        
+        Subscriptions outlive reconnects; close with unsubscribe().
+        """
+        subscription = Subscription(status_only, policy, maxsize)
+        self._subscriptions.append(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription):
+        subscription.close()
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+    
+    async def statuses(self, policy: str = "drop_oldest",
+                       maxsize: int = SUBSCRIPTION_QUEUE_SIZE) -> AsyncIterator[ParsedMessage]:
+        """Type 02 statuses as they arrive: ``async for status in ble.statuses()``"""
+        subscription = self.subscribe(True, policy, maxsize)
+        try:
+            async for message in subscription:
+                yield message
+        finally:
+            self.unsubscribe(subscription)
+    
+    async def frames(self, policy: str = "drop_oldest",
+                     maxsize: int = SUBSCRIPTION_QUEUE_SIZE) -> AsyncIterator[ParsedMessage]:
+        """Every parsed message as it arrives: ``async for frame in ble.frames()``"""
+        subscription = self.subscribe(False, policy, maxsize)
+        try:
+            async for message in subscription:
+                yield message
+        finally:
+            self.unsubscribe(subscription)
+    
     def _notification_handler(self, sender, data: bytearray):
-        """Handle incoming notifications"""
-        hex_data = data.hex().upper()
-        print(f"\n📨 RAW RECEIVED: {hex_data}")
-        
-        # Handle both single (38 char) and double (76 char) messages
-        if len(hex_data) == 38:
-            self._process_message(hex_data)
-        elif len(hex_data) == 76:
-            # Split into two messages
-            msg1 = hex_data[0:38]
-            msg2 = hex_data[38:76]
-            self._process_message(msg1)
-            self._process_message(msg2)
-        else:
-            print(f"⚠️  Unexpected message length: {len(hex_data)}")
+        """Queue a notification for the dispatcher (runs in the bleak callback)"""
+        if len(self._notifications) >= NOTIFICATION_BACKLOG:
+            self._notifications.popleft()
+            self.notifications_dropped += 1
+        self._notifications.append(bytes(data))
+        self._notification_ready.set()
+    
+    def _start_dispatcher(self):
+        self._notifications.clear()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
     
-    def _process_message(self, hex_data: str):
+    def _stop_dispatcher(self):
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        self._notifications.clear()
+    
+    async def _dispatch(self):
+        """Parse queued notifications and hand the messages to subscribers
+        
+        A full block subscription stalls this task (and with it request
+        responses); notifications then wait in the backlog.
+        """
+        while True:
+            await self._notification_ready.wait()
+            self._notification_ready.clear()
+            while self._notifications:
+                messages = self._handle_notification(self._notifications.popleft())
+                if not self._subscriptions:
+                    continue
+                for message in messages:
+                    for subscription in list(self._subscriptions):
+                        if subscription.status_only and message.msg_type != 2:
+                            continue
+                        if not subscription.offer(message):
+                            await subscription.put(message)
+    
+    def _handle_notification(self, data) -> List[ParsedMessage]:
+        """Parse one notification and update state, returns its messages"""
+        if self.verbose:
+            print(f"\n📨 RAW RECEIVED: {data.hex().upper()}")
+        
+        # Notifications may hold any number of frames, or only part of one
+        messages = []
+        discarded = self.reassembler.discarded_bytes
+        for frame in self.reassembler.feed(data):
+            parsed = self._process_message(frame)
+            if parsed is not None:
+                messages.append(parsed)
+        
+        if self.reassembler.discarded_bytes != discarded:
+            print(f"⚠️  Resynced stream: dropped {self.reassembler.discarded_bytes - discarded} bytes")
+        return messages
+    
+    def _process_message(self, frame) -> Optional[ParsedMessage]:
         """Process a single message"""
-        parsed = self.protocol.parse_message(hex_data)
+        parsed = self.protocol.parse_message(frame)
         
         if parsed:
-            print(f"📋 PARSED: {parsed}")
+            if self.verbose:
+                print(f"📋 PARSED: {parsed}")
             
             # Extract device ID from first response
-            if not self.verified and parsed.device_id != "00000000":
+            if not self.verified and parsed.device_id != NO_DEVICE_ID:
                 self.protocol.device_id = parsed.device_id
-                print(f"✅ Device ID captured: {parsed.device_id}")
+                if self.verbose:
+                    print(f"✅ Device ID captured: {parsed.device_id_hex}")
             
             # Check for verification response (Type 09)
             if parsed.msg_type == 9:
-                content_bytes = bytes.fromhex(parsed.content)
-                if content_bytes[0] != 0:
+                if parsed.content[0] != 0:
                     self.verified = True
                     print("✅ Device VERIFIED!")
                 else:
                     print("⚠️  Verification FAILED!")
             
             self.last_message = parsed
+            if parsed.msg_type == 2:
+                self.last_status = parsed
+                self.last_status_at = time.monotonic()
+            self._resolve_pending(parsed)
         else:
             print("⚠️  Failed to parse message")
+        return parsed
     
-    async def connect(self, mac_address: str) -> bool:
+    def _resolve_pending(self, parsed: ParsedMessage):
+        """Complete pending requests answered by this message
+        
+        Requests with a match predicate wait for a state and are all
+        resolved by a message showing it. Plain requests are answered one
+        per message: the one whose sequence the device echoed, else the oldest.
+        """
+        if not self._pending:
+            return
+        
+        candidates = [
+            p for p in self._pending
+            if p.expect == parsed.msg_type and not p.future.done()
+        ]
+        stateful = [p for p in candidates if p.match is not None and p.match(parsed)]
+        for pending in stateful:
+            pending.future.set_result(parsed)
+        
+        plain = [p for p in candidates if p.match is None]
+        if plain:
+            chosen = next((p for p in plain if p.seq == parsed.count), plain[0])
+            chosen.future.set_result(parsed)
+    
+    def _fail_pending(self, exc: Exception):
+        for pending in self._pending:
+            if not pending.future.done():
+                pending.future.set_exception(exc)
+        self._pending.clear()
+    
+    async def wait_for(self, expect: int, match: Optional[Callable[[ParsedMessage], bool]] = None,
+                       timeout: float = COMMAND_TIMEOUT, seq: Optional[int] = None,
+                       _send: Optional[bytes] = None) -> ParsedMessage:
+        """Wait for the next message of type expect (optionally matching a predicate)
+        
+        Raises:
+            RequestTimeoutError: If nothing matching arrives within timeout
+        """
+        pending = self._add_pending(expect, match, seq)
+        # Register before writing, the response can beat the write call back
+        try:
+            if _send is not None:
+                await self.client.write_gatt_char(NOTIFY_UUID, _send)
+        except BaseException:
+            self._pending.remove(pending)
+            raise
+        return await self._await_pending(pending, timeout)
+    
+    async def submit(self, frame: bytes, expect: int,
+                     match: Optional[Callable[[ParsedMessage], bool]] = None,
+                     timeout: float = COMMAND_TIMEOUT) -> "asyncio.Task[ParsedMessage]":
+        """Write a frame and return a task for its response without waiting
+        
+        Pipelined form of request(): the write completes before this
+        returns, the timeout runs from the write, and responses are matched
+        the same way, so several commands can be in flight at once.
+        """
+        if not self.connected or not self.client:
+            raise ConnectionError("Not connected")
+        pending = self._add_pending(expect, match, frame[2])
+        try:
+            await self.client.write_gatt_char(NOTIFY_UUID, frame)
+        except BaseException:
+            self._pending.remove(pending)
+            raise
+        return asyncio.ensure_future(self._await_pending(pending, timeout))
+    
+    def _add_pending(self, expect: int, match: Optional[Callable[[ParsedMessage], bool]],
+                     seq: Optional[int]) -> PendingRequest:
+        pending = PendingRequest(seq, expect, match, asyncio.get_running_loop().create_future())
+        self._pending.append(pending)
+        return pending
+    
+    async def _await_pending(self, pending: PendingRequest, timeout: float) -> ParsedMessage:
+        try:
+            return await asyncio.wait_for(pending.future, timeout)
+        except asyncio.TimeoutError:
+            raise RequestTimeoutError(f"No Type {pending.expect:02X} response within {timeout:.1f}s") from None
+        finally:
+            if pending in self._pending:
+                self._pending.remove(pending)
+    
+    async def request(self, frame: bytes, expect: int,
+                      match: Optional[Callable[[ParsedMessage], bool]] = None,
+                      timeout: float = COMMAND_TIMEOUT) -> ParsedMessage:
+        """Send a frame and wait for the response of type expect
+        
+        Resolves as soon as the matching response arrives, e.g.
+        ``await ble.request(verify_cmd, expect=0x09)`` or a Type 02 write
+        with ``match=BLEProtocol.reflected_by(cmd)``.
+        
+        Raises:
+            RequestTimeoutError: If no matching response arrives within timeout
+        """
+        if not self.connected or not self.client:
+            raise ConnectionError("Not connected")
+        return await self.wait_for(expect, match, timeout, seq=frame[2], _send=frame)
+    
+    async def connect(self, mac_address: str, verify_timeout: float = VERIFY_TIMEOUT) -> bool:
         """Connect to device and complete verification"""
         try:
             print(f"\n🔌 Connecting to {mac_address}...")
-            self.client = BleakClient(mac_address)
+            # Device ID and cached status belong to the previous connection
+            self.reassembler.clear()
+            self.protocol.device_id = NO_DEVICE_ID
+            self.verified = False
+            self.last_message = None
+            self.last_status = None
+            # A recently scanned device connects without another scan
+            cached = self.discovery_cache.get(mac_address)
+            self.client = self.client_factory(cached.device if cached and cached.device is not None else mac_address)
+            self._start_dispatcher()
             await self.client.connect()
             self.connected = True
             print("✅ Connected!")
@@ -383,22 +1067,32 @@ class HikeITBLE:
             await self.client.start_notify(NOTIFY_UUID, self._notification_handler)
             print("✅ Notifications enabled!")
             
-            # Wait a moment for connection to stabilize
-            await asyncio.sleep(0.5)
+            # The first status frame carries the device ID used by the verify request
+            if self.protocol.device_id == NO_DEVICE_ID:
+                try:
+                    await self.wait_for(0x02, timeout=FIRST_STATUS_TIMEOUT)
+                except RequestTimeoutError:
+                    print("⚠️  No status received yet, verifying without device ID")
             
-            # Send verification command
+            # Send verification command and wait for the result
             print("🔐 Sending verification command...")
             verify_cmd = self.protocol.build_verify_connect()
-            print(f"📤 SENDING: {verify_cmd}")
-            await self.client.write_gatt_char(NOTIFY_UUID, bytes.fromhex(verify_cmd))
-            
-            # Wait for verification response
-            await asyncio.sleep(2)
+            print(f"📤 SENDING: {verify_cmd.hex().upper()}")
+            await self.request(verify_cmd, expect=0x09, timeout=verify_timeout)
             
+            if not self.verified:
+                raise ConnectionError("Device rejected verification")
             return True
             
         except Exception as e:
             print(f"❌ Connection failed: {e}")
+            if self.client is not None and self.connected:
+                try:
+                    await self.client.disconnect()
+                except Exception:
+                    pass
+            self._fail_pending(ConnectionError("Connection failed"))
+            self._stop_dispatcher()
             self.connected = False
             return False
     
@@ -410,29 +1104,87 @@ class HikeITBLE:
                 if self.verified:
                     print("📤 Sending disconnect command...")
                     disconnect_cmd = self.protocol.build_verify_disconnect()
-                    await self.client.write_gatt_char(NOTIFY_UUID, bytes.fromhex(disconnect_cmd))
-                    await asyncio.sleep(0.5)
+                    # Acknowledged write, so the frame is out before the link drops
+                    await self.client.write_gatt_char(NOTIFY_UUID, disconnect_cmd, response=True)
                 
                 await self.client.disconnect()
                 print("✅ Disconnected")
             except Exception as e:
                 print(f"⚠️  Disconnect error: {e}")
             finally:
+                self._fail_pending(ConnectionError("Disconnected"))
+                self._stop_dispatcher()
                 self.connected = False
                 self.verified = False
     
-    async def send_command(self, command: str):
-        """Send a command to the device"""
+    @property
+    def max_write_length(self) -> int:
+        """Bytes one write can carry on the current link"""
+        mtu = getattr(self.client, "mtu_size", None) or DEFAULT_MTU
+        return mtu - ATT_HEADER_LENGTH
+    
+    async def write_frames(self, frames: Iterable[bytes]) -> int:
+        """Write frames packed into as few writes as the MTU allows
+        
+        Returns the number of writes used.
+        """
+        writes = BLEProtocol.pack_frames(frames, self.max_write_length)
+        for payload in writes:
+            await self.client.write_gatt_char(NOTIFY_UUID, payload)
+        return len(writes)
+    
+    async def send_command(self, command: bytes, timeout: float = COMMAND_TIMEOUT) -> Optional[ParsedMessage]:
+        """Send a command frame to the device
+        
+        Commands that change the reported status wait for the Type 02
+        status reflecting the change and return it.
+        """
+        return (await self.send_commands([command], timeout))[0]
+    
+    async def send_commands(self, commands: Iterable[bytes],
+                            timeout: float = COMMAND_TIMEOUT) -> List[Optional[ParsedMessage]]:
+        """Send command frames, packed into as few writes as the MTU allows
+        
+        Returns one entry per command: the Type 02 status reflecting it, or
+        None for commands without a visible effect and for failures. All
+        confirmations are awaited together, each with its own timeout.
+        """
+        commands = list(commands)
         if not self.connected or not self.client:
             print("❌ Not connected!")
-            return
+            return [None] * len(commands)
         
+        # Register before writing, the responses can beat the write calls back
+        pending: List[Optional[PendingRequest]] = []
+        for command in commands:
+            print(f"📤 SENDING: {command.hex().upper()}")
+            match = self.protocol.reflected_by(command)
+            pending.append(None if match is None else self._add_pending(0x02, match, command[2]))
         try:
-            print(f"📤 SENDING: {command}")
-            await self.client.write_gatt_char(NOTIFY_UUID, bytes.fromhex(command))
-            await asyncio.sleep(0.5)
+            writes = await self.write_frames(commands)
         except Exception as e:
+            for request in pending:
+                if request in self._pending:
+                    self._pending.remove(request)
             print(f"❌ Send failed: {e}")
+            return [None] * len(commands)
+        if self.verbose and writes < len(commands):
+            print(f"📦 Packed {len(commands)} frames into {writes} writes")
+        
+        waiting = [request for request in pending if request is not None]
+        outcomes = iter(await asyncio.gather(
+            *(self._await_pending(request, timeout) for request in waiting), return_exceptions=True))
+        results: List[Optional[ParsedMessage]] = []
+        for request in pending:
+            outcome = next(outcomes) if request is not None else None
+            if isinstance(outcome, RequestTimeoutError):
+                print(f"❌ Not confirmed: {outcome}")
+                outcome = None
+            elif isinstance(outcome, BaseException):
+                print(f"❌ Send failed: {outcome}")
+                outcome = None
+            results.append(outcome)
+        return results
     
     async def interactive_commands(self):
         """Interactive command menu"""
@@ -469,8 +1221,8 @@ class HikeITBLE:
                 try:
                     model = list(SpeedModel)[int(model_choice)]
                     at_flag = input("AT flag (0 or 1): ").strip()
-                    if self.last_message and self.last_message.msg_type == 2:
-                        cmd = self.protocol.build_model_cmd(model, int(at_flag), self.last_message.content)
+                    if self.last_status:
+                        cmd = self.protocol.build_model_cmd(model, int(at_flag), self.last_status.content)
                         await self.send_command(cmd)
                     else:
                         print("⚠️  Need a Type 02 message first to preserve settings")
@@ -478,10 +1230,10 @@ class HikeITBLE:
                     print("❌ Invalid selection")
             
             elif choice == "4":
-                if self.last_message and self.last_message.msg_type == 2 and self.last_message.speed_model:
-                    step = input(f"Enter step value for {self.last_message.speed_model.desc}: ").strip()
+                if self.last_status and self.last_status.speed_model:
+                    step = input(f"Enter step value for {self.last_status.speed_model.desc}: ").strip()
                     try:
-                        cmd = self.protocol.build_step_cmd(int(step), self.last_message.speed_model, self.last_message.content)
+                        cmd = self.protocol.build_step_cmd(int(step), self.last_status.speed_model, self.last_status.content)
                         await self.send_command(cmd)
                     except ValueError:
                         print("❌ Invalid step value")
@@ -507,10 +1259,15 @@ class HikeITBLE:
                     print(f"❌ {e}")
             
             elif choice == "7":
-                hex_cmd = input("Enter hex command (without AA55 header and checksum): ").strip().upper()
-                if len(hex_cmd) == 32:  # 1 seq + 1 type + 10 content + 4 id = 16 bytes = 32 chars
-                    checksum = self.protocol.calculate_checksum(hex_cmd)
-                    full_cmd = HEADER + hex_cmd + checksum
+                hex_cmd = input("Enter hex command (without AA55 header and checksum): ").strip()
+                try:
+                    body = bytes.fromhex(hex_cmd)
+                except ValueError:
+                    print("❌ Invalid hex command")
+                    continue
+                if len(body) == 16:  # 1 seq + 1 type + 10 content + 4 id = 16 bytes
+                    checksum = self.protocol.calculate_checksum(body)
+                    full_cmd = HEADER + body + bytes([checksum])
                     await self.send_command(full_cmd)
                 else:
                     print(f"❌ Command must be 32 hex characters (got {len(hex_cmd)})")
@@ -529,9 +1286,6 @@ class HikeITBLE:
             
             else:
                 print("❌ Invalid choice")
-            
-            # Small delay to show messages
-            await asyncio.sleep(0.5)
 
 
 async def main_menu():
@@ -560,16 +1314,26 @@ async def main_menu():
                 print("⚠️  No devices found")
         
         elif choice == "2":
-            devices = await ble.scan_hike_devices(10)
-            if devices:
-                print(f"\n✅ Found {len(devices)} HIKE IT devices:")
-                for i, (name, mac) in enumerate(devices, 1):
-                    print(f"{i}. {name:30s} | {mac}")
+            # Print devices as they are detected
+            print("\n🔍 Scanning for HIKE IT devices for 10 seconds...")
+            count = 0
+            async for entry in ble.scan_stream(10):
+                count += 1
+                print(f"{count}. {entry.name:30s} | {entry.address}")
+            if count:
+                print(f"\n✅ Found {count} HIKE IT devices")
             else:
                 print("⚠️  No HIKE IT devices found")
         
         elif choice == "3":
-            mac = input("\nEnter MAC address: ").strip()
+            mac = input("\nEnter MAC address (blank = first HIKE IT device found): ").strip()
+            if not mac:
+                found = await ble.scan_hike_devices(10, limit=1)
+                if not found:
+                    print("⚠️  No HIKE IT devices found")
+                    continue
+                name, mac = found[0]
+                print(f"📍 Using {name} ({mac})")
             if await ble.connect(mac):
                 print("\n✅ Connection established!")
                 print("   Listening for messages...")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+HIKE IT Capture Reader
+Decodes frame captures dumped by the ESPHome component (capture_size)
+"""
+
+import argparse
+import base64
+import json
+import re
+import struct
+import sys
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+from hikeit_ble import FRAME_LENGTH, BLEProtocol, ParsedMessage
+
+# Dump layout, see CAPTURE_* in components/hikeit_ble/hikeit_ble.h
+CAPTURE_MAGIC = b"HKCP"
+CAPTURE_VERSION = 1
+CAPTURE_HEADER_STRUCT = struct.Struct("<4sBB2xI")
+CAPTURE_RECORD_STRUCT = struct.Struct(f"<IB{FRAME_LENGTH}s")
+
+CAPTURE_RX = 0
+CAPTURE_TX = 1
+
+# "CAPTURE <line> <base64>" as written to the log, with any logger prefix
+CAPTURE_LINE = re.compile(r"CAPTURE (\d+) ([A-Za-z0-9+/=]+)")
+
+
+class CaptureError(ValueError):
+    """Capture data is malformed or incomplete"""
+
+
+@dataclass
+class CaptureRecord:
+    """One captured frame"""
+    timestamp_ms: int
+    direction: int
+    frame: bytes
+
+    @property
+    def direction_name(self) -> str:
+        return "TX" if self.direction == CAPTURE_TX else "RX"
+
+
+def blob_from_log(lines: Iterable[str]) -> bytes:
+    """Reassemble the binary dump from logger output
+
+    Only the last dump in the log is used. Raises CaptureError when a
+    numbered line is missing (for example dropped by the logger).
+    """
+    chunks: List[bytes] = []
+    for line in lines:
+        match = CAPTURE_LINE.search(line)
+        if match is None:
+            continue
+        index = int(match.group(1))
+        if index == 0:
+            # A new dump starts
+            chunks = []
+        elif index != len(chunks):
+            raise CaptureError(f"Capture line {len(chunks)} missing (got line {index})")
+        chunks.append(base64.b64decode(match.group(2)))
+    if not chunks:
+        raise CaptureError("No capture found")
+    return b"".join(chunks)
+
+
+def parse_capture(blob: bytes) -> List[CaptureRecord]:
+    """Decode a binary dump into records, oldest first"""
+    if len(blob) < CAPTURE_HEADER_STRUCT.size:
+        raise CaptureError("Capture too short")
+    magic, version, record_size, count = CAPTURE_HEADER_STRUCT.unpack_from(blob)
+    if magic != CAPTURE_MAGIC:
+        raise CaptureError("Not a HIKE IT capture")
+    if version != CAPTURE_VERSION or record_size != CAPTURE_RECORD_STRUCT.size:
+        raise CaptureError(f"Unsupported capture version {version} (record size {record_size})")
+
+    body = memoryview(blob)[CAPTURE_HEADER_STRUCT.size:]
+    available = len(body) // record_size
+    if available < count:
+        raise CaptureError(f"Capture truncated: {available} of {count} records")
+    return [CaptureRecord(*fields) for fields in CAPTURE_RECORD_STRUCT.iter_unpack(body[:count * record_size])]
+
+
+def read_capture(path: str) -> List[CaptureRecord]:
+    """Read a capture from a raw dump file or from saved logger output"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data.startswith(CAPTURE_MAGIC):
+        return parse_capture(data)
+    return parse_capture(blob_from_log(data.decode("utf-8", errors="replace").splitlines()))
+
+
+def describe(msg: Optional[ParsedMessage]) -> str:
+    """One-line summary of a decoded frame"""
+    if msg is None:
+        return "invalid frame"
+    if msg.msg_type == 2:
+        model = msg.speed_model.desc if msg.speed_model else "Unknown"
+        return (f"status {model} | steps {msg.step_economy}/{msg.step_cruise}/{msg.step_sport}/{msg.step_hike}"
+                f" | {'locked' if msg.is_safe_model else 'unlocked'} | AT {msg.at_flag}"
+                + (f" | {msg.notice}" if msg.notice else ""))
+    if msg.msg_type == 9:
+        return f"verify {msg.content[0]:02X}"
+    return f"type {msg.msg_type:02X} content {msg.content.hex().upper()}"
+
+
+def print_capture(records: List[CaptureRecord]):
+    protocol = BLEProtocol()
+    start = records[0].timestamp_ms if records else 0
+    for record in records:
+        msg = protocol.parse_message(record.frame)
+        elapsed = ((record.timestamp_ms - start) & 0xFFFFFFFF) / 1000.0
+        print(f"{elapsed:10.3f}s {record.direction_name} {record.frame.hex().upper()}  {describe(msg)}")
+    print(f"\n{len(records)} frames")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decode a HIKE IT frame capture")
+    parser.add_argument("capture", help="Raw dump file or log containing CAPTURE lines")
+    parser.add_argument("--json", action="store_true", help="Print records as JSON lines")
+    parser.add_argument("--save", help="Write the raw binary dump to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        records = read_capture(args.capture)
+    except (OSError, CaptureError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if args.save:
+        header = CAPTURE_HEADER_STRUCT.pack(CAPTURE_MAGIC, CAPTURE_VERSION, CAPTURE_RECORD_STRUCT.size, len(records))
+        with open(args.save, "wb") as f:
+            f.write(header + b"".join(CAPTURE_RECORD_STRUCT.pack(r.timestamp_ms, r.direction, r.frame)
+                                      for r in records))
+
+    if args.json:
+        for record in records:
+            print(json.dumps({
+                "timestamp_ms": record.timestamp_ms,
+                "direction": record.direction_name,
+                "frame": record.frame.hex().upper(),
+            }))
+    else:
+        print_capture(records)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+HIKE IT Fleet Manager
+Connects, verifies and monitors several HIKE IT devices concurrently
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Union
+
+from hikeit_ble import (
+    COMMAND_TIMEOUT,
+    BLEProtocol,
+    HikeITBLE,
+    NOTIFY_UUID,
+    ParsedMessage,
+    SpeedModel,
+)
+
+# Result of a fleet-wide command for one device
+CommandResult = Union[ParsedMessage, None, Exception]
+
+
+class HikeITFleet:
+    """Manages one HikeITBLE per device under a single event loop
+
+    Every device keeps its own protocol state (device ID, sequence
+    counter, cached status). Connection attempts are bounded so a large
+    rig does not flood the BLE adapter.
+    """
+
+    def __init__(
+        self,
+        macs: List[str],
+        max_concurrent_connects: int = 3,
+        client_factory=None,
+        scanner=None,
+        verbose: bool = False,
+    ):
+        self.devices: Dict[str, HikeITBLE] = {
+            mac.upper(): HikeITBLE(verbose=verbose, client_factory=client_factory, scanner=scanner)
+            for mac in macs
+        }
+        self.max_concurrent_connects = max_concurrent_connects
+        self._connect_slots: Optional[asyncio.Semaphore] = None
+
+    def connected(self) -> Dict[str, HikeITBLE]:
+        """Devices that are connected and verified"""
+        return {mac: ble for mac, ble in self.devices.items() if ble.connected and ble.verified}
+
+    async def _connect_one(self, mac: str, retries: int, retry_delay: float) -> bool:
+        ble = self.devices[mac]
+        for attempt in range(retries + 1):
+            async with self._connect_slots:
+                if await ble.connect(mac):
+                    return True
+            if attempt < retries:
+                await asyncio.sleep(retry_delay)
+        return False
+
+    async def connect_all(self, retries: int = 1, retry_delay: float = 1.0) -> Dict[str, bool]:
+        """Connect and verify every device, at most max_concurrent_connects at a time"""
+        if self._connect_slots is None:
+            self._connect_slots = asyncio.Semaphore(self.max_concurrent_connects)
+        macs = list(self.devices)
+        results = await asyncio.gather(*(self._connect_one(mac, retries, retry_delay) for mac in macs))
+        return dict(zip(macs, results))
+
+    async def disconnect_all(self):
+        await asyncio.gather(*(ble.disconnect() for ble in self.devices.values() if ble.connected))
+
+    async def broadcast(
+        self,
+        build: Callable[[HikeITBLE], Optional[bytes]],
+        timeout: float = COMMAND_TIMEOUT,
+    ) -> Dict[str, CommandResult]:
+        """Send a per-device command to every connected device at once
+
+        build receives each device's HikeITBLE and returns the frame to send
+        (or None to skip it), so commands use that device's ID, sequence and
+        cached status. Returns the reflecting status, None for commands
+        without a status effect, or the exception raised.
+        """
+
+        async def run(ble: HikeITBLE) -> CommandResult:
+            try:
+                frame = build(ble)
+                if frame is None:
+                    return None
+                match = BLEProtocol.reflected_by(frame)
+                if match is None:
+                    await ble.client.write_gatt_char(NOTIFY_UUID, frame)
+                    return None
+                return await ble.request(frame, expect=0x02, match=match, timeout=timeout)
+            except Exception as e:
+                return e
+
+        targets = self.connected()
+        results = await asyncio.gather(*(run(ble) for ble in targets.values()))
+        return dict(zip(targets, results))
+
+    async def set_model(self, model: SpeedModel, at_flag: Optional[int] = None) -> Dict[str, CommandResult]:
+        """Change the speed model on every device, keeping each device's AT flag by default"""
+
+        def build(ble: HikeITBLE) -> Optional[bytes]:
+            if ble.last_status is None:
+                raise RuntimeError("No cached status")
+            flag = ble.last_status.at_flag if at_flag is None else at_flag
+            return ble.protocol.build_model_cmd(model, flag, ble.last_status.content)
+
+        return await self.broadcast(build)
+
+    async def set_step(self, step: int) -> Dict[str, CommandResult]:
+        """Set the step of each device's active model"""
+
+        def build(ble: HikeITBLE) -> Optional[bytes]:
+            if ble.last_status is None or ble.last_status.speed_model is None:
+                raise RuntimeError("No cached status")
+            return ble.protocol.build_step_cmd(step, ble.last_status.speed_model, ble.last_status.content)
+
+        return await self.broadcast(build)
+
+    async def set_locked(self, pin: str, locked: bool) -> Dict[str, CommandResult]:
+        return await self.broadcast(lambda ble: ble.protocol.build_safe_mode_cmd(pin, locked))
+
+    def status_view(self) -> List[dict]:
+        """One row per device with its connection state and cached status"""
+        now = time.monotonic()
+        rows = []
+        for mac, ble in self.devices.items():
+            status = ble.last_status
+            rows.append({
+                "mac": mac,
+                "connected": ble.connected,
+                "verified": ble.verified,
+                "device_id": status.device_id_hex if status else "",
+                "model": status.speed_model.desc if status and status.speed_model else "",
+                "steps": (status.step_economy, status.step_cruise, status.step_sport, status.step_hike) if status else (),
+                "locked": status.is_safe_model if status else None,
+                "at_flag": status.at_flag if status else None,
+                "version": status.version if status else "",
+                "notice": status.notice if status else "",
+                "status_age_s": round(now - ble.last_status_at, 1) if status else None,
+            })
+        return rows
+
+    def print_status(self):
+        print("\n" + "="*96)
+        print(f"{'MAC':17s} | {'State':9s} | {'Model':9s} | {'Steps E/C/S/H':13s} | {'Lock':6s} | {'AT':2s} | {'Ver':4s} | {'Note':4s} | Age")
+        print("="*96)
+        for row in self.status_view():
+            state = "verified" if row["verified"] else ("connected" if row["connected"] else "offline")
+            steps = "/".join(str(s) for s in row["steps"])
+            locked = "" if row["locked"] is None else ("🔒" if row["locked"] else "🔓")
+            at_flag = "" if row["at_flag"] is None else str(row["at_flag"])
+            age = "" if row["status_age_s"] is None else f"{row['status_age_s']}s"
+            print(f"{row['mac']:17s} | {state:9s} | {row['model']:9s} | {steps:13s} | {locked:5s} | "
+                  f"{at_flag:2s} | {row['version']:4s} | {row['notice']:4s} | {age}")
+        print("="*96)
+
+    async def monitor(self, duration: float, interval: float = 2.0):
+        """Print the aggregated status every interval seconds"""
+        end = time.monotonic() + duration
+        while time.monotonic() < end:
+            self.print_status()
+            await asyncio.sleep(min(interval, max(0.0, end - time.monotonic())))
+
+
+def print_results(title: str, results: Dict[str, CommandResult]):
+    print(f"\n{title}:")
+    for mac, result in results.items():
+        if isinstance(result, Exception):
+            print(f"  ❌ {mac}: {result}")
+        else:
+            print(f"  ✅ {mac}")
+
+
+async def run_fleet(args):
+    client_factory = scanner = None
+    macs = [mac.upper() for mac in args.macs]
+    if args.simulate:
+        from hikeit_simulator import SimulatedBus, SimulatedDevice
+        bus = SimulatedBus()
+        for i in range(args.simulate):
+            device = bus.add(SimulatedDevice(address=f"AA:BB:CC:DD:EE:{i:02X}", name=f"HIKE IT SIM {i}",
+                                             link_latency=0.01))
+            macs.append(device.address)
+        client_factory, scanner = bus.client_factory, bus.scanner
+
+    if not macs:
+        print("❌ No devices given")
+        return
+
+    fleet = HikeITFleet(macs, max_concurrent_connects=args.max_connects,
+                        client_factory=client_factory, scanner=scanner)
+
+    start = time.perf_counter()
+    connected = await fleet.connect_all(retries=args.retries)
+    print(f"\n✅ {sum(connected.values())}/{len(connected)} devices verified in {time.perf_counter() - start:.2f}s")
+
+    try:
+        if args.model:
+            model = next((m for m in SpeedModel if m.desc.lower() == args.model.lower()), None)
+            if model is None:
+                print(f"❌ Unknown model: {args.model}")
+            else:
+                start = time.perf_counter()
+                results = await fleet.set_model(model)
+                print_results(f"Set model {model.desc} ({time.perf_counter() - start:.3f}s)", results)
+        if args.step is not None:
+            start = time.perf_counter()
+            results = await fleet.set_step(args.step)
+            print_results(f"Set step {args.step} ({time.perf_counter() - start:.3f}s)", results)
+
+        if args.monitor > 0:
+            await fleet.monitor(args.monitor, args.interval)
+        else:
+            fleet.print_status()
+    finally:
+        await fleet.disconnect_all()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HIKE IT fleet manager")
+    parser.add_argument("macs", nargs="*", help="Device MAC addresses")
+    parser.add_argument("--max-connects", type=int, default=3, help="Concurrent connection attempts")
+    parser.add_argument("--retries", type=int, default=1, help="Connection retries per device")
+    parser.add_argument("--model", help="Set this speed model on every device (e.g. 'Sport')")
+    parser.add_argument("--step", type=int, help="Set this step on every device")
+    parser.add_argument("--monitor", type=float, default=0.0, help="Print status for N seconds")
+    parser.add_argument("--interval", type=float, default=2.0, help="Status print interval")
+    parser.add_argument("--simulate", type=int, default=0, help="Add N simulated devices")
+    asyncio.run(run_fleet(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrupted by user")
+        sys.exit(0)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+HIKE IT Host Decode Comparison
+Runs frames through the firmware parser (host build, see host/Makefile)
+and through BLEProtocol, and reports every field that differs
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+from hikeit_ble import FRAME_LENGTH, HEADER, BLEProtocol
+from hikeit_capture import CaptureError, read_capture
+from hikeit_protocol import NOTICE_CODES, SpeedModel
+
+DEFAULT_BINARY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "host", "build", "hikeit_host")
+
+# Fields both decoders report for Type 02 frames
+STATUS_FIELDS = ("speed_model", "step_economy", "step_cruise", "step_sport", "step_hike", "deep_cx",
+                 "deep_sc", "version_tenths", "locked", "notice", "study_state", "study_time",
+                 "at_flag", "support_sl")
+
+
+def random_frames(count: int, seed: int = 1) -> List[bytes]:
+    """Random frames: mostly Type 02 with random content, plus verify
+    replies, corrupted checksums and bad headers"""
+    rng = random.Random(seed)
+    protocol = BLEProtocol()
+    frames = []
+    for i in range(count):
+        protocol.device_id = bytes(rng.randrange(256) for _ in range(4))
+        msg_type = 0x09 if i % 10 == 0 else 0x02
+        frame = bytearray(protocol.build_message(msg_type, bytes(rng.randrange(256) for _ in range(10))))
+        if i % 17 == 0:
+            frame[18] ^= 1 + rng.randrange(255)
+        elif i % 23 == 0:
+            frame[1] = rng.randrange(256)
+        frames.append(bytes(frame))
+    return frames
+
+
+def capture_frames(path: str) -> List[bytes]:
+    return [record.frame for record in read_capture(path)]
+
+
+def firmware_decode(binary: str, frames: List[bytes]) -> List[dict]:
+    """Decode with the host build of the component, one result per frame"""
+    stdin = "".join(frame.hex() + "\n" for frame in frames)
+    result = subprocess.run([binary, "decode"], input=stdin, capture_output=True, text=True, check=True)
+    return [json.loads(line) for line in result.stdout.splitlines()]
+
+
+def python_decode(protocol: BLEProtocol, frame: bytes) -> dict:
+    """BLEProtocol result in the host driver's JSON layout
+
+    The firmware parser also rejects bad checksums (the Python side leaves
+    that to FrameReassembler), and keeps SPEED_ECONOMY when the model bits
+    do not decode where Python reports None.
+    """
+    msg = protocol.parse_message(frame)
+    if (msg is None or frame[:2] != HEADER
+            or BLEProtocol.calculate_checksum(frame[2:FRAME_LENGTH - 1]) != frame[FRAME_LENGTH - 1]):
+        return {"valid": False}
+    decoded = {
+        "valid": True,
+        "count": msg.count,
+        "type": msg.msg_type,
+        "device_id": msg.device_id.hex().upper(),
+        "content": msg.content.hex().upper(),
+    }
+    if msg.msg_type == 0x02:
+        model = msg.speed_model or SpeedModel.ECONOMY
+        decoded.update({
+            "speed_model": model.code,
+            "step_economy": msg.step_economy,
+            "step_cruise": msg.step_cruise,
+            "step_sport": msg.step_sport,
+            "step_hike": msg.step_hike,
+            "deep_cx": msg.deep_cx,
+            "deep_sc": msg.deep_sc,
+            "version_tenths": round(float(msg.version[1:]) * 10),
+            "locked": msg.is_safe_model,
+            "notice": NOTICE_CODES.index(msg.notice),
+            "study_state": msg.study_state,
+            "study_time": msg.study_time,
+            "at_flag": msg.at_flag,
+            "support_sl": msg.support_sl,
+        })
+    return decoded
+
+
+def compare(frames: List[bytes], firmware: List[dict]) -> List[dict]:
+    """One entry per frame whose decodes differ"""
+    if len(firmware) != len(frames):
+        raise RuntimeError(f"Firmware decoded {len(firmware)} of {len(frames)} frames")
+    protocol = BLEProtocol()
+    mismatches = []
+    for frame, fw in zip(frames, firmware):
+        py = python_decode(protocol, frame)
+        fields = sorted(key for key in set(fw) | set(py) if fw.get(key) != py.get(key))
+        if fields:
+            mismatches.append({
+                "frame": frame.hex().upper(),
+                "fields": {key: {"firmware": fw.get(key), "python": py.get(key)} for key in fields},
+            })
+    return mismatches
+
+
+def summarize(frames: List[bytes], firmware: List[dict]) -> Dict[str, int]:
+    valid = [fw for fw in firmware if fw.get("valid")]
+    return {
+        "frames": len(frames),
+        "valid": len(valid),
+        "status": sum(1 for fw in valid if fw["type"] == 0x02),
+        "rejected": len(frames) - len(valid),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare firmware and Python frame decoding")
+    parser.add_argument("--binary", default=DEFAULT_BINARY, help="Host build (make -C host)")
+    parser.add_argument("--capture", help="Capture dump or log with CAPTURE lines (default: random frames)")
+    parser.add_argument("--random", type=int, default=20000, help="Random frames when no capture is given")
+    parser.add_argument("--seed", type=int, default=1, help="Random frame seed")
+    parser.add_argument("--show", type=int, default=10, help="Mismatches to print")
+    parser.add_argument("--json", action="store_true", help="Print summary and mismatches as JSON")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.binary):
+        print(f"❌ Host build not found: {args.binary} (run make -C host)")
+        sys.exit(2)
+
+    try:
+        frames = capture_frames(args.capture) if args.capture else random_frames(args.random, args.seed)
+    except (OSError, CaptureError) as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    firmware = firmware_decode(args.binary, frames)
+    mismatches = compare(frames, firmware)
+    summary = summarize(frames, firmware)
+
+    if args.json:
+        print(json.dumps({"summary": summary, "mismatches": mismatches}, indent=2))
+    else:
+        print(f"Frames: {summary['frames']} ({summary['status']} status, {summary['rejected']} rejected)")
+        for mismatch in mismatches[:args.show]:
+            print(f"❌ {mismatch['frame']}")
+            for key, values in mismatch["fields"].items():
+                print(f"     {key}: firmware={values['firmware']} python={values['python']}")
+        if mismatches:
+            print(f"❌ {len(mismatches)} frames decode differently")
+        else:
+            print("✅ Firmware and Python decoding match")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
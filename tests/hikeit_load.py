@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+HIKE IT Load Harness
+Drives a simulated device with configurable status rates and command
+bursts and reports frames/sec, parse cost and command round-trip latency
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import List, Tuple
+
+from hikeit_ble import HikeITBLE, NOTIFY_UUID, SpeedModel
+from hikeit_simulator import SimulatedBus, SimulatedDevice
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile, 0 for an empty list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class InstrumentedHikeIT(HikeITBLE):
+    """HikeITBLE that times frame handling and matches reflected step changes"""
+
+    def __init__(self, **kwargs):
+        super().__init__(verbose=False, **kwargs)
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.frames_received = 0
+        self.parse_ns: List[int] = []
+        # (requested Eco step, perf_counter at write)
+        self.pending: List[Tuple[int, float]] = []
+        self.round_trips: List[float] = []
+        self.superseded = 0
+
+    def _process_message(self, frame):
+        start = time.perf_counter_ns()
+        msg = super()._process_message(frame)
+        self.parse_ns.append(time.perf_counter_ns() - start)
+        self.frames_received += 1
+
+        if not self.pending or msg is None or msg.msg_type != 2:
+            return msg
+        for i, (step, sent_at) in enumerate(self.pending):
+            if msg.step_economy == step:
+                self.round_trips.append(time.perf_counter() - sent_at)
+                # Older commands in the burst were overwritten by this one
+                self.superseded += i
+                del self.pending[:i + 1]
+                break
+        return msg
+
+
+async def send_burst(ble: InstrumentedHikeIT, size: int, first_step: int) -> int:
+    """Write a burst of Eco step changes back to back, returns the next step"""
+    step = first_step
+    for _ in range(size):
+        step = (step + 1) % 16
+        cmd = ble.protocol.build_step_cmd(step, SpeedModel.ECONOMY, ble.last_status.content)
+        ble.pending.append((step, time.perf_counter()))
+        # Write without waiting so the burst is pipelined; round trips are
+        # matched against reflected status in _process_message
+        await ble.client.write_gatt_char(NOTIFY_UUID, cmd)
+    return step
+
+
+async def run_load(
+    status_rate: float = 20.0,
+    duration: float = 10.0,
+    burst_size: int = 5,
+    burst_interval: float = 1.0,
+    pack_frames: bool = False,
+    link_latency: float = 0.005,
+) -> dict:
+    """Run one load scenario against a simulated device and return the report"""
+    device = SimulatedDevice(status_rate=status_rate, pack_frames=pack_frames, link_latency=link_latency)
+    bus = SimulatedBus([device])
+    ble = InstrumentedHikeIT(client_factory=bus.client_factory, scanner=bus.scanner)
+
+    connect_start = time.perf_counter()
+    if not await ble.connect(device.address):
+        raise RuntimeError("Connection to simulated device failed")
+    connect_time = time.perf_counter() - connect_start
+    if not ble.verified or ble.last_status is None:
+        raise RuntimeError("Simulated device did not verify")
+
+    ble.reset_stats()
+    notifications_before = device.notifications_sent
+    commands_sent = 0
+    step = ble.last_status.step_economy
+
+    start = time.perf_counter()
+    next_burst = start
+    while True:
+        now = time.perf_counter()
+        if now - start >= duration:
+            break
+        if burst_size > 0 and now >= next_burst:
+            step = await send_burst(ble, burst_size, step)
+            commands_sent += burst_size
+            next_burst += burst_interval
+        wake = min(next_burst if burst_size > 0 else start + duration, start + duration)
+        await asyncio.sleep(max(0.0, wake - time.perf_counter()))
+    elapsed = time.perf_counter() - start
+
+    # Let in-flight frames land before tearing down
+    await asyncio.sleep(link_latency * 2 + 0.05)
+    notifications = device.notifications_sent - notifications_before
+    await ble.disconnect()
+
+    parse_us = [ns / 1000.0 for ns in ble.parse_ns]
+    rtt_ms = [s * 1000.0 for s in ble.round_trips]
+    return {
+        "status_rate": status_rate,
+        "pack_frames": pack_frames,
+        "link_latency_ms": link_latency * 1000.0,
+        "connect_s": round(connect_time, 3),
+        "duration_s": round(elapsed, 3),
+        "frames": ble.frames_received,
+        "notifications": notifications,
+        "frames_per_s": round(ble.frames_received / elapsed, 1) if elapsed else 0.0,
+        "parse_us": {
+            "mean": round(sum(parse_us) / len(parse_us), 2) if parse_us else 0.0,
+            "p50": round(percentile(parse_us, 50), 2),
+            "p99": round(percentile(parse_us, 99), 2),
+            "max": round(max(parse_us, default=0.0), 2),
+        },
+        "commands_sent": commands_sent,
+        "commands_confirmed": len(ble.round_trips),
+        "commands_superseded": ble.superseded,
+        "commands_lost": len(ble.pending),
+        "rtt_ms": {
+            "p50": round(percentile(rtt_ms, 50), 2),
+            "p95": round(percentile(rtt_ms, 95), 2),
+            "max": round(max(rtt_ms, default=0.0), 2),
+        },
+    }
+
+
+def print_report(report: dict):
+    print("\n" + "="*60)
+    print("HIKE IT LOAD REPORT")
+    print("="*60)
+    print(f"Status rate:     {report['status_rate']} Hz (pack frames: {report['pack_frames']})")
+    print(f"Link latency:    {report['link_latency_ms']:.1f} ms one-way")
+    print(f"Connect+verify:  {report['connect_s']:.3f} s")
+    print(f"Frames:          {report['frames']} in {report['duration_s']:.2f} s "
+          f"({report['frames_per_s']} frames/s, {report['notifications']} notifications)")
+    parse = report["parse_us"]
+    print(f"Parse cost:      mean {parse['mean']} us | p50 {parse['p50']} us | "
+          f"p99 {parse['p99']} us | max {parse['max']} us")
+    print(f"Commands:        {report['commands_sent']} sent | {report['commands_confirmed']} confirmed | "
+          f"{report['commands_superseded']} superseded | {report['commands_lost']} lost")
+    rtt = report["rtt_ms"]
+    print(f"Round trip:      p50 {rtt['p50']} ms | p95 {rtt['p95']} ms | max {rtt['max']} ms")
+    print("="*60)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HIKE IT load harness (simulated device)")
+    parser.add_argument("--status-rate", type=float, default=20.0, help="Status frames per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measurement time in seconds")
+    parser.add_argument("--burst", type=int, default=5, help="Commands per burst (0 disables)")
+    parser.add_argument("--burst-interval", type=float, default=1.0, help="Seconds between bursts")
+    parser.add_argument("--pack", action="store_true", help="Pack two frames per notification")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="One-way link latency")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_load(
+        status_rate=args.status_rate,
+        duration=args.duration,
+        burst_size=args.burst,
+        burst_interval=args.burst_interval,
+        pack_frames=args.pack,
+        link_latency=args.latency_ms / 1000.0,
+    ))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrupted by user")
+        sys.exit(0)
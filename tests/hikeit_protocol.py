@@ -0,0 +1,132 @@
+"""HIKE IT protocol tables
+
+Generated from components/hikeit_ble/protocol_schema.py, do not edit.
+Regenerate with: python components/hikeit_ble/protocol_schema.py
+"""
+
+from enum import Enum
+from typing import NamedTuple, Optional
+
+FRAME_LENGTH = 19
+CONTENT_LENGTH = 10
+HEADER = bytes([0xAA, 0x55])
+
+# Message types
+MSG_STUDY = 0x01  # Host: start pedal learning
+MSG_STATUS = 0x02  # Device: status, Host: configuration write
+MSG_LOCK = 0x05  # Host: lock with PIN
+MSG_UNLOCK = 0x06  # Host: unlock with PIN
+MSG_SCREEN = 0x08  # Host: screen toggle
+MSG_VERIFY = 0x09  # Verify request and response
+
+# Fixed host command payloads
+CONTENT_VERIFY_CONNECT = bytes([0x03]) + bytes(9)
+CONTENT_VERIFY_DISCONNECT = bytes([0x04]) + bytes(9)
+CONTENT_STUDY_MODE = bytes([0x16]) + bytes(9)
+CONTENT_SCREEN = bytes([0x24]) + bytes(9)
+
+
+class BitField(NamedTuple):
+    """Bitfield inside the 10 content bytes"""
+    byte: int
+    shift: int
+    mask: int
+
+
+# Type 02 content fields
+FIELD_MODEL_BYTE = BitField(0, 0, 0xFF)  # Speed model while no special model bit is set
+FIELD_STEP_ECONOMY = BitField(1, 0, 0x0F)  # Eco 4x4 step
+FIELD_STEP_CRUISE = BitField(1, 4, 0x0F)  # Cruise step
+FIELD_STEP_SPORT = BitField(2, 0, 0x0F)  # Sport step
+FIELD_STEP_HIKE = BitField(2, 4, 0x0F)  # Hike IT step
+FIELD_MODEL_BITS = BitField(3, 0, 0x0F)  # Special model bits (Launch, Anti-Slip, Valet, SL)
+FIELD_SUPPORT_SL = BitField(3, 4, 0x01)  # Device supports SL
+FIELD_AT_FLAG = BitField(3, 7, 0x01)  # Auto transmission
+FIELD_DEEP_CX = BitField(4, 0, 0xFF)  # Pedal depth CX
+FIELD_DEEP_SC = BitField(5, 0, 0xFF)  # Pedal depth SC
+FIELD_STUDY_TIME = BitField(6, 0, 0x0F)  # Pedal learning countdown
+FIELD_STUDY_PHASE = BitField(6, 4, 0x0F)  # Pedal learning phase
+FIELD_VERSION = BitField(7, 0, 0xFF)  # Firmware version in tenths
+FIELD_UNLOCKED = BitField(8, 0, 0xFF)  # Zero while locked
+FIELD_NOTICE_BITS = BitField(9, 2, 0x07)  # Notice bits, C1 to C3 in priority order
+
+# model_bits select the model only while one of these bits is set
+MODEL_BITS_MODE_MASK = 0x07
+# Bits of content byte 3 set by host writes (special models and AT flag)
+CONFIG_BITS_MASK = 0x87
+
+
+def get_field(content, field: BitField) -> int:
+    return (content[field.byte] >> field.shift) & field.mask
+
+
+def set_field(content: bytearray, field: BitField, value: int) -> None:
+    mask = field.mask << field.shift
+    content[field.byte] = (content[field.byte] & ~mask & 0xFF) | ((value << field.shift) & mask)
+
+
+class SpeedModel(Enum):
+    """Speed model enumeration"""
+    ECONOMY = (0, "Eco 4x4")
+    NORMAL = (1, "Off")
+    CRUISE = (2, "Cruise")
+    SPORT = (3, "Sport")
+    HIKE_IT = (4, "Hike IT")
+    AUTO = (5, "Auto")
+    LAUNCH = (6, "Launch")
+    ANTI_SLIP = (7, "Anti-Slip")
+    VALET = (8, "Valet")
+    SL = (9, "SL")
+    ANIT_SLIP = (7, "Anti-Slip")  # alias of ANTI_SLIP
+
+    def __init__(self, code, desc):
+        self.code = code
+        self.desc = desc
+
+    @property
+    def model_byte(self) -> Optional[int]:
+        """model_byte value selecting this model, None if bit-selected"""
+        return SPEED_MODEL_BYTE[self.code]
+
+    @property
+    def model_bits(self) -> int:
+        return SPEED_MODEL_BITS[self.code]
+
+    @property
+    def step_field(self) -> Optional[BitField]:
+        return SPEED_MODEL_STEP[self.code]
+
+    @property
+    def step_name(self) -> Optional[str]:
+        """Name of the step field (and ParsedMessage attribute)"""
+        return SPEED_MODEL_STEP_NAME[self.code]
+
+
+# Per speed model tables, indexed by code
+SPEED_MODEL_BY_CODE = (SpeedModel.ECONOMY, SpeedModel.NORMAL, SpeedModel.CRUISE, SpeedModel.SPORT, SpeedModel.HIKE_IT, SpeedModel.AUTO, SpeedModel.LAUNCH, SpeedModel.ANTI_SLIP, SpeedModel.VALET, SpeedModel.SL,)
+SPEED_MODEL_BYTE = (0, 1, 2, 3, 4, 5, None, None, None, None,)
+SPEED_MODEL_BITS = (0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x01, 0x02, 0x04, 0x08,)
+SPEED_MODEL_STEP = (FIELD_STEP_ECONOMY, None, FIELD_STEP_CRUISE, FIELD_STEP_SPORT, FIELD_STEP_HIKE, None, None, None, None, None,)
+SPEED_MODEL_STEP_NAME = ("step_economy", None, "step_cruise", "step_sport", "step_hike", None, None, None, None, None,)
+SPEED_MODEL_BY_LABEL = {model.desc: model for model in SPEED_MODEL_BY_CODE}
+
+# Select entity options in display order
+SELECT_OPTIONS = ("Off", "Eco 4x4", "Cruise", "Sport", "Hike IT", "Auto", "Launch", "Anti-Slip", "Valet",)
+
+# Decoding tables, None / 0 where nothing matches
+MODEL_BYTE_TO_MODEL = (SpeedModel.ECONOMY, SpeedModel.NORMAL, SpeedModel.CRUISE, SpeedModel.SPORT, SpeedModel.HIKE_IT, SpeedModel.AUTO,)
+MODEL_BITS_TO_MODEL = (None, SpeedModel.LAUNCH, SpeedModel.ANTI_SLIP, SpeedModel.LAUNCH, SpeedModel.VALET, SpeedModel.LAUNCH, SpeedModel.ANTI_SLIP, SpeedModel.LAUNCH, SpeedModel.SL, SpeedModel.LAUNCH, SpeedModel.ANTI_SLIP, SpeedModel.LAUNCH, SpeedModel.VALET, SpeedModel.LAUNCH, SpeedModel.ANTI_SLIP, SpeedModel.LAUNCH,)
+NOTICE_BITS_TO_CODE = (0, 1, 2, 1, 3, 1, 2, 1,)
+# Notice names indexed by notice code
+NOTICE_CODES = ("", "C1", "C2", "C3",)
+
+
+def decode_speed_model(content) -> Optional[SpeedModel]:
+    if content[FIELD_MODEL_BITS.byte] & MODEL_BITS_MODE_MASK == 0:
+        value = get_field(content, FIELD_MODEL_BYTE)
+        return MODEL_BYTE_TO_MODEL[value] if value < len(MODEL_BYTE_TO_MODEL) else None
+    return MODEL_BITS_TO_MODEL[get_field(content, FIELD_MODEL_BITS)]
+
+
+def decode_notice(content) -> str:
+    return NOTICE_CODES[NOTICE_BITS_TO_CODE[get_field(content, FIELD_NOTICE_BITS)]]
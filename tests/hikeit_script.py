@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+HIKE IT Script Runner
+Runs a command script against one or more devices without the menus:
+writes are pipelined and confirmed by the status that reflects them, and
+every command reports its latency
+
+Script format: one JSON object per line (blank lines and # comments are
+skipped), or a YAML list of the same objects for .yaml/.yml files.
+
+    {"cmd": "model", "model": "Sport"}            optional "at_flag"
+    {"cmd": "step", "step": 5}                    optional "model" (default: active)
+    {"cmd": "lock"} / {"cmd": "unlock"}           optional "pin" (default --pin)
+    {"cmd": "screen"} / {"cmd": "study"}
+    {"cmd": "raw", "hex": "..."}                  type + content (11 bytes), seq..device ID
+                                                  (16 bytes) or a full frame; optional
+                                                  "expect" response type
+    {"cmd": "wait", "model": "Sport", "step": 5}  wait for a status with these fields
+                                                  ("model", "step", "locked", "at_flag", "notice")
+    {"cmd": "sync"}                               wait for every in-flight command
+    {"cmd": "sleep", "seconds": 1.0}
+
+Every command takes an optional "timeout" in seconds.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from hikeit_ble import (
+    COMMAND_TIMEOUT,
+    FRAME_LENGTH,
+    HEADER,
+    NOTIFY_UUID,
+    BLEProtocol,
+    HikeITBLE,
+    ParsedMessage,
+    RequestTimeoutError,
+    SpeedModel,
+)
+from hikeit_fleet import HikeITFleet
+from hikeit_protocol import FIELD_AT_FLAG, decode_speed_model, get_field
+
+try:
+    import yaml
+except ImportError:  # Only needed for YAML scripts
+    yaml = None
+
+COMMANDS = ("model", "step", "lock", "unlock", "screen", "study", "raw", "wait", "sync", "sleep")
+WAIT_FIELDS = ("model", "step", "locked", "at_flag", "notice")
+
+# Raw frames: type + content, seq..device ID, or a full frame
+RAW_LENGTHS = (11, FRAME_LENGTH - 3, FRAME_LENGTH)
+
+# Commands in flight per device before the oldest is awaited
+DEFAULT_WINDOW = 4
+
+
+class ScriptError(ValueError):
+    """Script line is malformed"""
+
+
+@dataclass
+class ScriptCommand:
+    """One validated script line"""
+    line: int
+    op: str
+    args: dict
+
+    @property
+    def timeout(self) -> float:
+        return float(self.args.get("timeout", COMMAND_TIMEOUT))
+
+    def describe(self) -> str:
+        details = " ".join(f"{k}={v}" for k, v in self.args.items() if k not in ("cmd", "timeout", "pin"))
+        return f"{self.op} {details}".strip()
+
+
+def find_model(name) -> SpeedModel:
+    """SpeedModel by display name or enum name, case-insensitive"""
+    key = str(name).strip().lower()
+    for model in SpeedModel:
+        if model.desc.lower() == key or model.name.lower() == key:
+            return model
+    raise ScriptError(f"Unknown speed model: {name}")
+
+
+def parse_command(obj, line: int) -> ScriptCommand:
+    if not isinstance(obj, dict) or "cmd" not in obj:
+        raise ScriptError(f"Line {line}: expected an object with a 'cmd' key")
+    op = str(obj["cmd"]).lower()
+    if op not in COMMANDS:
+        raise ScriptError(f"Line {line}: unknown command '{op}'")
+    try:
+        if op == "model":
+            find_model(obj["model"])
+        elif op == "step":
+            if not 0 <= int(obj["step"]) <= 15:
+                raise ScriptError("step must be 0-15")
+            if "model" in obj:
+                find_model(obj["model"])
+        elif op == "raw":
+            if len(bytes.fromhex(obj["hex"])) not in RAW_LENGTHS:
+                raise ScriptError(f"hex must be {', '.join(map(str, RAW_LENGTHS))} bytes")
+        elif op == "wait":
+            if not any(key in obj for key in WAIT_FIELDS):
+                raise ScriptError(f"wait needs at least one of {', '.join(WAIT_FIELDS)}")
+            if "model" in obj:
+                find_model(obj["model"])
+        elif op == "sleep":
+            float(obj["seconds"])
+        if "timeout" in obj:
+            float(obj["timeout"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ScriptError(f"Line {line}: {op}: {e}") from None
+    return ScriptCommand(line, op, obj)
+
+
+def load_script(path: str) -> List[ScriptCommand]:
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if path.endswith((".yaml", ".yml")):
+        if yaml is None:
+            raise ScriptError("PyYAML is required for YAML scripts")
+        data = yaml.safe_load(text) or []
+        if not isinstance(data, list):
+            raise ScriptError("YAML script must be a list of commands")
+        return [parse_command(obj, i) for i, obj in enumerate(data, 1)]
+
+    commands = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ScriptError(f"Line {number}: {e}") from None
+        commands.append(parse_command(obj, number))
+    return commands
+
+
+def status_matches(status: ParsedMessage, args: dict) -> bool:
+    """True when a Type 02 status has every field a wait command names"""
+    if "model" in args and status.speed_model != find_model(args["model"]):
+        return False
+    if "step" in args:
+        model = status.speed_model
+        step_name = model.step_name if model is not None else None
+        if step_name is None or getattr(status, step_name) != int(args["step"]):
+            return False
+    if "locked" in args and status.is_safe_model != bool(args["locked"]):
+        return False
+    if "at_flag" in args and status.at_flag != int(args["at_flag"]):
+        return False
+    if "notice" in args and status.notice != str(args["notice"]):
+        return False
+    return True
+
+
+@dataclass
+class InFlight:
+    """Written command waiting for its response"""
+    index: int
+    command: ScriptCommand
+    sent_at: float
+    task: asyncio.Task
+    # Type 02 writes; a later one confirming implies this one took effect
+    config: bool = False
+
+
+@dataclass
+class DeviceRun:
+    mac: str
+    connected: bool = False
+    results: List[dict] = field(default_factory=list)
+
+
+class ScriptRunner:
+    """Runs a script on one connected device
+
+    Writes go out back to back, up to window commands in flight. Type 02
+    commands are built on the expected status (the cached status with the
+    unconfirmed writes applied), so pipelined model/step changes do not
+    undo each other. wait, sync and sleep wait for everything in flight first.
+    """
+
+    def __init__(self, ble: HikeITBLE, mac: str, pin: str = "123", window: int = DEFAULT_WINDOW,
+                 stop_on_error: bool = False):
+        self.ble = ble
+        self.mac = mac
+        self.pin = pin
+        self.window = max(1, window)
+        self.stop_on_error = stop_on_error
+        self.results: List[dict] = []
+        self._in_flight: List[InFlight] = []
+        self._expected: Optional[bytearray] = None
+        self._failed = False
+
+    async def run(self, commands: List[ScriptCommand]) -> List[dict]:
+        for index, command in enumerate(commands):
+            if self._failed and self.stop_on_error:
+                self._record(index, command, "skipped")
+                continue
+            try:
+                await self._execute(index, command)
+            except Exception as e:
+                self._record(index, command, "error", error=str(e))
+        await self._drain()
+        self.results.sort(key=lambda r: r["index"])
+        return self.results
+
+    # ------------------------------------------------------------------
+    # Commands
+    # ------------------------------------------------------------------
+
+    async def _execute(self, index: int, command: ScriptCommand):
+        op, args = command.op, command.args
+        if op in ("sync", "wait", "sleep"):
+            start = time.perf_counter()
+            await self._drain()
+            if self._failed and self.stop_on_error:
+                self._record(index, command, "skipped")
+                return
+            if op != "sync":
+                # sync measures the drain, wait and sleep only themselves
+                start = time.perf_counter()
+            if op == "sleep":
+                await asyncio.sleep(float(args["seconds"]))
+            elif op == "wait":
+                await self._wait_status(args, command.timeout)
+            self._record(index, command, "ok", latency=time.perf_counter() - start)
+            return
+
+        frame = self._build(command)
+        expect = 0x02
+        match = BLEProtocol.reflected_by(frame)
+        if op == "raw" and "expect" in args:
+            expect = int(args["expect"])
+            match = match if expect == 0x02 else None
+        elif match is None:
+            # Nothing to confirm: done once written
+            start = time.perf_counter()
+            await self._write(frame)
+            self._record(index, command, "sent", latency=time.perf_counter() - start)
+            return
+
+        while len(self._in_flight) >= self.window:
+            await self._settle_next()
+        sent_at = time.perf_counter()
+        task = await self.ble.submit(frame, expect, match, command.timeout)
+        is_config = frame[3] == 0x02
+        if is_config:
+            self._expected = bytearray(frame[4:14])
+        self._in_flight.append(InFlight(index, command, sent_at, task, is_config))
+
+    def _base_content(self) -> bytes:
+        """Content the next Type 02 write is built on"""
+        if self._expected is not None:
+            return bytes(self._expected)
+        if self.ble.last_status is None:
+            raise RuntimeError("No cached status")
+        return self.ble.last_status.content
+
+    def _build(self, command: ScriptCommand) -> bytes:
+        op, args = command.op, command.args
+        protocol = self.ble.protocol
+        if op == "model":
+            content = self._base_content()
+            at_flag = int(args.get("at_flag", get_field(content, FIELD_AT_FLAG)))
+            return protocol.build_model_cmd(find_model(args["model"]), at_flag, content)
+        if op == "step":
+            content = self._base_content()
+            model = find_model(args["model"]) if "model" in args else decode_speed_model(content)
+            if model is None or model.step_field is None:
+                raise RuntimeError("Active speed model has no step")
+            return protocol.build_step_cmd(int(args["step"]), model, content)
+        if op in ("lock", "unlock"):
+            return protocol.build_safe_mode_cmd(str(args.get("pin", self.pin)), op == "lock")
+        if op == "screen":
+            return protocol.build_screen_cmd()
+        if op == "study":
+            return protocol.build_study_mode()
+        raw = bytes.fromhex(args["hex"])
+        if len(raw) == FRAME_LENGTH:
+            return raw
+        if len(raw) == 11:
+            return protocol.build_message(raw[0], raw[1:])
+        return HEADER + raw + bytes([protocol.calculate_checksum(raw)])
+
+    async def _write(self, frame: bytes):
+        if not self.ble.connected or not self.ble.client:
+            raise ConnectionError("Not connected")
+        await self.ble.client.write_gatt_char(NOTIFY_UUID, frame)
+
+    async def _wait_status(self, args: dict, timeout: float):
+        status = self.ble.last_status
+        if status is not None and status_matches(status, args):
+            return
+        await self.ble.wait_for(0x02, lambda parsed: status_matches(parsed, args), timeout)
+
+    # ------------------------------------------------------------------
+    # Confirmations
+    # ------------------------------------------------------------------
+
+    async def _settle(self, entry: InFlight):
+        """Wait for one in-flight command and record its outcome"""
+        try:
+            await entry.task
+        except asyncio.CancelledError:
+            pass  # superseded, recorded by the command that confirmed it
+        except Exception as e:
+            self._record(entry.index, entry.command, "timeout" if isinstance(e, RequestTimeoutError) else "error",
+                         latency=time.perf_counter() - entry.sent_at, error=str(e))
+        else:
+            confirmed_at = time.perf_counter()
+            self._record(entry.index, entry.command, "confirmed", latency=confirmed_at - entry.sent_at)
+            if entry.config:
+                self._supersede(entry, confirmed_at)
+        if entry in self._in_flight:
+            self._in_flight.remove(entry)
+
+    def _supersede(self, confirmed: InFlight, confirmed_at: float):
+        """Older Type 02 writes are covered by a newer one's reflected status"""
+        for entry in list(self._in_flight):
+            if entry.config and entry.index < confirmed.index and not entry.task.done():
+                entry.task.cancel()
+                self._record(entry.index, entry.command, "superseded", latency=confirmed_at - entry.sent_at)
+                self._in_flight.remove(entry)
+
+    async def _settle_next(self):
+        """Settle the newest finished command, waiting for one if none has"""
+        done = [entry for entry in self._in_flight if entry.task.done()]
+        if not done:
+            await asyncio.wait([entry.task for entry in self._in_flight], return_when=asyncio.FIRST_COMPLETED)
+            done = [entry for entry in self._in_flight if entry.task.done()]
+        # Newest first, so a confirmation can supersede the older writes
+        await self._settle(max(done, key=lambda e: e.index))
+
+    async def _drain(self):
+        while self._in_flight:
+            await self._settle_next()
+        self._expected = None
+
+    def _record(self, index: int, command: ScriptCommand, status: str, latency: Optional[float] = None,
+                error: Optional[str] = None):
+        if status in ("timeout", "error"):
+            self._failed = True
+        result = {
+            "index": index,
+            "line": command.line,
+            "cmd": command.describe(),
+            "status": status,
+            "latency_ms": None if latency is None else round(latency * 1000.0, 2),
+        }
+        if error:
+            result["error"] = error
+        self.results.append(result)
+
+
+async def run_script(commands: List[ScriptCommand], macs: List[str], pin: str = "123",
+                     window: int = DEFAULT_WINDOW, stop_on_error: bool = False, max_connects: int = 3,
+                     retries: int = 1, client_factory=None, scanner=None) -> Dict[str, DeviceRun]:
+    """Connect every device, run the script on all of them at once, disconnect"""
+    fleet = HikeITFleet(macs, max_concurrent_connects=max_connects,
+                        client_factory=client_factory, scanner=scanner)
+    runs = {mac: DeviceRun(mac) for mac in fleet.devices}
+    try:
+        connected = await fleet.connect_all(retries=retries)
+
+        async def run_one(mac: str):
+            runs[mac].connected = True
+            runner = ScriptRunner(fleet.devices[mac], mac, pin, window, stop_on_error)
+            runs[mac].results = await runner.run(commands)
+
+        await asyncio.gather(*(run_one(mac) for mac, ok in connected.items() if ok))
+    finally:
+        await fleet.disconnect_all()
+    return runs
+
+
+def summarize(runs: Dict[str, DeviceRun]) -> dict:
+    results = [r for run in runs.values() for r in run.results]
+    latencies = sorted(r["latency_ms"] for r in results if r["status"] == "confirmed")
+    counts: Dict[str, int] = {}
+    for r in results:
+        counts[r["status"]] = counts.get(r["status"], 0) + 1
+    return {
+        "devices": len(runs),
+        "connected": sum(1 for run in runs.values() if run.connected),
+        "commands": len(results),
+        "statuses": counts,
+        "confirm_ms": {
+            "p50": latencies[len(latencies) // 2] if latencies else None,
+            "max": latencies[-1] if latencies else None,
+        },
+        "ok": all(run.connected for run in runs.values())
+              and not any(r["status"] in ("timeout", "error", "skipped") for r in results),
+    }
+
+
+def print_results(runs: Dict[str, DeviceRun], summary: dict):
+    marks = {"confirmed": "✅", "superseded": "⏩", "sent": "📤", "ok": "✅", "skipped": "⏭️ "}
+    for mac, run in runs.items():
+        print(f"\n{mac}:")
+        if not run.connected:
+            print("  ❌ not connected")
+            continue
+        for r in run.results:
+            latency = "" if r["latency_ms"] is None else f"{r['latency_ms']:9.2f} ms"
+            error = f"  {r['error']}" if "error" in r else ""
+            print(f"  {marks.get(r['status'], '❌')} #{r['index']:<3d} {r['cmd']:32s} {r['status']:10s} {latency}{error}")
+    print(f"\n{summary['connected']}/{summary['devices']} devices, {summary['commands']} commands: "
+          + ", ".join(f"{count} {status}" for status, count in sorted(summary["statuses"].items())))
+    if summary["confirm_ms"]["p50"] is not None:
+        print(f"Confirm latency: p50 {summary['confirm_ms']['p50']:.2f} ms | max {summary['confirm_ms']['max']:.2f} ms")
+
+
+async def run_cli(args) -> int:
+    try:
+        commands = load_script(args.script)
+    except (OSError, ScriptError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    macs = [mac.upper() for mac in args.macs]
+    client_factory = scanner = None
+    if args.simulate:
+        from hikeit_simulator import SimulatedBus, SimulatedDevice
+        bus = SimulatedBus()
+        for i in range(args.simulate):
+            device = bus.add(SimulatedDevice(address=f"AA:BB:CC:DD:EE:{i:02X}", name=f"HIKE IT SIM {i}",
+                                             pin=args.pin, link_latency=0.01))
+            macs.append(device.address)
+        client_factory, scanner = bus.client_factory, bus.scanner
+    if not macs:
+        print("❌ No devices given", file=sys.stderr)
+        return 2
+
+    # Connection progress goes to stderr so --json output stays parseable
+    output = sys.stderr if args.json else sys.stdout
+    with contextlib.redirect_stdout(output):
+        runs = await run_script(commands, macs, pin=args.pin, window=args.window,
+                                stop_on_error=args.stop_on_error, max_connects=args.max_connects,
+                                retries=args.retries, client_factory=client_factory, scanner=scanner)
+    summary = summarize(runs)
+
+    if args.json:
+        print(json.dumps({
+            "summary": summary,
+            "devices": {mac: {"connected": run.connected, "results": run.results} for mac, run in runs.items()},
+        }, indent=2))
+    else:
+        print_results(runs, summary)
+    return 0 if summary["ok"] else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a HIKE IT command script on one or more devices")
+    parser.add_argument("script", help="JSON lines script, or YAML list (.yaml/.yml)")
+    parser.add_argument("macs", nargs="*", help="Device MAC addresses")
+    parser.add_argument("--pin", default="123", help="PIN for lock/unlock commands without their own")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="Commands in flight per device")
+    parser.add_argument("--stop-on-error", action="store_true", help="Skip the rest of a device's script after a failure")
+    parser.add_argument("--max-connects", type=int, default=3, help="Concurrent connection attempts")
+    parser.add_argument("--retries", type=int, default=1, help="Connection retries per device")
+    parser.add_argument("--simulate", type=int, default=0, help="Add N simulated devices")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+    sys.exit(asyncio.run(run_cli(args)))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrupted by user")
+        sys.exit(130)
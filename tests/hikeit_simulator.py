@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+HIKE IT Device Simulator
+Simulated pedal controller that stands in for BleakClient/BleakScanner
+"""
+
+import asyncio
+import os
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+from hikeit_ble import (
+    BLEProtocol,
+    CONFIG_BITS_MASK,
+    FrameReassembler,
+    NO_DEVICE_ID,
+    NOTIFY_UUID,
+    SpeedModel,
+)
+from hikeit_protocol import FIELD_MODEL_BITS, FIELD_MODEL_BYTE, set_field
+
+# Default Type 02 content: Eco 4x4, steps Eco=3 Cruise=5 Sport=4 Hike=7,
+# SL supported, deep CX=2 SC=3, V2.5, unlocked
+DEFAULT_STATUS = bytes([0x00, 0x53, 0x74, 0x10, 0x02, 0x03, 0x00, 0x19, 0x01, 0x00])
+
+
+@dataclass
+class SimulatedBLEDevice:
+    """Advertisement entry returned by SimulatedBleakScanner"""
+    name: str
+    address: str
+
+
+@dataclass
+class SimulatedAdvertisement:
+    """AdvertisementData stand-in passed to detection callbacks"""
+    local_name: str
+    rssi: int
+
+
+class SimulatedDevice:
+    """Simulated HIKE IT pedal controller
+
+    Emits Type 02 status frames, answers Type 09 verify requests and
+    applies Type 02/05/06 writes to its own state. Every state change is
+    reflected in an immediate status frame.
+    """
+
+    def __init__(
+        self,
+        address: str = "AA:BB:CC:DD:EE:FF",
+        name: str = "HIKE IT SIM",
+        device_id: Optional[bytes] = None,
+        pin: str = "123",
+        status_rate: float = 2.0,
+        pack_frames: bool = False,
+        link_latency: float = 0.0,
+        accept_verify: bool = True,
+        advertising_interval: float = 0.1,
+        rssi: int = -60,
+    ):
+        """
+        Args:
+            status_rate: Periodic status frames per second (0 disables)
+            pack_frames: Pack two queued frames into one notification
+            link_latency: One-way delay in seconds applied to writes and notifications
+            accept_verify: Result returned for Type 09 verify requests
+            advertising_interval: Seconds between advertisements while not connected
+            rssi: Signal strength reported with each advertisement
+        """
+        self.address = address
+        self.name = name
+        self.device_id = device_id or os.urandom(4)
+        self.pin = pin
+        self.status_rate = status_rate
+        self.pack_frames = pack_frames
+        self.link_latency = link_latency
+        self.accept_verify = accept_verify
+        self.advertising_interval = advertising_interval
+        self.rssi = rssi
+
+        self.status = bytearray(DEFAULT_STATUS)
+        self.verified = False
+        self.connected = False
+
+        # Device-side protocol state reuses the host codec
+        self._protocol = BLEProtocol()
+        self._protocol.device_id = self.device_id
+        self._reassembler = FrameReassembler()
+        self._callback: Optional[Callable] = None
+        self._outbox: List[bytes] = []
+        self._flush_scheduled = False
+        self._status_task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.frames_sent = 0
+        self.notifications_sent = 0
+        self.writes_received = 0
+        self.frames_received = 0
+        self.commands_applied = 0
+        self.rejected_pins = 0
+
+    # ------------------------------------------------------------------
+    # Link events (driven by SimulatedBleakClient)
+    # ------------------------------------------------------------------
+
+    def on_connect(self):
+        self.connected = True
+        self._reassembler.clear()
+
+    def on_disconnect(self):
+        self.connected = False
+        self.verified = False
+        self._callback = None
+        self._outbox.clear()
+        if self._status_task:
+            self._status_task.cancel()
+            self._status_task = None
+
+    def subscribe(self, callback: Callable):
+        """Register the host notification callback and start streaming status"""
+        self._callback = callback
+        self.send_status()
+        if self.status_rate > 0 and self._status_task is None:
+            self._status_task = asyncio.get_running_loop().create_task(self._status_loop())
+
+    def unsubscribe(self):
+        self._callback = None
+        if self._status_task:
+            self._status_task.cancel()
+            self._status_task = None
+
+    async def _status_loop(self):
+        interval = 1.0 / self.status_rate
+        while True:
+            await asyncio.sleep(interval)
+            self.send_status()
+
+    def write(self, data: bytes):
+        """Host wrote to the data characteristic"""
+        self.writes_received += 1
+        data = bytes(data)
+        if self.link_latency > 0:
+            asyncio.get_running_loop().call_later(self.link_latency, self._receive, data)
+        else:
+            self._receive(data)
+
+    # ------------------------------------------------------------------
+    # Protocol handling
+    # ------------------------------------------------------------------
+
+    def _receive(self, data: bytes):
+        if not self.connected:
+            return
+        for frame in self._reassembler.feed(data):
+            self.frames_received += 1
+            self._handle_frame(frame)
+
+    def _handle_frame(self, frame):
+        msg_type = frame[3]
+        content = frame[4:14]
+        device_id = bytes(frame[14:18])
+        if device_id not in (self.device_id, NO_DEVICE_ID):
+            return
+
+        if msg_type == 0x09:
+            if content[0] == 0x03:
+                self.verified = self.accept_verify
+                result = 0x01 if self.accept_verify else 0x00
+                self._queue(self._protocol.build_message(0x09, bytes([result]) + bytes(9)))
+            elif content[0] == 0x04:
+                self.verified = False
+        elif msg_type == 0x02:
+            self._apply_config(content)
+            self.commands_applied += 1
+            self.send_status()
+        elif msg_type in (0x05, 0x06):
+            expected = self._protocol.build_safe_mode_cmd(self.pin, msg_type == 0x05)[4:8]
+            if bytes(content[0:4]) != expected:
+                self.rejected_pins += 1
+                return
+            # Content byte 8 is zero while locked
+            self.status[8] = 0x00 if msg_type == 0x05 else 0x01
+            self.commands_applied += 1
+            self.send_status()
+        elif msg_type == 0x01:
+            # Start pedal learning with a short countdown
+            self.status[6] = 0x15
+            self.commands_applied += 1
+            self.send_status()
+
+    def _apply_config(self, content):
+        """Apply a host Type 02 write: model byte, step nibbles, model bits"""
+        self.status[0] = content[0]
+        self.status[1] = content[1]
+        self.status[2] = content[2]
+        self.status[3] = (self.status[3] & ~CONFIG_BITS_MASK & 0xFF) | (content[3] & CONFIG_BITS_MASK)
+
+    def status_frame(self) -> bytes:
+        """Build the current Type 02 status frame"""
+        return self._protocol.build_message(0x02, self.status)
+
+    def send_status(self):
+        self._queue(self.status_frame())
+
+    def set_model(self, model: SpeedModel):
+        """Change the active model locally, as if set on the device itself"""
+        if model.model_byte is not None:
+            set_field(self.status, FIELD_MODEL_BYTE, model.model_byte)
+        set_field(self.status, FIELD_MODEL_BITS, model.model_bits)
+        self.send_status()
+
+    def _queue(self, frame: bytes):
+        """Queue a frame; frames queued in the same tick may share a notification"""
+        self._outbox.append(frame)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+    def _flush(self):
+        self._flush_scheduled = False
+        frames, self._outbox = self._outbox, []
+        step = 2 if self.pack_frames else 1
+        for i in range(0, len(frames), step):
+            payload = bytearray(b"".join(frames[i:i + step]))
+            self.frames_sent += len(frames[i:i + step])
+            self.notifications_sent += 1
+            if self.link_latency > 0:
+                asyncio.get_running_loop().call_later(self.link_latency, self._notify, payload)
+            else:
+                self._notify(payload)
+
+    def _notify(self, payload: bytearray):
+        if self._callback is not None:
+            self._callback(NOTIFY_UUID, payload)
+
+
+class SimulatedBus:
+    """Registry of simulated devices, shared by the fake client and scanner"""
+
+    def __init__(self, devices: Optional[List[SimulatedDevice]] = None, mtu_size: int = 23):
+        """
+        Args:
+            mtu_size: MTU of every client link, 23 fits one frame per write
+        """
+        self.mtu_size = mtu_size
+        self.devices: Dict[str, SimulatedDevice] = {}
+        for device in devices or []:
+            self.add(device)
+        self.scanner = SimulatedBleakScanner(self)
+
+    def add(self, device: SimulatedDevice) -> SimulatedDevice:
+        self.devices[device.address.upper()] = device
+        return device
+
+    @property
+    def client_factory(self):
+        """Factory for HikeITBLE(client_factory=...)"""
+        return partial(SimulatedBleakClient, bus=self, mtu_size=self.mtu_size)
+
+
+class SimulatedBleakScanner:
+    """BleakScanner stand-in listing the devices on a SimulatedBus
+
+    Used like the BleakScanner class: discover() lists every device, and
+    calling it with detection_callback=... returns a scan session whose
+    callbacks fire as devices advertise.
+    """
+
+    def __init__(self, bus: SimulatedBus, scan_delay: float = 0.0):
+        self.bus = bus
+        self.scan_delay = scan_delay
+        self.scans_started = 0
+
+    def __call__(self, detection_callback: Optional[Callable] = None, **kwargs) -> "SimulatedScanSession":
+        return SimulatedScanSession(self.bus, detection_callback, self)
+
+    async def discover(self, timeout: float = 5.0, **kwargs) -> List[SimulatedBLEDevice]:
+        await asyncio.sleep(min(self.scan_delay, timeout))
+        return [SimulatedBLEDevice(d.name, d.address) for d in self.bus.devices.values()]
+
+
+class SimulatedScanSession:
+    """Running scan: each unconnected device advertises every advertising_interval"""
+
+    def __init__(self, bus: SimulatedBus, callback: Optional[Callable], scanner: SimulatedBleakScanner):
+        self.bus = bus
+        self.callback = callback
+        self.scanner = scanner
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        self.scanner.scans_started += 1
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._advertise(device)) for device in self.bus.devices.values()]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def _advertise(self, device: SimulatedDevice):
+        while True:
+            await asyncio.sleep(device.advertising_interval)
+            if not device.connected and self.callback is not None:
+                self.callback(SimulatedBLEDevice(device.name, device.address),
+                              SimulatedAdvertisement(device.name, device.rssi))
+
+
+class SimulatedBleakClient:
+    """BleakClient stand-in connected to a SimulatedDevice"""
+
+    def __init__(self, address, bus: SimulatedBus, mtu_size: int = 23, **kwargs):
+        # A MAC string or a scanned device object, as BleakClient accepts
+        self.address = getattr(address, "address", address)
+        self.bus = bus
+        self.mtu_size = mtu_size
+        self._device: Optional[SimulatedDevice] = None
+
+    @property
+    def is_connected(self) -> bool:
+        return self._device is not None
+
+    async def connect(self, **kwargs) -> bool:
+        device = self.bus.devices.get(self.address.upper())
+        if device is None:
+            raise ConnectionError(f"Device {self.address} not found")
+        if device.connected:
+            raise ConnectionError(f"Device {self.address} already connected")
+        await asyncio.sleep(device.link_latency)
+        device.on_connect()
+        self._device = device
+        return True
+
+    async def disconnect(self) -> bool:
+        if self._device is not None:
+            self._device.on_disconnect()
+            self._device = None
+        return True
+
+    async def start_notify(self, char_specifier, callback: Callable, **kwargs):
+        self._require_connected()
+        self._device.subscribe(callback)
+
+    async def stop_notify(self, char_specifier):
+        self._require_connected()
+        self._device.unsubscribe()
+
+    async def write_gatt_char(self, char_specifier, data, response: bool = False):
+        self._require_connected()
+        if len(data) > self.mtu_size - 3:
+            raise ValueError(f"Write of {len(data)} bytes exceeds MTU {self.mtu_size}")
+        self._device.write(data)
+
+    def _require_connected(self):
+        if self._device is None:
+            raise ConnectionError("Not connected")
@@ -0,0 +1,64 @@
+"""
+HIKE IT Protocol Tests
+Reassembly of chunked notifications and batch vs scalar Type 02 decoding
+"""
+
+import random
+
+import pytest
+
+from hikeit_ble import BLEProtocol, FrameReassembler
+from hikeit_protocol import CONTENT_LENGTH, FRAME_LENGTH, NOTICE_CODES
+
+
+def build_frames(rng, count, msg_type=0x02):
+    protocol = BLEProtocol()
+    protocol.device_id = bytes([0x12, 0x34, 0x56, 0x78])
+    return [protocol.build_message(msg_type, bytes(rng.randrange(256) for _ in range(CONTENT_LENGTH)))
+            for _ in range(count)]
+
+
+def test_reassembler_chunked_stream_with_garbage():
+    rng = random.Random(2)
+    frames = build_frames(rng, 200)
+
+    # Garbage between frames, including a false header and a truncated frame
+    stream = bytearray()
+    for frame in frames:
+        stream += bytes(rng.choice(range(0x00, 0xAA)) for _ in range(rng.randrange(4)))
+        if rng.random() < 0.1:
+            stream += b"\xaa\x55\x01"
+        stream += frame
+
+    # A small ring wraps many times, chunks split frames at every offset
+    reassembler = FrameReassembler(capacity=64)
+    received = []
+    offset = 0
+    while offset < len(stream):
+        size = rng.randrange(1, 41)
+        received += [bytes(frame) for frame in reassembler.feed(stream[offset:offset + size])]
+        offset += size
+
+    assert received == frames
+    assert len(reassembler) < FRAME_LENGTH
+
+
+def test_batch_decode_matches_scalar():
+    np = pytest.importorskip("numpy")
+    rng = random.Random(3)
+    frames = build_frames(rng, 500) + build_frames(rng, 20, msg_type=0x09)
+    batch = BLEProtocol.decode_type02_batch(BLEProtocol.frames_from_buffer(b"".join(frames)))
+
+    protocol = BLEProtocol()
+    for frame, row in zip(frames, batch):
+        parsed = protocol.parse_message(frame)
+        assert row["valid"] == (parsed.msg_type == 0x02)
+        assert row["msg_type"] == parsed.msg_type
+        assert row["speed_model"] == (parsed.speed_model.code if parsed.speed_model else -1)
+        for name in ("step_economy", "step_cruise", "step_sport", "step_hike", "deep_cx", "deep_sc",
+                     "study_state", "study_time", "at_flag", "is_safe_model", "support_sl"):
+            assert row[name] == getattr(parsed, name), name
+        if parsed.msg_type == 0x02:
+            assert f"V{row['version_raw'] / 10.0:.1f}" == parsed.version
+            assert NOTICE_CODES[row["notice"]] == parsed.notice
+    assert np.count_nonzero(batch["valid"]) == 500